@@ -0,0 +1,24 @@
+"""Shared bootstrap for the scripts in this directory.
+
+Benchmarks run against a throwaway in-memory SQLite database unless
+DATABASE_ENGINE/DATABASE_NAME point somewhere else.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobsearch.settings")
+os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark-insecure-key")
+os.environ.setdefault("DATABASE_NAME", ":memory:")
+
+
+def setup(migrate: bool = False) -> None:
+    import django
+
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
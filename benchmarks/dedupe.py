@@ -0,0 +1,114 @@
+"""Near-duplicate detection: LSH band lookup vs comparing against every posting.
+
+Seeds --rows postings with random descriptions, of which --planted are
+lightly edited copies of earlier ones. Times signing, the dedupe_jobs
+backfill (signatures, band index, links), then checks --probes fresh
+near-copies both through DuplicateDetector and by brute force over all
+stored signatures, and reports recall of the planted duplicates.
+
+    python benchmarks/dedupe.py [--rows 100000] [--planted 1000] [--probes 200]
+"""
+
+import argparse
+import random
+import time
+from io import StringIO
+
+from _setup import setup
+
+WORDS = [f"w{i}" for i in range(5000)]
+
+
+def _text(rng, words=150):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _edit(rng, text):
+    """Swap a few words, as a reposted ad with a tweaked sentence would."""
+    words = text.split()
+    for _ in range(3):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def _posting(i, description):
+    from jobsearch.models import JobPosting
+
+    return JobPosting(
+        url=f"https://jobs.lever.co/acme/{i}",
+        company="acme",
+        title="Data Engineer",
+        description=description,
+        source="lever",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--planted", type=int, default=1000)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from django.core.management import call_command
+
+    from jobsearch.dedupe import (
+        DuplicateDetector,
+        posting_text,
+        shingles,
+        signature,
+        similarity,
+        unpack,
+    )
+    from jobsearch.models import JobPosting
+
+    rng = random.Random(0)
+    originals = [_text(rng) for _ in range(args.rows - args.planted)]
+    texts = originals + [_edit(rng, rng.choice(originals)) for _ in range(args.planted)]
+
+    t0 = time.perf_counter()
+    for text in texts[:10_000]:
+        signature(shingles(text))
+    elapsed = time.perf_counter() - t0
+    print(f"signatures   {min(10_000, len(texts)) / elapsed:10.0f}/s")
+
+    JobPosting.objects.bulk_create(
+        (_posting(i, text) for i, text in enumerate(texts)), batch_size=5000
+    )
+    out = StringIO()
+    t0 = time.perf_counter()
+    call_command("dedupe_jobs", stdout=out)
+    elapsed = time.perf_counter() - t0
+    linked = JobPosting.objects.filter(pk__gt=len(originals), duplicate_of__gt="").count()
+    print(f"backfill     {elapsed:10.2f}s  {out.getvalue().strip()}")
+    print(f"recall       {linked}/{args.planted} planted duplicates linked")
+
+    probes = [_posting(f"probe-{i}", _edit(rng, rng.choice(originals))) for i in range(args.probes)]
+    detector = DuplicateDetector()
+    t0 = time.perf_counter()
+    for probe in probes:
+        detector.check([probe])
+    lsh = time.perf_counter() - t0
+    found = sum(1 for probe in probes if probe.duplicate_of)
+
+    stored = [
+        unpack(minhash)
+        for minhash in JobPosting.objects.exclude(minhash=None).values_list("minhash", flat=True)
+    ]
+    t0 = time.perf_counter()
+    brute_found = 0
+    for probe in probes:
+        sig = signature(shingles(posting_text(probe)))
+        if any(similarity(sig, other) >= detector.threshold for other in stored):
+            brute_found += 1
+    brute = time.perf_counter() - t0
+
+    per_probe = 1000 / len(probes)
+    print(f"lookup LSH   {lsh * per_probe:10.2f}ms/posting  found {found}/{len(probes)}")
+    print(f"lookup scan  {brute * per_probe:10.2f}ms/posting  found {brute_found}/{len(probes)}")
+    print(f"speedup x{brute / lsh:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Export memory: everything loaded at once vs jobsearch.export streaming.
+
+Seeds --rows postings with ~2KB descriptions, then exports them as gzip
+NDJSON to /dev/null twice: once by loading every row and dumping the lot,
+as the old ad-hoc shell query did, and once with Export's chunked
+iterator. Prints time and peak Python memory (tracemalloc) of each.
+
+    python benchmarks/export.py [--rows 50000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from _setup import setup
+
+WORDS = [f"w{i}" for i in range(20_000)]
+
+
+def _seed(rows):
+    from jobsearch.models import JobPosting
+
+    rng = random.Random(0)
+    t0 = time.perf_counter()
+    for start in range(0, rows, 5000):
+        JobPosting.objects.bulk_create(
+            JobPosting(
+                url=f"https://jobs.lever.co/company{i % 3000}/{i}",
+                company=f"company{i % 3000}",
+                title="Data Engineer",
+                description=" ".join(rng.choice(WORDS) for _ in range(300)),
+            )
+            for i in range(start, min(start + 5000, rows))
+        )
+    print(f"seeded {rows} postings in {time.perf_counter() - t0:.1f}s")
+
+
+def _measure(label, run):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with open(os.devnull, "wb") as out:
+        run(out)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<24} {elapsed:6.2f}s  peak {peak / 2**20:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from django.core.serializers.json import DjangoJSONEncoder
+
+    from jobsearch.export import Export, export_fields
+    from jobsearch.models import JobPosting
+
+    _seed(args.rows)
+
+    def load_all(out):
+        rows = list(JobPosting.objects.values(*export_fields(JobPosting)))
+        lines = "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows)
+        out.write(gzip.compress(lines.encode()))
+
+    def stream(out):
+        for chunk in Export(JobPosting):
+            out.write(chunk)
+
+    _measure("load everything", load_all)
+    _measure("Export (streaming)", stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Greenhouse/Lever extraction: full BeautifulSoup parse vs the targeted fast paths.
+
+Runs both implementations over the same pages, checks that they return the
+same tuple (or raise the same error), and prints per-page timings. Pages
+come from the RawPage archive when --archive-db points at a database with
+archived pages, from --pages-dir (files named greenhouse-*.html /
+lever-*.html), or are generated.
+
+    python benchmarks/extract.py [--pages 500] [--pages-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from _setup import setup
+from bs4 import BeautifulSoup
+
+GREENHOUSE_URL = "https://job-boards.greenhouse.io/acme/jobs/{i}"
+LEVER_URL = "https://jobs.lever.co/acme/{i}"
+
+_FILLER = "".join(
+    f'<div class="nav-item"><a href="/x/{n}">Link {n}</a><span class="c">{"text " * 8}</span></div>'
+    for n in range(150)
+)
+
+
+def full_greenhouse(url, html):
+    """extract_greenhouse as it was before the fast path."""
+    soup = BeautifulSoup(html, "html.parser")
+    title_container = soup.find(class_="job__title")
+    if title_container is None:
+        raise ValueError(f"missing .job__title at {url}")
+    h1 = title_container.find("h1")
+    if h1 is None:
+        raise ValueError(f"missing h1 in .job__title at {url}")
+    location_tag = soup.find(class_="job__location")
+    if location_tag is None:
+        raise ValueError(f"missing .job__location at {url}")
+    description_tag = soup.find(class_="job__description")
+    if description_tag is None:
+        raise ValueError(f"missing .job__description at {url}")
+    return (
+        url.split("/")[3],
+        h1.get_text(strip=True),
+        location_tag.get_text(strip=True),
+        description_tag.get_text(strip=True),
+        None,
+    )
+
+
+def full_lever(url, html):
+    """extract_lever as it was before the fast path."""
+    soup = BeautifulSoup(html, "html.parser")
+    script = soup.find(attrs={"type": "application/ld+json"})
+    if not script:
+        raise ValueError(f"no application/ld+json script tag at {url}")
+    try:
+        data = json.loads(script.text)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"invalid JSON in ld+json at {url}") from exc
+    loc = data.get("jobLocation")
+    if isinstance(loc, list):
+        location = "/".join(x.get("address", {}).get("addressLocality", "") for x in loc)
+    elif loc:
+        location = loc.get("address", {}).get("addressLocality", "")
+    else:
+        location = ""
+    return (
+        url.split("/")[3],
+        data.get("title", ""),
+        location,
+        data.get("description", ""),
+        data.get("datePosted"),
+    )
+
+
+def _generated(n):
+    for i in range(n):
+        yield (
+            "greenhouse",
+            GREENHOUSE_URL.format(i=i),
+            f"<html><head><title>Job {i}</title></head><body>{_FILLER}"
+            f'<div class="job__title section"><h1>Data Engineer {i}</h1></div>'
+            f'<div class="job__location">New York, NY</div>'
+            f'<div class="job__description">{"<p>Build pipelines.</p>" * 40}</div>'
+            f"{_FILLER}</body></html>",
+        )
+        ld = {
+            "title": f"Data Engineer {i}",
+            "jobLocation": {"address": {"addressLocality": "Remote"}},
+            "description": "<p>Build pipelines.</p>" * 40,
+            "datePosted": "2024-01-15",
+        }
+        yield (
+            "lever",
+            LEVER_URL.format(i=i),
+            f"<html><head><script src='/app.js'></script>"
+            f'<script type="application/ld+json">{json.dumps(ld)}</script></head>'
+            f"<body>{_FILLER}{_FILLER}</body></html>",
+        )
+
+
+def _from_dir(path):
+    for file in sorted(Path(path).glob("*.html")):
+        source = file.name.split("-", 1)[0]
+        url = (GREENHOUSE_URL if source == "greenhouse" else LEVER_URL).format(i=file.stem)
+        yield source, url, file.read_text()
+
+
+def _from_archive():
+    from jobsearch.archive import iter_pages
+
+    for url, source, body in iter_pages():
+        if source in ("greenhouse", "lever"):
+            yield source, url, body
+
+
+def _outcome(fn, url, html):
+    try:
+        return fn(url, html)
+    except ValueError as e:
+        return ("error", str(e))
+
+
+def _time(fn, pages):
+    t0 = time.perf_counter()
+    results = [_outcome(fn, url, html) for url, html in pages]
+    return time.perf_counter() - t0, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500, help="generated pages per source")
+    parser.add_argument("--pages-dir")
+    parser.add_argument("--archive-db", help="DATABASE_NAME holding archived RawPage rows")
+    args = parser.parse_args()
+
+    if args.archive_db:
+        os.environ["DATABASE_NAME"] = args.archive_db
+    setup(migrate=not args.archive_db)
+    from jobsearch.utils import extract_greenhouse, extract_lever
+
+    if args.archive_db:
+        pages = list(_from_archive())
+    elif args.pages_dir:
+        pages = list(_from_dir(args.pages_dir))
+    else:
+        pages = list(_generated(args.pages))
+
+    for source, full, fast in (
+        ("greenhouse", full_greenhouse, extract_greenhouse),
+        ("lever", full_lever, extract_lever),
+    ):
+        subset = [(url, html) for s, url, html in pages if s == source]
+        if not subset:
+            continue
+        before, expected = _time(full, subset)
+        after, actual = _time(fast, subset)
+        mismatches = sum(a != b for a, b in zip(expected, actual, strict=True))
+        per_page = 1000 / len(subset)
+        print(
+            f"{source:<11} {len(subset):>6} pages  full {before * per_page:7.3f} ms/page  "
+            f"fast {after * per_page:7.3f} ms/page  x{before / after:5.1f}  "
+            f"mismatches {mismatches}"
+        )
+        if mismatches:
+            raise SystemExit(f"{source}: fast path disagrees with the full parse")
+
+
+if __name__ == "__main__":
+    main()
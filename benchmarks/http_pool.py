@@ -0,0 +1,74 @@
+"""Connections (handshakes) opened per run: module-level httpx.get vs the shared client.
+
+Serves a local keep-alive HTTP server, fetches N pages the old way and
+through jobsearch.http_client, and counts accepted connections for each.
+
+    python benchmarks/http_pool.py [--requests 300] [--threads 8]
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from _setup import setup
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with _Handler.lock:
+            _Handler.connections += 1
+
+    def do_GET(self):
+        body = b"<html><body>ok</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run(label, fetch, urls, threads):
+    _Handler.connections = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - t0
+    opened = _Handler.connections
+    print(f"{label:<22} {len(urls):>6} requests {opened:>6} connections {elapsed:8.3f}s")
+    return opened
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    setup()
+    from jobsearch.http_client import shared_client
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/acme/jobs/{i}" for i in range(args.requests)]
+
+    before = _run("httpx.get per request", lambda u: httpx.get(u), urls, args.threads)
+    with shared_client() as client:
+        after = _run("shared client", client.get, urls, args.threads)
+    server.shutdown()
+
+    print(f"handshakes saved per run: {before - after}")
+
+
+if __name__ == "__main__":
+    main()
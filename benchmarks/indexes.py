@@ -0,0 +1,149 @@
+"""Query plans and timings of the admin/scraper lookups, without and with the
+workload indexes of migration 0018.
+
+Seeds --rows postings (and a tenth as many bad jobs) shaped like a real
+table: a few thousand companies with a long tail, postings scraped in pk
+order over three months, a few percent applied to. Each query is then
+explained and timed (best of --repeat) with the indexes rolled back, and
+again with them in place.
+
+    python benchmarks/indexes.py [--rows 300000] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+from datetime import UTC, date, datetime, timedelta
+
+from _setup import setup
+
+DAYS = 90
+TODAY = date(2026, 10, 1)
+
+
+def _seed(rows):
+    from jobsearch.models import BadJob, JobPosting
+
+    rng = random.Random(0)
+    companies = [f"company{i}" for i in range(3000)]
+    weights = [1 / (rank + 1) for rank in range(len(companies))]
+
+    def jobs(model, count, **extra):
+        for start in range(0, count, 10_000):
+            batch = []
+            for i in range(start, min(start + 10_000, count)):
+                day = i * DAYS // count
+                company = rng.choices(companies, weights)[0]
+                batch.append(
+                    model(
+                        url=f"https://jobs.lever.co/{company}/{model.__name__}{i}",
+                        company=company,
+                        title="Data Engineer",
+                        location="Remote",
+                        posted_date=(
+                            TODAY - timedelta(days=DAYS - day + rng.randrange(5))
+                            if rng.random() > 0.05
+                            else None
+                        ),
+                        source="lever",
+                        **{name: value() for name, value in extra.items()},
+                    )
+                )
+            model.objects.bulk_create(batch)
+
+        # scraped_at is auto_now_add: spread it over the period in pk order
+        pks = list(model.objects.order_by("pk").values_list("pk", flat=True))
+        for day in range(DAYS):
+            first, last = pks[day * len(pks) // DAYS], pks[(day + 1) * len(pks) // DAYS - 1]
+            model.objects.filter(pk__gte=first, pk__lte=last).update(
+                scraped_at=datetime(2026, 7, 3, tzinfo=UTC) + timedelta(days=day)
+            )
+
+    t0 = time.perf_counter()
+    jobs(
+        JobPosting,
+        rows,
+        is_applied=lambda: rng.random() < 0.05,
+        location_allowed=lambda: rng.random() > 0.01,
+    )
+    jobs(BadJob, rows // 10)
+    print(f"seeded {rows} postings and {rows // 10} bad jobs in {time.perf_counter() - t0:.1f}s")
+
+
+def _queries():
+    """(label, queryset, whether the admin reads a page of it or counts it)."""
+    from jobsearch.models import BadJob, JobPosting
+
+    week_ago = datetime(2026, 9, 24, tzinfo=UTC)
+    postings = JobPosting.objects.all()
+    return [
+        (
+            "unapplied, newest posted (changelist)",
+            postings.filter(is_applied=False).order_by("-posted_date", "-pk"),
+            True,
+        ),
+        ("applied count (changelist filter)", postings.filter(is_applied=True), False),
+        (
+            "scraped in the past 7 days",
+            postings.filter(scraped_at__gte=week_ago).order_by("-posted_date", "-pk"),
+            True,
+        ),
+        (
+            "one company, newest scraped",
+            postings.filter(company="company42").order_by("-scraped_at"),
+            True,
+        ),
+        ("postings a BadLocation blocked", postings.filter(location_allowed=False), False),
+        (
+            "bad jobs of one company",
+            BadJob.objects.filter(company="company42").order_by("-scraped_at"),
+            True,
+        ),
+    ]
+
+
+def _run(label, repeat):
+    print(f"\n== {label}")
+    timings = {}
+    for name, queryset, page in _queries():
+        if page:
+            queryset = queryset[:100]
+        plan = queryset.explain()
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            # a fresh clone each time, so no result cache is reused
+            if page:
+                list(queryset.all())
+            else:
+                queryset.count()
+            best = min(best, time.perf_counter() - t0)
+        timings[name] = best
+        print(f"{name:<40} {best * 1000:8.2f}ms")
+        for line in plan.splitlines():
+            print(f"    {line}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from django.core.management import call_command
+
+    _seed(args.rows)
+    call_command("migrate", "jobsearch", "0017", verbosity=0)
+    before = _run("without workload indexes", args.repeat)
+    call_command("migrate", "jobsearch", verbosity=0)
+    after = _run("with workload indexes", args.repeat)
+
+    print()
+    for name in before:
+        print(f"{name:<40} x{before[name] / after[name]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
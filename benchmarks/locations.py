@@ -0,0 +1,93 @@
+"""Location blocking: per-pattern substring loop vs the compiled LocationMatcher.
+
+Generates a BadLocation-sized pattern list and a stream of locations with
+the repetition seen in search results (a few thousand distinct strings),
+checks that both implementations agree, and times them.
+
+    python benchmarks/locations.py [--patterns 5000] [--locations 100000] [--distinct 3000]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from _setup import setup
+
+_PLACES = [
+    "Remote",
+    "Remote (US Only)",
+    "New York, NY",
+    "San Francisco, CA",
+    "Austin, TX",
+    "London, UK",
+    "Berlin, Germany",
+    "Toronto",
+    "Remote - EMEA",
+    "Bangalore, India",
+]
+
+
+def old_is_allowed(location, blocked_regex, extra_blocked):
+    """is_allowed_location before the combined matcher."""
+    if not location:
+        return True
+    if blocked_regex.search(location):
+        return False
+    loc_lower = location.lower()
+    return not any(p.lower() in loc_lower for p in extra_blocked)
+
+
+def _word(rng):
+    return "".join(rng.choice(string.ascii_letters) for _ in range(rng.randint(5, 12)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patterns", type=int, default=5000)
+    parser.add_argument("--locations", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup()
+    from jobsearch.utils import _BLOCKED_LOCATIONS, LocationMatcher
+
+    rng = random.Random(args.seed)
+    patterns = frozenset(_word(rng) for _ in range(args.patterns))
+    blocked_sample = rng.sample(sorted(patterns), min(len(patterns), args.distinct // 10))
+    distinct = [
+        rng.choice(
+            [
+                rng.choice(_PLACES),
+                f"{_word(rng)}, {_word(rng)[:2].upper()}",
+                f"Office - {rng.choice(blocked_sample).upper()}",
+            ]
+        )
+        for _ in range(args.distinct)
+    ]
+    locations = [rng.choice(distinct) for _ in range(args.locations)]
+
+    t0 = time.perf_counter()
+    expected = [old_is_allowed(loc, _BLOCKED_LOCATIONS, patterns) for loc in locations]
+    before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matcher = LocationMatcher(patterns)
+    compile_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    actual = [matcher.allows(loc) for loc in locations]
+    after = time.perf_counter() - t0
+
+    mismatches = sum(a != b for a, b in zip(expected, actual, strict=True))
+    print(f"{len(patterns)} patterns, {len(locations)} locations ({len(set(locations))} distinct)")
+    print(f"substring loop   {before:8.3f}s")
+    print(f"compiled matcher {after:8.3f}s  (+{compile_time:.3f}s compile)  {matcher.cache_info()}")
+    print(f"speedup x{before / (after + compile_time):.1f}, blocked {actual.count(False)}")
+    print(f"mismatches {mismatches}")
+    if mismatches:
+        raise SystemExit("compiled matcher disagrees with the substring loop")
+
+
+if __name__ == "__main__":
+    main()
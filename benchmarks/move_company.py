@@ -0,0 +1,84 @@
+"""move_company_to_bad: per-row get_or_create/delete loop vs the set-based move.
+
+Seeds --rows postings for one company, moves them with the old loop, puts
+them back, then moves them with move_company_to_bad(), and prints the time
+and number of queries of each.
+
+    python benchmarks/move_company.py [--rows 10000]
+"""
+
+import argparse
+import time
+
+from _setup import setup
+
+
+def old_move_company_to_bad(company_name):
+    """move_company_to_bad before the set-based rewrite."""
+    from jobsearch.models import BadJob, JobPosting
+
+    count = 0
+    for job in JobPosting.objects.filter(company=company_name):
+        BadJob.objects.get_or_create(
+            url=job.url,
+            defaults={
+                "company": job.company,
+                "title": job.title,
+                "location": job.location,
+                "posted_date": job.posted_date,
+                "description": job.description,
+                "source": job.source,
+            },
+        )
+        job.delete()
+        count += 1
+    return count
+
+
+def _seed(rows):
+    from jobsearch.models import BadJob, JobPosting
+
+    BadJob.objects.all().delete()
+    JobPosting.objects.bulk_create(
+        JobPosting(
+            url=f"https://jobs.lever.co/acme/{i}",
+            company="acme",
+            title="Data Engineer",
+            location="Remote",
+            description="Build pipelines. " * 50,
+            source="lever",
+        )
+        for i in range(rows)
+    )
+
+
+def _run(label, move, rows):
+    from django.db import connection
+
+    from jobsearch.utils import QueryCounter
+
+    _seed(rows)
+    queries = QueryCounter()
+    t0 = time.perf_counter()
+    with connection.execute_wrapper(queries):
+        moved = move("acme")
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<12} moved {moved:>6} in {elapsed:8.3f}s with {queries.count:>6} queries")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from jobsearch.utils import move_company_to_bad
+
+    before = _run("row by row", old_move_company_to_bad, args.rows)
+    after = _run("set-based", move_company_to_bad, args.rows)
+    print(f"speedup x{before / after:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Admin changelist pages: Django's COUNT(*) + OFFSET vs keyset pagination.
+
+Seeds --rows postings scraped over three months, then loads the JobPosting
+changelist at increasing depths through the admin, once with the stock
+ChangeList (exact count, ?p=N) and once with KeysetChangeList (?after=
+cursor of the previous page's last row). Prints the best request time and
+the part of it spent in SQL for each page.
+
+    python benchmarks/pagination.py [--rows 300000]
+"""
+
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+from _setup import setup
+
+PAGES = (1, 10, 100, 1000, 2500)
+
+
+def _seed(rows):
+    from jobsearch.models import JobPosting
+
+    t0 = time.perf_counter()
+    for start in range(0, rows, 10_000):
+        JobPosting.objects.bulk_create(
+            JobPosting(
+                url=f"https://jobs.lever.co/company{i % 3000}/{i}", company=f"company{i % 3000}"
+            )
+            for i in range(start, min(start + 10_000, rows))
+        )
+    # scraped_at is auto_now_add: a few thousand postings share each hour
+    first = datetime(2026, 7, 3, tzinfo=UTC)
+    for start in range(0, rows, 5000):
+        JobPosting.objects.filter(pk__gt=start, pk__lte=start + 5000).update(
+            scraped_at=first + timedelta(hours=start // 5000)
+        )
+    print(f"seeded {rows} postings in {time.perf_counter() - t0:.1f}s")
+
+
+def _load(client, url, repeat=3):
+    """Best (request time, time in SQL) of repeat loads of url, and its ChangeList."""
+    from django.db import connection
+
+    sql = []
+
+    def timed(execute, *args):
+        t0 = time.perf_counter()
+        try:
+            return execute(*args)
+        finally:
+            sql.append(time.perf_counter() - t0)
+
+    best = (float("inf"), float("inf"))
+    for _ in range(repeat):
+        sql.clear()
+        with connection.execute_wrapper(timed):
+            t0 = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - t0
+        assert response.status_code == 200, response.status_code
+        best = min(best, (elapsed, sum(sql)))
+    return best, response.context["cl"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from django.contrib.admin.views.main import ChangeList
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    from jobsearch.admin import JobPostingAdmin
+
+    _seed(args.rows)
+    # lets the client see the rendered ChangeList, and allows its host
+    setup_test_environment()
+    client = Client()
+    client.force_login(User.objects.create_superuser("bench", "bench@example.com", "x"))
+    changelist = reverse("admin:jobsearch_jobposting_changelist")
+
+    # stock ChangeList: COUNT(*) for the paginator, then LIMIT/OFFSET
+    JobPostingAdmin.get_changelist = lambda self, request, **kwargs: ChangeList
+    offset = {page: _load(client, f"{changelist}?p={page}")[0] for page in PAGES}
+    del JobPostingAdmin.get_changelist
+
+    # keyset: the cursor is read off the page before, as a user clicking Next would
+    keyset, query = {}, ""
+    for page in range(1, max(PAGES) + 1):
+        timing, cl = _load(client, changelist + query, repeat=3 if page in PAGES else 1)
+        keyset[page] = timing
+        query = cl.next_url
+
+    print(f"{'page':>6} {'COUNT+OFFSET':>22} {'keyset':>22}   (request / SQL)")
+    for page in PAGES:
+        cells = [
+            f"{total * 1000:7.1f} / {sql * 1000:6.2f}ms"
+            for total, sql in (offset[page], keyset[page])
+        ]
+        print(f"{page:>6} {cells[0]:>22} {cells[1]:>22}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Time move_location_to_bad() on a large JobPosting table.
+
+Seeds --rows postings (1 in --every is in the blocked city), adds a
+BadLocation the way the admin does, and reports how long the set-based
+reclassification and move take.
+
+    python benchmarks/reclassify_locations.py [--rows 300000] [--every 20]
+"""
+
+import argparse
+import itertools
+import time
+
+from _setup import setup
+
+_CITIES = ["New York, NY", "Remote", "Austin, TX", "San Francisco, CA", "Chicago, IL"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--every", type=int, default=20)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from jobsearch.models import BadJob, JobPosting
+    from jobsearch.utils import move_location_to_bad, normalize_location
+
+    t0 = time.perf_counter()
+    rows = (
+        JobPosting(
+            url=f"https://jobs.lever.co/acme/{i}",
+            company=f"company-{i % 500}",
+            title="Data Engineer",
+            location=location,
+            location_normalized=normalize_location(location),
+            description="Build pipelines. " * 50,
+            source="lever",
+        )
+        for i in range(args.rows)
+        for location in ["Warsaw, Poland" if i % args.every == 0 else _CITIES[i % len(_CITIES)]]
+    )
+    for batch in itertools.batched(rows, 5000, strict=False):
+        JobPosting.objects.bulk_create(batch)
+    print(f"seeded {args.rows} postings in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    moved = move_location_to_bad("Warsaw")
+    elapsed = time.perf_counter() - t0
+    print(f"move_location_to_bad: moved {moved} posting(s) in {elapsed:.3f}s")
+    print(f"JobPosting {JobPosting.objects.count()}, BadJob {BadJob.objects.count()}")
+
+
+if __name__ == "__main__":
+    main()
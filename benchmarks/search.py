@@ -0,0 +1,79 @@
+"""Admin search: icontains scans vs the full-text and trigram indexes.
+
+Seeds --rows postings with random descriptions, indexes them, then times
+what the changelist runs for a search (count + first page of 100): the old
+icontains scan on company and url, the full-text search, and the
+trigram-backed substring search on company and url.
+
+    python benchmarks/search.py [--rows 100000]
+"""
+
+import argparse
+import random
+import time
+
+from _setup import setup
+
+WORDS = [f"w{i}" for i in range(20_000)]
+TITLES = ["Data Engineer", "Sales Manager", "Account Executive", "Backend Developer"]
+
+
+def _seed(rows):
+    from jobsearch.models import JobPosting
+    from jobsearch.search import index_postings
+
+    rng = random.Random(0)
+    t0 = time.perf_counter()
+    for start in range(0, rows, 5000):
+        postings = [
+            JobPosting(
+                url=f"https://jobs.lever.co/company{i % 5000}/{i}",
+                company=f"company{i % 5000}",
+                title=rng.choice(TITLES),
+                description=" ".join(rng.choice(WORDS) for _ in range(300)),
+            )
+            for i in range(start, min(start + 5000, rows))
+        ]
+        JobPosting.objects.bulk_create(postings)
+        index_postings(postings)
+    elapsed = time.perf_counter() - t0
+    print(f"seeded and indexed {rows} postings in {elapsed:.1f}s")
+
+
+def _page(label, queryset):
+    t0 = time.perf_counter()
+    count = queryset.count()
+    page = list(queryset[:100])
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<34} {count:>7} hits, first page in {elapsed * 1000:8.1f}ms ({len(page)})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    setup(migrate=True)
+    from django.db.models import Q
+
+    from jobsearch.models import JobPosting
+    from jobsearch.search import search_postings, substring_q
+
+    _seed(args.rows)
+    postings = JobPosting.objects.defer("description", "minhash").order_by("-pk")
+
+    before = _page(
+        "icontains company/url 'ny123'",
+        postings.filter(Q(company__icontains="ny123") | Q(url__icontains="ny123")),
+    )
+    after = _page("trigram company/url 'ny123'", postings.filter(substring_q(JobPosting, "ny123")))
+    print(f"substring speedup x{before / after:.0f}")
+
+    _page("full text 'data engineer'", search_postings(postings, "data engineer"))
+    _page("full text description 'w123 w456'", search_postings(postings, "w123 w456"))
+    _page("full text description 'w123'", search_postings(postings, "w123"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,72 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
 from django.db.models.query import QuerySet
 from django.http import JsonResponse
 from django.urls import path
-from django.utils import timezone
 from django.utils.html import format_html
 
-from jobsearch.utils import move_company_to_bad
-
-from .models import BadCompany, BadJob, BadLocation, JobPosting
+from jobsearch.pagination import KeysetPaginationMixin
+from jobsearch.search import search_postings, substring_q
+from jobsearch.utils import (
+    move_company_to_bad,
+    move_jobs_to_bad,
+    move_location_to_bad,
+    set_applied,
+)
+
+from .models import (
+    BadCompany,
+    BadJob,
+    BadLocation,
+    JobPosting,
+    SearchQuery,
+    SearchQuota,
+    WatchedCompany,
+)
 
 
 @admin.action(description="Convert to Bad Jobs")
 def convert_to_bad(modeladmin, request, queryset: QuerySet[JobPosting]):
-    for item in queryset:
-        BadJob.objects.create(url=item.url)
-        item.delete()
+    count = move_jobs_to_bad(queryset)
+    modeladmin.message_user(request, f"Moved {count} job(s) to Bad Jobs.")
+
+
+class DuplicateFilter(admin.SimpleListFilter):
+    title = "near-duplicate"
+    parameter_name = "duplicate"
+
+    def lookups(self, request, model_admin):
+        return [("yes", "Yes"), ("no", "No")]
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.exclude(duplicate_of="")
+        if self.value() == "no":
+            return queryset.filter(duplicate_of="")
+        return queryset
+
+
+class WatchedCompanyFilter(admin.SimpleListFilter):
+    title = "watched company"
+    parameter_name = "company"
+
+    def lookups(self, request, model_admin):
+        names = (
+            WatchedCompany.objects.filter(active=True)
+            .order_by("name")
+            .values_list("name", flat=True)
+            .distinct()
+        )
+        return [(name, name) for name in names]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(company=self.value())
+        return queryset
 
 
 @admin.register(JobPosting)
-class JobPostingAdmin(admin.ModelAdmin):
+class JobPostingAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "company",
@@ -29,13 +77,34 @@ class JobPostingAdmin(admin.ModelAdmin):
         "scraped_at",
         "updated_at",
     )
-    search_fields = ("company",)
-    readonly_fields = ("scraped_at", "updated_at")
+    # each filter, and the default ordering, is served by an index in JobPosting.Meta;
+    # "near-duplicate: no" is most of the table and reads it in scraped_at order
+    list_filter = ("is_applied", "posted_date", "scraped_at", WatchedCompanyFilter, DuplicateFilter)
+    # newest scraped first, paged by keyset on (scraped_at, id), see jobsearch.pagination
+    ordering = ("-scraped_at",)
+    # answered by get_search_results from the search indexes, description included
+    search_fields = ("title", "company", "url")
+    readonly_fields = ("scraped_at", "updated_at", "duplicate_of")
     actions = [convert_to_bad]
 
     class Media:
         js = ("jobsearch/admin/autosave_applied.js",)
 
+    def get_queryset(self, request):
+        # the changelist never shows descriptions; the change form loads it on access
+        return super().get_queryset(request).defer("description", "minhash")
+
+    def get_ordering(self, request):
+        # searches are ordered by rank instead, see get_search_results
+        if request.GET.get(SEARCH_VAR):
+            return ()
+        return super().get_ordering(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_postings(queryset, search_term), False
+
     def display_url(self, obj):
         return format_html('<a href="{}">{}</a>', obj.url, obj.source)
 
@@ -52,33 +121,59 @@ class JobPostingAdmin(admin.ModelAdmin):
     def get_urls(self):
         urls = super().get_urls()
         custom = [
+            path(
+                "toggle-applied/",
+                self.admin_site.admin_view(self.toggle_applied_bulk_view),
+            ),
             path(
                 "toggle-applied/<int:pk>/",
                 self.admin_site.admin_view(self.toggle_applied_view),
-            )
+            ),
         ]
         return custom + urls
 
     def toggle_applied_view(self, request, pk):
-        value = request.POST.get("value") == "1"
-        JobPosting.objects.filter(pk=pk).update(
-            is_applied=value,
-            updated_at=timezone.now(),
-        )
+        set_applied({pk: request.POST.get("value") == "1"})
         return JsonResponse({"status": "ok"})
 
+    def toggle_applied_bulk_view(self, request):
+        """Apply the pk=<id>&value=<0|1> pairs of one POST; a repeated pk takes its last value."""
+        pks, values = request.POST.getlist("pk"), request.POST.getlist("value")
+        if request.method != "POST" or len(pks) != len(values):
+            return JsonResponse({"status": "error"}, status=400)
+        try:
+            changes = {int(pk): value == "1" for pk, value in zip(pks, values, strict=True)}
+        except ValueError:
+            return JsonResponse({"status": "error"}, status=400)
+        return JsonResponse({"status": "ok", "updated": set_applied(changes)})
+
 
 @admin.register(BadJob)
-class BadJobAdmin(admin.ModelAdmin):
+class BadJobAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_display = ("title", "company", "location", "url")
+    list_filter = ("scraped_at",)
+    ordering = ("-scraped_at",)
     search_fields = ("company", "url")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("description")
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(substring_q(BadJob, search_term, using=queryset.db)), False
+
 
 @admin.register(BadLocation)
 class BadLocationAdmin(admin.ModelAdmin):
     list_display = ("pattern",)
     search_fields = ("pattern",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        count = move_location_to_bad(obj.pattern)
+        self.message_user(request, f"Moved {count} job(s) in '{obj.pattern}' to Bad Jobs.")
+
 
 @admin.register(BadCompany)
 class BadCompanyAdmin(admin.ModelAdmin):
@@ -90,3 +185,31 @@ class BadCompanyAdmin(admin.ModelAdmin):
         if not change:
             count = move_company_to_bad(obj.name)
             self.message_user(request, f"Moved {count} job(s) from '{obj.name}' to Bad Jobs.")
+
+
+@admin.register(WatchedCompany)
+class WatchedCompanyAdmin(admin.ModelAdmin):
+    list_display = ("name", "source", "active", "last_ingested_at")
+    list_filter = ("source", "active")
+    search_fields = ("name",)
+    readonly_fields = ("last_ingested_at",)
+
+
+@admin.register(SearchQuery)
+class SearchQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        "query",
+        "exclude_terms",
+        "active",
+        "recent_yield",
+        "last_run_at",
+        "last_succeeded_at",
+    )
+    list_filter = ("active",)
+    search_fields = ("query",)
+    readonly_fields = ("recent_yield", "last_run_at", "last_succeeded_at", "last_failed_at")
+
+
+@admin.register(SearchQuota)
+class SearchQuotaAdmin(admin.ModelAdmin):
+    list_display = ("day", "calls")
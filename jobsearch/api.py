@@ -0,0 +1,190 @@
+"""Read-only JSON API over JobPosting and BadJob, for dashboards and pollers.
+
+    GET /api/postings/?company=acme&is_applied=false&fields=title,url
+    GET /api/bad-jobs/?limit=500
+
+Rows come newest scraped first, API_PAGE_SIZE at a time (?limit= up to
+MAX_LIMIT). "next" continues after the last row with a keyset cursor on
+(scraped_at, id), as the admin changelists do (jobsearch.pagination), so
+deep pages cost the same as the first.
+
+- ?fields= picks the columns. id is always included; description, the
+  only large one, only when asked for.
+- ?company=, ?source=, ?posted_date= (also posted_date__gte/__lte) and, for
+  postings, ?is_applied= filter the rows.
+- Each page has an ETag over its rows' ids and updated_at, and a
+  Last-Modified of the newest updated_at. A poller sending them back gets
+  a 304 after one small index read, without any row being serialized.
+
+/api/postings/export/ and /api/bad-jobs/export/ stream every row (or
+those updated after ?since=) as gzip NDJSON or CSV, see jobsearch.export.
+
+Staff sessions can read the API; so can requests carrying
+"Authorization: Bearer <API_TOKEN>" when settings.API_TOKEN is set.
+"""
+
+import hashlib
+import hmac
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, Model, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from jobsearch.export import Export, export_fields
+from jobsearch.models import BadJob, JobPosting
+from jobsearch.pagination import AFTER_VAR, beyond_cursor, make_cursor
+
+MAX_LIMIT = 1000
+COMMON_FILTERS = ("company", "source", "posted_date", "posted_date__gte", "posted_date__lte")
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+@require_safe
+def postings(request):
+    return _list(request, JobPosting, (*COMMON_FILTERS, "is_applied"))
+
+
+@require_safe
+def bad_jobs(request):
+    return _list(request, BadJob, COMMON_FILTERS)
+
+
+@require_safe
+def postings_export(request):
+    return _export(request, JobPosting)
+
+
+@require_safe
+def bad_jobs_export(request):
+    return _export(request, BadJob)
+
+
+def _unauthorized() -> JsonResponse:
+    response = JsonResponse({"error": "Authentication required"}, status=401)
+    response.headers["WWW-Authenticate"] = "Bearer"
+    return response
+
+
+def _list(request, model: type[Model], filters: tuple[str, ...]) -> JsonResponse:
+    if not _authorized(request):
+        return _unauthorized()
+    try:
+        fields = _fields(model, request.GET.get("fields"))
+        limit = _limit(request.GET.get("limit"))
+        queryset = model.objects.filter(_filters(model, request.GET, filters))
+        if after := request.GET.get(AFTER_VAR):
+            queryset = queryset.filter(beyond_cursor(model, "scraped_at", after))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    queryset = queryset.order_by("-scraped_at", "-pk")
+
+    # validators first, from the keys alone
+    keys = list(queryset.values_list("pk", "scraped_at", "updated_at")[: limit + 1])
+    keys, more = keys[:limit], len(keys) > limit
+    digest = hashlib.sha256(request.get_full_path().encode())
+    for pk, _, updated_at in keys:
+        digest.update(f"{pk}:{updated_at.isoformat()};".encode())
+    etag = f'"{digest.hexdigest()[:32]}"'
+    newest = max((updated_at for *_, updated_at in keys), default=None)
+    last_modified = newest and int(newest.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        rows = queryset.filter(pk__in=[pk for pk, *_ in keys]).values(*fields)
+        next_url = None
+        if more:
+            params = request.GET.copy()
+            params[AFTER_VAR] = make_cursor(keys[-1][1], keys[-1][0])
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        response = JsonResponse({"results": list(rows), "next": next_url})
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    # may be stored, but only by the caller, and must be revalidated
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Authorization", "Cookie"))
+    return response
+
+
+def _export(request, model: type[Model]) -> StreamingHttpResponse | JsonResponse:
+    if not _authorized(request):
+        return _unauthorized()
+    try:
+        if unknown := sorted(set(request.GET) - {"format", "fields", "since"}):
+            raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+        since = _since(request.GET.get("since"))
+        fields = _fields(model, request.GET["fields"]) if "fields" in request.GET else None
+        export = Export(model, request.GET.get("format", "ndjson"), since, fields)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    response = StreamingHttpResponse(export, content_type="application/gzip")
+    name = f"{model._meta.model_name}-{export.until:%Y%m%dT%H%M%SZ}.{export.fmt}.gz"
+    response.headers["Content-Disposition"] = f'attachment; filename="{name}"'
+    # pass back as ?since= for the rows changed after this export
+    response.headers["X-Export-Until"] = export.until.isoformat()
+    return response
+
+
+def _authorized(request) -> bool:
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = settings.API_TOKEN
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def _fields(model: type[Model], requested: str | None) -> list[str]:
+    available = export_fields(model)
+    if not requested:
+        return [name for name in available if name != "description"]
+    names = [name.strip() for name in requested.split(",") if name.strip()]
+    if unknown := sorted(set(names) - set(available)):
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id", *(name for name in dict.fromkeys(names) if name != "id")]
+
+
+def _since(raw: str | None) -> datetime | None:
+    if raw is None:
+        return None
+    if (since := parse_datetime(raw)) is None:
+        raise ValueError(f"Invalid since {raw!r}")
+    return timezone.make_aware(since) if timezone.is_naive(since) else since
+
+
+def _limit(raw: str | None) -> int:
+    if raw is None:
+        return settings.API_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid limit {raw!r}") from None
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def _filters(model: type[Model], params, allowed: tuple[str, ...]) -> Q:
+    known = {*allowed, "fields", "limit", AFTER_VAR}
+    if unknown := sorted(set(params) - known):
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+    q = Q()
+    for lookup in allowed:
+        if (raw := params.get(lookup)) is None:
+            continue
+        field = model._meta.get_field(lookup.partition("__")[0])
+        try:
+            # BooleanField.to_python() takes "True"/"1" but not the usual "true"
+            value = (
+                BOOLEANS[raw.lower()] if isinstance(field, BooleanField) else field.to_python(raw)
+            )
+        except (KeyError, ValidationError):
+            raise ValueError(f"Invalid {lookup} {raw!r}") from None
+        q &= Q(**{lookup: value})
+    return q
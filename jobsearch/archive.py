@@ -0,0 +1,41 @@
+import hashlib
+import zlib
+from collections.abc import Iterable, Iterator
+
+from jobsearch.models import RawPage
+
+
+def store_pages(pages: Iterable[tuple[str, str, str]]) -> int:
+    """Archive (url, source, body) triples; bodies already archived are skipped.
+
+    Returns the number of pages passed in.
+    """
+    rows = []
+    for url, source, body in pages:
+        raw = body.encode()
+        rows.append(
+            RawPage(
+                digest=hashlib.sha256(raw).hexdigest(),
+                url=url,
+                source=source,
+                body=zlib.compress(raw),
+            )
+        )
+    RawPage.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def iter_pages(source: str | None = None, chunk_size: int = 500) -> Iterator[tuple[str, str, str]]:
+    """Yield (url, source, body) for the most recently archived body of every url."""
+    pages = RawPage.objects.order_by("url", "-fetched_at", "-id")
+    if source:
+        pages = pages.filter(source=source)
+
+    last_url = None
+    for url, page_source, body in pages.values_list("url", "source", "body").iterator(
+        chunk_size=chunk_size
+    ):
+        if url == last_url:
+            continue
+        last_url = url
+        yield url, page_source, zlib.decompress(body).decode()
@@ -0,0 +1,98 @@
+import html
+from datetime import UTC, datetime
+
+from bs4 import BeautifulSoup
+
+from jobsearch.http_client import get_client
+from jobsearch.sources import route
+
+GREENHOUSE_BOARD_URL = "https://boards-api.greenhouse.io/v1/boards/{company}/jobs?content=true"
+LEVER_BOARD_URL = "https://api.lever.co/v0/postings/{company}?mode=json"
+ASHBY_BOARD_URL = "https://api.ashbyhq.com/posting-api/job-board/{company}"
+GREENHOUSE_POSTING_URL = "https://job-boards.greenhouse.io/{company}/jobs/{id}"
+
+type BoardJobs = dict[str, tuple[str, str, str, str, str | None]]
+
+
+def _date(value: str | None) -> str | None:
+    # boards return full ISO timestamps; posted_date only keeps the day
+    return value[:10] if value else None
+
+
+def _posting_url(url: str) -> str:
+    # the URL scrape_jobs stores for the same posting, so the two dedupe
+    adapter = route(url)
+    return adapter.normalize(url) if adapter is not None else url
+
+
+def fetch_greenhouse_board(company: str) -> BoardJobs:
+    """Every open job on a Greenhouse board, keyed by posting URL."""
+    r = get_client().get(GREENHOUSE_BOARD_URL.format(company=company))
+    r.raise_for_status()
+
+    jobs: BoardJobs = {}
+    for job in r.json().get("jobs", []):
+        content = html.unescape(job.get("content") or "")
+        description = BeautifulSoup(content, "html.parser").get_text(strip=True)
+        location = (job.get("location") or {}).get("name", "")
+        url = job["absolute_url"]
+        if route(url) is None and job.get("id"):
+            # a company careers page embedding the board
+            url = GREENHOUSE_POSTING_URL.format(company=company, id=job["id"])
+        jobs[_posting_url(url)] = (
+            company,
+            job.get("title", ""),
+            location,
+            description,
+            _date(job.get("first_published")),
+        )
+    return jobs
+
+
+def fetch_lever_board(company: str) -> BoardJobs:
+    """Every open job on a Lever board, keyed by posting URL."""
+    r = get_client().get(LEVER_BOARD_URL.format(company=company))
+    r.raise_for_status()
+
+    jobs: BoardJobs = {}
+    for job in r.json():
+        created_at = job.get("createdAt")
+        date_posted = (
+            datetime.fromtimestamp(created_at / 1000, tz=UTC).date().isoformat()
+            if created_at
+            else None
+        )
+        jobs[_posting_url(job["hostedUrl"])] = (
+            company,
+            job.get("text", ""),
+            (job.get("categories") or {}).get("location", ""),
+            job.get("description", ""),
+            date_posted,
+        )
+    return jobs
+
+
+def fetch_ashby_board(company: str) -> BoardJobs:
+    """Every listed job on an Ashby board, keyed by posting URL."""
+    r = get_client().get(ASHBY_BOARD_URL.format(company=company))
+    r.raise_for_status()
+
+    jobs: BoardJobs = {}
+    for job in r.json().get("jobs", []):
+        if job.get("isListed") is False:
+            continue
+        jobs[_posting_url(job["jobUrl"])] = (
+            company,
+            job.get("title", ""),
+            job.get("location", ""),
+            job.get("descriptionHtml", ""),
+            _date(job.get("publishedAt")),
+        )
+    return jobs
+
+
+BOARD_FETCHERS = {
+    "greenhouse": (GREENHOUSE_BOARD_URL, fetch_greenhouse_board),
+    "lever": (LEVER_BOARD_URL, fetch_lever_board),
+    "ashby": (ASHBY_BOARD_URL, fetch_ashby_board),
+}
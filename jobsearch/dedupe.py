@@ -0,0 +1,209 @@
+"""Near-duplicate postings: MinHash signatures and an LSH band index.
+
+Each posting's title, company and description are cut into word 3-grams
+("shingles"). A 64-value MinHash signature summarises the shingle set, and
+the share of equal values between two signatures estimates the Jaccard
+similarity of their texts. The signature is cut into 16 bands of 4 values;
+each band is hashed to a PostingBand key. Postings sharing any band key are
+candidates, so a new posting is only compared with a handful of rows instead
+of the whole table. With 16x4 bands, pairs at 0.8 similarity share a band
+with probability > 0.999, pairs at 0.3 with about 0.12.
+
+Signatures use one-permutation hashing: every shingle is hashed once and
+the hash picks both a bin and the value competing for that bin's minimum.
+Empty bins borrow from the next filled bin (rotation densification). This
+costs one hash per shingle instead of one per shingle per permutation.
+"""
+
+import hashlib
+import re
+import struct
+from collections.abc import Iterable, Sequence
+
+from django.conf import settings
+
+from jobsearch.models import BadJob, JobPosting, PostingBand
+from jobsearch.utils import plain_text
+
+NUM_BINS = 64
+BANDS = 16
+ROWS = NUM_BINS // BANDS
+SHINGLE_SIZE = 3
+
+_EMPTY = 1 << 32
+_ROTATION = 0x9E3779B9
+_SIGNATURE = struct.Struct(f"<{NUM_BINS}I")
+_WORD = re.compile(r"\w+")
+
+type Signature = tuple[int, ...]
+
+
+def _hash64(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def shingles(text: str) -> set[int]:
+    """64-bit hashes of the word 3-grams of text, with HTML tags and case dropped."""
+    words = _WORD.findall(plain_text(text).lower())
+    if len(words) < SHINGLE_SIZE:
+        return {_hash64(" ".join(words).encode())} if words else set()
+    return {
+        _hash64(" ".join(words[i : i + SHINGLE_SIZE]).encode())
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def posting_text(posting: JobPosting) -> str:
+    return f"{posting.title}\n{posting.company}\n{posting.description}"
+
+
+def signature(hashes: Iterable[int]) -> Signature | None:
+    """MinHash signature of a shingle set, or None when there is nothing to hash."""
+    bins = [_EMPTY] * NUM_BINS
+    for h in hashes:
+        i = h % NUM_BINS
+        value = h >> 32
+        if value < bins[i]:
+            bins[i] = value
+    if all(value == _EMPTY for value in bins):
+        return None
+
+    filled = bins[:]
+    for i in range(NUM_BINS):
+        if filled[i] != _EMPTY:
+            continue
+        distance = 1
+        while filled[(i + distance) % NUM_BINS] == _EMPTY:
+            distance += 1
+        bins[i] = (filled[(i + distance) % NUM_BINS] + distance * _ROTATION) & 0xFFFFFFFF
+    return tuple(bins)
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b, strict=True)) / NUM_BINS
+
+
+def band_keys(sig: Signature) -> list[int]:
+    """One signed 64-bit key per band, as stored in PostingBand.key."""
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f"<B{ROWS}I", band, *sig[band * ROWS : (band + 1) * ROWS])
+        keys.append(
+            int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+        )
+    return keys
+
+
+def pack(sig: Signature) -> bytes:
+    return _SIGNATURE.pack(*sig)
+
+
+def unpack(data: bytes | memoryview) -> Signature:
+    return _SIGNATURE.unpack(bytes(data))
+
+
+class DuplicateDetector:
+    """Find stored postings that nearly match new ones, before they are written.
+
+    check() signs each JobPosting (setting `minhash`) and points
+    `duplicate_of` at the canonical URL of the closest match at or above
+    `threshold` similarity, looking at indexed postings and at earlier
+    postings of the same batch. With `suppress`, duplicates come back as
+    BadJob rows instead, so they are recorded as seen but kept out of
+    JobPosting. index() adds the band keys of written postings.
+    """
+
+    def __init__(self, threshold: float | None = None, suppress: bool = False) -> None:
+        self.threshold = settings.DUPLICATE_THRESHOLD if threshold is None else threshold
+        self.suppress = suppress
+
+    def check(self, objs: list[JobPosting | BadJob]) -> list[JobPosting | BadJob]:
+        signed = []
+        for obj in objs:
+            if not isinstance(obj, JobPosting):
+                continue
+            sig = signature(shingles(posting_text(obj)))
+            if sig is None:
+                continue
+            obj.minhash = pack(sig)
+            signed.append((obj, sig, band_keys(sig)))
+        if not signed:
+            return objs
+
+        stored = self._candidates({key for _, _, keys in signed for key in keys})
+        batch: dict[int, list[tuple[str, Signature]]] = {}
+        suppressed = {}
+        for obj, sig, keys in signed:
+            best, canonical = self.threshold, None
+            seen = set()
+            for key in keys:
+                for url, other, other_canonical in stored.get(key, ()):
+                    if url in seen or url == obj.url:
+                        continue
+                    seen.add(url)
+                    score = similarity(sig, other)
+                    if score >= best:
+                        best, canonical = score, other_canonical or url
+            if canonical is None:
+                for key in keys:
+                    for url, other in batch.get(key, ()):
+                        score = similarity(sig, other)
+                        if score >= best:
+                            best, canonical = score, url
+            if canonical is not None:
+                obj.duplicate_of = canonical
+                if self.suppress:
+                    suppressed[id(obj)] = _as_bad_job(obj)
+                continue
+            for key in keys:
+                batch.setdefault(key, []).append((obj.url, sig))
+        return [suppressed.get(id(obj), obj) for obj in objs]
+
+    @staticmethod
+    def _candidates(keys: set[int]) -> dict[int, list[tuple[str, Signature, str]]]:
+        """(url, signature, duplicate_of) of stored postings per band key."""
+        bands = list(PostingBand.objects.filter(key__in=keys).values_list("key", "posting_id"))
+        if not bands:
+            return {}
+        rows = {
+            pk: (url, unpack(minhash), duplicate_of)
+            for pk, url, minhash, duplicate_of in JobPosting.objects.filter(
+                pk__in={pk for _, pk in bands}, minhash__isnull=False
+            ).values_list("pk", "url", "minhash", "duplicate_of")
+        }
+        candidates: dict[int, list[tuple[str, Signature, str]]] = {}
+        for key, pk in bands:
+            # bands of postings moved to BadJob are left behind; skip them
+            if pk in rows:
+                candidates.setdefault(key, []).append(rows[pk])
+        return candidates
+
+    @staticmethod
+    def index(objs: Iterable[JobPosting | BadJob]) -> None:
+        signed = {
+            obj.url: unpack(obj.minhash)
+            for obj in objs
+            if isinstance(obj, JobPosting) and obj.minhash is not None
+        }
+        if not signed:
+            return
+        pks = JobPosting.objects.filter(url__in=signed).values_list("url", "pk")
+        PostingBand.objects.bulk_create(
+            [
+                PostingBand(posting_id=pk, band=band, key=key)
+                for url, pk in pks
+                for band, key in enumerate(band_keys(signed[url]))
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def _as_bad_job(posting: JobPosting) -> BadJob:
+    return BadJob(
+        **{
+            f.attname: getattr(posting, f.attname)
+            for f in BadJob._meta.concrete_fields
+            if not f.primary_key
+        }
+    )
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `burst` tokens."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # the bucket outlives a single asyncio.run(), but a Lock is bound to one loop
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self) -> None:
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host; hosts not listed in `rates` get `default_rate`."""
+
+    def __init__(self, rates: dict[str, float], default_rate: float = 1.0) -> None:
+        self.rates = rates
+        self.default_rate = default_rate
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or ""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rates.get(host, self.default_rate))
+        return self._buckets[host]
+
+    async def acquire(self, url: str) -> None:
+        await self.bucket(url).acquire()
+
+
+async def _fetch_all[T](
+    jobs: Sequence[tuple[str, Callable[[str], T]]],
+    concurrency: int,
+    limiter: HostRateLimiter,
+) -> list[T | BaseException]:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(url: str, parser: Callable[[str], T]) -> T:
+        # wait for the host's token before taking a global slot, so a slow
+        # host does not hold slots that other hosts could be using
+        await limiter.acquire(url)
+        async with semaphore:
+            return await asyncio.to_thread(parser, url)
+
+    return await asyncio.gather(*(run(url, parser) for url, parser in jobs), return_exceptions=True)
+
+
+def fetch_all[T](
+    jobs: Sequence[tuple[str, Callable[[str], T]]],
+    concurrency: int,
+    limiter: HostRateLimiter,
+) -> list[T | BaseException]:
+    """Run `parser(url)` for every (url, parser) pair concurrently.
+
+    At most `concurrency` parsers run at once, and each host is held to its
+    `limiter` budget. Pass the same limiter across calls so the budget holds
+    between batches. Results are returned in input order; a parser that
+    raised is returned as its exception.
+    """
+    if not jobs:
+        return []
+    return asyncio.run(_fetch_all(jobs, concurrency, limiter))
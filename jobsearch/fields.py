@@ -0,0 +1,68 @@
+import zlib
+
+from django import forms
+from django.db import models
+
+
+class CompressedTextField(models.BinaryField):
+    """Text stored zlib-compressed in a binary column.
+
+    Python code reads and writes plain str; only the database sees bytes.
+    The column cannot be filtered on (contains/icontains would compare
+    compressed bytes), so search goes through a separate index.
+    """
+
+    description = "Text (zlib-compressed)"
+
+    def __init__(self, *args, level: int = 6, **kwargs) -> None:
+        self.level = level
+        kwargs.setdefault("editable", True)
+        kwargs.setdefault("default", "")
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.level != 6:
+            kwargs["level"] = self.level
+        # BinaryField drops editable=True from its kwargs; ours defaults to it
+        if not self.editable:
+            kwargs["editable"] = False
+        else:
+            kwargs.pop("editable", None)
+        if kwargs.get("default") == "":
+            del kwargs["default"]
+        return name, path, args, kwargs
+
+    def compress(self, value: str) -> bytes:
+        return zlib.compress(value.encode(), self.level)
+
+    @staticmethod
+    def decompress(value: bytes | memoryview) -> str:
+        return zlib.decompress(bytes(value)).decode()
+
+    def _check_str_default_value(self):
+        # defaults are text here, unlike on BinaryField
+        return []
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, str):
+            value = self.compress(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.decompress(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return self.decompress(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return super().formfield(
+            **{"form_class": forms.CharField, "widget": forms.Textarea, **kwargs}
+        )
@@ -0,0 +1,61 @@
+import importlib.util
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import httpx
+from django.conf import settings
+
+USER_AGENT = "job-scraper-bot/1.0"
+
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+
+
+def build_client() -> httpx.Client:
+    """Create a pooled httpx.Client configured from settings.HTTP_CLIENT.
+
+    Keep-alive connections are reused across requests to the same host, so
+    the TCP/TLS handshake and DNS lookup happen once per pooled connection
+    instead of once per request. HTTP/2 is only enabled when `h2` is installed.
+    """
+    conf = settings.HTTP_CLIENT
+    http2 = conf["HTTP2"] and importlib.util.find_spec("h2") is not None
+    return httpx.Client(
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(
+            max_connections=conf["MAX_CONNECTIONS"],
+            max_keepalive_connections=conf["MAX_KEEPALIVE_CONNECTIONS"],
+            keepalive_expiry=conf["KEEPALIVE_EXPIRY"],
+        ),
+        timeout=httpx.Timeout(conf["TIMEOUT"], connect=conf["CONNECT_TIMEOUT"]),
+        http2=http2,
+        # e.g. boards.greenhouse.io links answer with a redirect to job-boards
+        follow_redirects=True,
+    )
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide client shared by all source parsers."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = build_client()
+        return _client
+
+
+def close_client() -> None:
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+@contextmanager
+def shared_client() -> Iterator[httpx.Client]:
+    """Hold the shared client open for the duration of a command, then close it."""
+    try:
+        yield get_client()
+    finally:
+        close_client()
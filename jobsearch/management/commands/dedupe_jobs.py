@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobsearch.dedupe import DuplicateDetector
+from jobsearch.models import JobPosting, PostingBand
+
+
+class Command(BaseCommand):
+    help = "Sign stored JobPostings with MinHash, index their LSH bands and link near-duplicates"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of postings signed and written per transaction",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            help="Similarity at or above which postings are linked (default: DUPLICATE_THRESHOLD)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop all signatures, bands and links first and re-sign every posting",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete the bands of postings that no longer exist first",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        batch_size = max(1, int(options["batch_size"]))
+        detector = DuplicateDetector(threshold=options["threshold"])
+
+        if options["rebuild"]:
+            with transaction.atomic():
+                PostingBand.objects.all().delete()
+                JobPosting.objects.update(minhash=None, duplicate_of="")
+        elif options["prune"]:
+            pruned, _ = PostingBand.objects.exclude(
+                posting_id__in=JobPosting.objects.values("pk")
+            ).delete()
+            self.stdout.write(f"Pruned {pruned} band(s) of deleted postings.")
+
+        # oldest first, so the earliest posting of a group stays the canonical one
+        postings = (
+            JobPosting.objects.filter(minhash__isnull=True)
+            .only("pk", "url", "title", "company", "description", "duplicate_of")
+            .order_by("pk")
+        )
+        signed = linked = 0
+        last_pk = 0
+        while batch := list(postings.filter(pk__gt=last_pk)[:batch_size]):
+            last_pk = batch[-1].pk
+            detector.check(batch)
+            batch = [job for job in batch if job.minhash is not None]
+            with transaction.atomic():
+                JobPosting.objects.bulk_update(batch, ["minhash", "duplicate_of"])
+                detector.index(batch)
+            signed += len(batch)
+            linked += sum(1 for job in batch if job.duplicate_of)
+
+        self.stdout.write(f"Signed {signed} posting(s), {linked} linked as near-duplicates.")
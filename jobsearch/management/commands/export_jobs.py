@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from jobsearch.export import FORMATS, Export, export_fields
+from jobsearch.models import BadJob, JobPosting
+
+MODELS = {"postings": JobPosting, "bad-jobs": BadJob}
+
+
+class Command(BaseCommand):
+    help = "Export JobPostings or BadJobs as gzip-compressed NDJSON or CSV, streamed in chunks"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--model", choices=MODELS, default="postings")
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write, or - for stdout (default)",
+        )
+        parser.add_argument(
+            "--fields",
+            help="Comma-separated fields to export (default: all, description included)",
+        )
+        parser.add_argument(
+            "--since",
+            help="Only rows updated after this ISO 8601 timestamp",
+        )
+        parser.add_argument(
+            "--watermark-file",
+            help="Export rows updated since the timestamp stored in this file, then store "
+            "the new watermark there",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database cursor at a time",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        model = MODELS[options["model"]]
+        watermark = Path(options["watermark_file"]) if options["watermark_file"] else None
+        since = options["since"]
+        if since is None and watermark is not None and watermark.exists():
+            since = watermark.read_text().strip()
+        if since is not None:
+            parsed = parse_datetime(since)
+            if parsed is None:
+                raise CommandError(f"Invalid timestamp {since!r}")
+            since = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+        fields = None
+        if options["fields"]:
+            fields = [name.strip() for name in options["fields"].split(",")]
+            if unknown := sorted(set(fields) - set(export_fields(model))):
+                raise CommandError(f"Unknown fields: {', '.join(unknown)}")
+
+        export = Export(
+            model, options["format"], since, fields, chunk_size=max(1, options["chunk_size"])
+        )
+        if options["output"] == "-":
+            self._write(export, sys.stdout.buffer)
+        else:
+            with open(options["output"], "wb") as out:
+                self._write(export, out)
+
+        # only once everything is written, so a failed export is retried in full
+        if watermark is not None:
+            watermark.write_text(export.until.isoformat())
+        self.stderr.write(
+            f"Exported {export.count} {model._meta.verbose_name_plural} "
+            f"(next watermark {export.until.isoformat()})."
+        )
+
+    @staticmethod
+    def _write(export: Export, out) -> None:
+        for chunk in export:
+            out.write(chunk)
+        out.flush()
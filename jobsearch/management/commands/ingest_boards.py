@@ -0,0 +1,102 @@
+import traceback
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jobsearch.boards import BOARD_FETCHERS
+from jobsearch.dedupe import DuplicateDetector
+from jobsearch.fetch import HostRateLimiter, fetch_all
+from jobsearch.http_client import shared_client
+from jobsearch.models import BadCompany, WatchedCompany
+from jobsearch.utils import known_urls, location_matcher
+from jobsearch.writer import PostingWriter, build_posting
+
+
+class Command(BaseCommand):
+    help = "Pull whole job boards of watched companies from the ATS APIs and save new jobs"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--company",
+            action="append",
+            default=[],
+            metavar="SOURCE:NAME",
+            help="Ingest this board instead of the WatchedCompany list (repeatable)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.SCRAPE_CONCURRENCY,
+            help="Maximum number of boards fetched at once",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SCRAPE_WRITE_BATCH_SIZE,
+            help="Number of rows written per bulk insert",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        targets = []
+        for value in options["company"]:
+            source, _, name = str(value).partition(":")
+            if source not in BOARD_FETCHERS or not name:
+                raise CommandError(
+                    f"--company must look like SOURCE:NAME with SOURCE in "
+                    f"{', '.join(BOARD_FETCHERS)}, got {value!r}"
+                )
+            targets.append((source, name))
+        if not targets:
+            targets = list(WatchedCompany.objects.filter(active=True).values_list("source", "name"))
+        if not targets:
+            self.stdout.write("No companies to ingest.")
+            return
+
+        self.stdout.write(f"Ingesting {len(targets)} job board(s)...")
+        with shared_client():
+            self.ingest(targets, int(options["concurrency"]), int(options["batch_size"]))
+
+    def ingest(self, targets: list[tuple[str, str]], concurrency: int, batch_size: int) -> None:
+        limiter = HostRateLimiter(
+            settings.SCRAPE_HOST_RATES, default_rate=settings.SCRAPE_DEFAULT_HOST_RATE
+        )
+        writer = PostingWriter(
+            batch_size=batch_size,
+            on_error=lambda url, e: self.stderr.write(f"Failed to write in db {url}: {e}"),
+            dedupe=DuplicateDetector(suppress=settings.SCRAPE_SUPPRESS_DUPLICATES),
+        )
+        bad_companies = set(BadCompany.objects.values_list("name", flat=True))
+        locations = location_matcher()
+
+        # one listing request per company
+        jobs = []
+        for source, name in targets:
+            board_url, fetcher = BOARD_FETCHERS[source]
+            jobs.append((board_url.format(company=name), lambda _, f=fetcher, n=name: f(n)))
+        boards = fetch_all(jobs, concurrency=concurrency, limiter=limiter)
+
+        try:
+            for (source, name), board in zip(targets, boards, strict=True):
+                if isinstance(board, BaseException):
+                    self.stderr.write(f"Failed fetch board {source}:{name}: {board}")
+                    continue
+
+                seen = known_urls(list(board))
+                new_urls = [url for url in board if url not in seen]
+                for url in new_urls:
+                    writer.add(build_posting(url, source, board[url], bad_companies, locations))
+                WatchedCompany.objects.filter(source=source, name=name).update(
+                    last_ingested_at=timezone.now()
+                )
+                self.stdout.write(f"{source}:{name}: {len(board)} open job(s), {len(new_urls)} new")
+        except Exception as e:
+            self.stderr.write(f"Fatal error: {e}")
+            traceback.print_exc()
+            return
+        finally:
+            writer.flush()
+
+        self.stdout.write(f"Added {len(writer.written)} new job postings.")
+        for jp in writer.written:
+            self.stdout.write(f" - {jp.title} | {jp.url}")
@@ -0,0 +1,117 @@
+import itertools
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobsearch.archive import iter_pages
+from jobsearch.dedupe import DuplicateDetector
+from jobsearch.models import BadJob, JobPosting, PostingBand
+from jobsearch.search import index_postings
+from jobsearch.sources import get_adapter, source_names
+from jobsearch.utils import location_matcher, move_jobs_to_bad, normalize_location
+
+REPARSED_FIELDS = [
+    "company",
+    "title",
+    "location",
+    "location_normalized",
+    "location_allowed",
+    "description",
+    "posted_date",
+    # bulk_update() skips auto_now; incremental exports need the bump
+    "updated_at",
+]
+
+
+class Command(BaseCommand):
+    help = "Re-run the source parsers over archived RawPage bodies and update stored jobs"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--source",
+            choices=source_names(),
+            help="Only re-parse pages from this source",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of pages re-parsed and written per bulk update",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Parse everything but do not write",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        batch_size = int(options["batch_size"])
+        dry_run = bool(options["dry_run"])
+        pages = iter_pages(source=options["source"], chunk_size=batch_size)
+        self.locations = location_matcher()
+        self.dedupe = DuplicateDetector()
+        self.moved = 0
+
+        parsed_count = failed = updated = 0
+        for batch in itertools.batched(pages, batch_size, strict=False):
+            parsed = {}
+            for url, source, body in batch:
+                try:
+                    adapter = get_adapter(source)
+                except KeyError:
+                    continue
+                try:
+                    parsed[url] = adapter.extract(url, body)
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Failed parse {url}: {e}")
+            parsed_count += len(parsed)
+            if not dry_run:
+                updated += self.apply(parsed)
+
+        self.stdout.write(
+            f"Re-parsed {parsed_count} page(s), {failed} failed, {updated} job(s) updated, "
+            f"{self.moved} moved to BadJob."
+        )
+
+    def apply(self, parsed: dict[str, tuple]) -> int:
+        updated = 0
+        blocked = []
+        now = timezone.now()
+        for model in (JobPosting, BadJob):
+            # description is overwritten below, no need to read (and decompress) it
+            rows = model.objects.defer("description").in_bulk(list(parsed), field_name="url")
+            for url, row in rows.items():
+                company, title, location, description, date_posted = parsed[url]
+                row.company = company
+                row.title = title or row.title
+                row.location = location
+                row.location_normalized = normalize_location(location)
+                row.location_allowed = self.locations.allows(location)
+                row.description = description
+                row.posted_date = date_posted or row.posted_date
+                row.updated_at = now
+            with transaction.atomic():
+                if model is not JobPosting:
+                    model.objects.bulk_update(rows.values(), REPARSED_FIELDS)
+                else:
+                    # the text changed, so the signature and bands did too; oldest
+                    # first, so the earliest posting of a group stays the canonical one
+                    postings = sorted(rows.values(), key=lambda row: row.pk)
+                    PostingBand.objects.filter(posting_id__in=[row.pk for row in postings]).delete()
+                    for row in postings:
+                        row.minhash = None
+                        row.duplicate_of = ""
+                    self.dedupe.check(postings)
+                    model.objects.bulk_update(
+                        postings, [*REPARSED_FIELDS, "minhash", "duplicate_of"]
+                    )
+                    self.dedupe.index(postings)
+                    index_postings(postings)
+                    blocked = [row.pk for row in postings if not row.location_allowed]
+            updated += len(rows)
+        # postings whose re-parsed location is now blocked go where scrape_jobs files them
+        if blocked:
+            self.moved += move_jobs_to_bad(JobPosting.objects.filter(pk__in=blocked))
+        return updated
@@ -1,121 +1,416 @@
+import argparse
+import itertools
 import time
 import traceback
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
 
-from jobsearch.models import BadCompany, BadJob, BadLocation, JobPosting
+from jobsearch.archive import store_pages
+from jobsearch.dedupe import DuplicateDetector
+from jobsearch.fetch import HostRateLimiter, fetch_all
+from jobsearch.http_client import shared_client
+from jobsearch.metrics import (
+    FETCHES,
+    PARSE_FAILURES,
+    REJECTIONS,
+    RUN_FINISHED,
+    RUN_SECONDS,
+    RUN_SUCCESS,
+    SCRAPER,
+    SEARCH_CALLS,
+    metrics_dir,
+)
+from jobsearch.models import BadCompany, BadJob, SearchQuery
+from jobsearch.scheduler import (
+    MAX_PAGES,
+    allocate_pages,
+    date_restrict,
+    mark_failed,
+    mark_succeeded,
+    page_starts,
+    record_search_calls,
+    remaining_quota,
+    update_yield,
+)
+from jobsearch.sources import SourceAdapter, route
 from jobsearch.utils import (
+    GOOGLE_SEARCH_URL,
+    QueryCounter,
+    get_cached_search,
     google_search,
-    is_allowed_location,
-    parse_ashby,
-    parse_greenhouse,
-    parse_lever,
+    known_urls,
+    location_matcher,
+    prune_search_cache,
+    search_cache_key,
+    store_search,
 )
-
-QUERY = '"data engineer"'
-# QUERY = '"analytics engineer"'
+from jobsearch.writer import PostingWriter, build_posting
 
 
 class Command(BaseCommand):
     help = "Scrape Google Custom Search results and save jobs into JobPosting table"
 
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--query",
+            action="append",
+            default=[],
+            help="Run this search query instead of the active SearchQuery rows (repeatable)",
+        )
+        parser.add_argument(
+            "--exclude",
+            help="Exclude terms for --query searches "
+            "(default: those of the stored SearchQuery with the same text)",
+        )
+        parser.add_argument(
+            "--prefetch",
+            type=int,
+            default=settings.SEARCH_PREFETCH_PAGES,
+            help="Number of result pages of a query requested at once",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.SCRAPE_CONCURRENCY,
+            help="Maximum number of detail pages fetched at once",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SCRAPE_WRITE_BATCH_SIZE,
+            help="Number of scraped rows written per bulk insert",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            type=float,
+            default=settings.SCRAPE_FLUSH_INTERVAL,
+            help="Seconds after which buffered rows are written even if the batch is not full",
+        )
+        parser.add_argument(
+            "--archive",
+            action=argparse.BooleanOptionalAction,
+            default=settings.SCRAPE_ARCHIVE_PAGES,
+            help="Store every fetched page body in the RawPage archive for offline re-parsing",
+        )
+        parser.add_argument(
+            "--cache-ttl",
+            type=float,
+            default=settings.SEARCH_CACHE_TTL,
+            help="Reuse cached search pages younger than this many seconds (0 disables)",
+        )
+        parser.add_argument(
+            "--stop-after",
+            type=int,
+            default=settings.SEARCH_STOP_AFTER_STALE_PAGES,
+            help="Stop paging after this many consecutive pages with no unseen jobs (0 disables)",
+        )
+        parser.add_argument(
+            "--metrics-file",
+            default=metrics_dir() and str(metrics_dir() / "scrape_jobs.prom"),
+            help="Prometheus textfile rewritten with the run's metrics after every query "
+            "(default: scrape_jobs.prom in METRICS_DIR, if set)",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print search pages, links and database queries issued by this run",
+        )
+
     def handle(self, *args: object, **options: object) -> None:
         self.stdout.write("Running static job scrape...")
 
-        found_new = []
-        start = 1
-        bad_companies = set(BadCompany.objects.values_list("name", flat=True))
-        bad_locations = frozenset(BadLocation.objects.values_list("pattern", flat=True))
+        self.stats = {
+            "pages": 0,
+            "search_calls": 0,
+            "links": 0,
+            "dedupe_queries": 0,
+            "write_batches": 0,
+        }
+        self.metrics_file = options["metrics_file"]
+        self.failed = False
+        started = time.monotonic()
+        queries = QueryCounter()
+        with shared_client(), connection.execute_wrapper(queries):
+            self.scrape(
+                queries=list(options["query"]),
+                exclude=options["exclude"],
+                concurrency=int(options["concurrency"]),
+                batch_size=int(options["batch_size"]),
+                flush_interval=float(options["flush_interval"]),
+                archive=bool(options["archive"]),
+                cache_ttl=float(options["cache_ttl"]),
+                stop_after=int(options["stop_after"]),
+                prefetch=int(options["prefetch"]),
+            )
 
-        try:
-            while True:
-                results, queries_meta = google_search(QUERY, start=start, num=10)
-                if not results:
-                    break
+        RUN_SECONDS.set(time.monotonic() - started)
+        RUN_FINISHED.set(time.time())
+        RUN_SUCCESS.set(0 if self.failed else 1)
+        self.write_metrics()
 
-                for res in results:
-                    link = str(res["link"])
-                    if "lever" in link:
-                        link = "/".join(link.split("/")[:5])
-                    elif "ashbyhq" in link:
-                        link = "/".join(link.split("/")[:5])
-
-                    # skip if already recorded
-                    if (
-                        JobPosting.objects.filter(url=link).exists()
-                        or BadJob.objects.filter(url=link).exists()
-                    ):
-                        continue
-                    try:
-                        if "greenhouse" in link:
-                            company, title, location, description, date_posted = (
-                                parse_greenhouse(link)
-                            )
-                            source = "greenhouse"
-                        elif "lever" in link:
-                            company, title, location, description, date_posted = (
-                                parse_lever(link)
-                            )
-                            source = "lever"
-                        elif "ashbyhq" in link:
-                            company, title, location, description, date_posted = (
-                                parse_ashby(link)
-                            )
-                            source = "ashby"
-                        else:
-                            continue
-
-                    except Exception as e:
-                        self.stderr.write(f"Failed fetch {link}: {e}")
-                        continue
-
-                    location_blocked = not is_allowed_location(str(location), bad_locations)
-                    if location_blocked or company in bad_companies:
-                        BadJob.objects.get_or_create(
-                            url=link,
-                            defaults={
-                                "company": company,
-                                "title": title or res.get("title") or "",
-                                "location": location,
-                                "description": description,
-                                "source": source,
-                                "posted_date": date_posted,
-                            },
-                        )
-                    else:
-                        try:
-                            jp = JobPosting.objects.create(
-                                url=link,
-                                company=company,
-                                title=title or res.get("title") or "",
-                                location=location,
-                                description=description,
-                                source=source,
-                                posted_date=date_posted,
-                            )
-                            found_new.append(jp)
-                        except Exception as e:
-                            self.stderr.write(f"Failed to write in db {link}: {e}")
-
-                    # rate-limit outbound requests
-                    time.sleep(1.0)
-
-                # advance Google API pagination
-                next_info = queries_meta.get("nextPage")
-                if next_info and isinstance(next_info, list):
-                    start = next_info[0].get("startIndex")
-                    if not start:
-                        break
-                else:
-                    break
+        if options["stats"]:
+            self.stdout.write(
+                f"Stats: {self.stats['pages']} search page(s) "
+                f"({self.stats['search_calls']} API call(s)), {self.stats['links']} link(s), "
+                f"{queries.count} DB queries ({self.stats['dedupe_queries']} for dedupe, "
+                f"{self.stats['write_batches']} write batch(es))"
+            )
+
+    def write_metrics(self) -> None:
+        if self.metrics_file:
+            SCRAPER.write_textfile(self.metrics_file)
 
+    def scrape(
+        self,
+        queries: list[str],
+        exclude: str | None,
+        concurrency: int,
+        batch_size: int,
+        flush_interval: float,
+        archive: bool,
+        cache_ttl: float,
+        stop_after: int,
+        prefetch: int,
+    ) -> None:
+        self.concurrency = concurrency
+        self.archive = archive
+        self.cache_ttl = cache_ttl
+        self.limiter = HostRateLimiter(
+            settings.SCRAPE_HOST_RATES, default_rate=settings.SCRAPE_DEFAULT_HOST_RATE
+        )
+        self.writer = PostingWriter(
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            on_error=lambda url, e: self.stderr.write(f"Failed to write in db {url}: {e}"),
+            dedupe=DuplicateDetector(suppress=settings.SCRAPE_SUPPRESS_DUPLICATES),
+        )
+        self.seen: set[str] = set()
+        self.bad_companies = set(BadCompany.objects.values_list("name", flat=True))
+        self.locations = location_matcher()
+        # expired pages are never served again; a shorter --cache-ttl keeps the rest
+        prune_search_cache(max(settings.SEARCH_CACHE_TTL, cache_ttl))
+
+        if queries:
+            # ad hoc queries stay unsaved, so they never move a stored row's watermark
+            stored = dict(
+                SearchQuery.objects.filter(query__in=queries).values_list("query", "exclude_terms")
+            )
+            search_queries = [
+                SearchQuery(
+                    query=q, exclude_terms=stored.get(q, "") if exclude is None else exclude
+                )
+                for q in queries
+            ]
+        else:
+            search_queries = list(SearchQuery.objects.filter(active=True).order_by("pk"))
+        if not search_queries:
+            self.stdout.write("No active search queries.")
+            return
+
+        budget = remaining_quota()
+        if not budget:
+            self.stdout.write("Daily search quota is used up.")
+            return
+        allocation = allocate_pages(
+            {i: q.recent_yield for i, q in enumerate(search_queries)}, budget
+        )
+
+        try:
+            for i, search_query in enumerate(search_queries):
+                started_at = timezone.now()
+                try:
+                    exhausted = self.scrape_query(search_query, allocation[i], stop_after, prefetch)
+                except Exception:
+                    mark_failed(search_query)
+                    raise
+                # a query cut short by its page allocation keeps its old
+                # watermark, so the next run searches the unread results again
+                if exhausted:
+                    mark_succeeded(search_query, started_at)
+                self.write_metrics()
         except Exception as e:
+            self.failed = True
             self.stderr.write(f"Fatal error: {e}")
             traceback.print_exc()
             return
+        finally:
+            self.writer.flush()
+            self.stats["write_batches"] = self.writer.batches
 
         # final summary
-        self.stdout.write(f"Added {len(found_new)} new job postings.")
-        if found_new:
-            for jp in found_new:
+        self.stdout.write(f"Added {len(self.writer.written)} new job postings.")
+        if self.writer.written:
+            for jp in self.writer.written:
                 self.stdout.write(f" - {jp.title} | {jp.url}")
+
+    def scrape_query(
+        self, search_query: SearchQuery, pages: int, stop_after: int, prefetch: int
+    ) -> bool:
+        """Read up to `pages` result pages of one query, `prefetch` pages at a time.
+
+        Returns whether the query ran out of results (an empty or stale page,
+        no next page, or the API's last page) rather than out of pages.
+        """
+        window = date_restrict(search_query, timezone.now())
+        new_jobs = pages_read = stale_pages = 0
+        done = False
+        for starts in itertools.batched(page_starts(pages), max(1, prefetch), strict=False):
+            for results, queries_meta in self.search(search_query, starts, window):
+                if not results:
+                    done = True
+                    break
+                pages_read += 1
+                found = self.process_results(results)
+                new_jobs += found
+
+                # results are sorted by date: once pages stop bringing anything
+                # new, the rest of them are older still
+                stale_pages = 0 if found else stale_pages + 1
+                if stop_after and stale_pages >= stop_after:
+                    self.stdout.write(f"Stopping after {stale_pages} page(s) with no unseen jobs.")
+                    done = True
+                    break
+                if not queries_meta.get("nextPage"):
+                    done = True
+                    break
+            if done:
+                break
+        update_yield(search_query, new_jobs, pages_read)
+        return done or pages_read >= MAX_PAGES
+
+    def search(
+        self, search_query: SearchQuery, starts: tuple[int, ...], window: str
+    ) -> list[tuple[list[dict], dict]]:
+        """Result pages at the given start offsets; cache misses are fetched concurrently."""
+        keys = {
+            start: search_cache_key(
+                search_query.query, start, 10, window, search_query.exclude_terms
+            )
+            for start in starts
+        }
+        pages = {}
+        for start in starts:
+            cached = get_cached_search(keys[start], self.cache_ttl)
+            if cached is not None:
+                pages[start] = cached
+
+        missing = [start for start in starts if start not in pages]
+        jobs = [
+            (
+                f"{GOOGLE_SEARCH_URL}?start={start}",
+                lambda _, start=start: google_search(
+                    search_query.query,
+                    start=start,
+                    num=10,
+                    dateRestrict=window,
+                    excludeTerms=search_query.exclude_terms,
+                ),
+            )
+            for start in missing
+        ]
+        outcomes = fetch_all(jobs, concurrency=self.concurrency, limiter=self.limiter)
+        record_search_calls(len(missing))
+        SEARCH_CALLS.inc(len(missing))
+        self.stats["search_calls"] += len(missing)
+
+        for start, outcome in zip(missing, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                raise outcome
+            results, queries_meta = outcome
+            store_search(keys[start], search_query.query, start, window, results, queries_meta)
+            pages[start] = outcome
+        return [pages[start] for start in starts]
+
+    def process_results(self, results: list[dict]) -> int:
+        """Fetch, parse and queue every unseen job of one search page; returns how many."""
+        self.stats["pages"] += 1
+        self.stats["links"] += len(results)
+
+        links, adapters = [], []
+        for res in results:
+            link = str(res["link"])
+            adapter = route(link)
+            if adapter is not None:
+                link = adapter.normalize(link)
+            links.append(link)
+            adapters.append(adapter)
+
+        # skip if already recorded: one lookup for the whole page
+        dedupe_queries = QueryCounter()
+        with connection.execute_wrapper(dedupe_queries):
+            self.seen |= known_urls(links)
+        self.stats["dedupe_queries"] += dedupe_queries.count
+
+        candidates = []
+        for link, res, adapter in zip(links, results, adapters, strict=True):
+            if link in self.seen:
+                continue
+            self.seen.add(link)
+            if adapter is not None:
+                candidates.append((link, res, adapter))
+
+        # fetch the whole page concurrently, rate-limited per host
+        bodies = self.fetch_bodies(candidates, self.concurrency, self.limiter)
+        if self.archive:
+            store_pages(
+                (link, adapter.name, bodies[link])
+                for link, _, adapter in candidates
+                if isinstance(bodies[link], str)
+            )
+
+        for link, res, adapter in candidates:
+            body = bodies[link]
+            if isinstance(body, BaseException):
+                FETCHES.inc(source=adapter.name, outcome="error")
+                self.stderr.write(f"Failed fetch {link}: {body}")
+                continue
+            FETCHES.inc(source=adapter.name, outcome="ok")
+            try:
+                parsed = adapter.extract(link, body)
+            except Exception as e:
+                PARSE_FAILURES.inc(source=adapter.name)
+                self.stderr.write(f"Failed fetch {link}: {e}")
+                continue
+            posting = build_posting(
+                link,
+                adapter.name,
+                parsed,
+                self.bad_companies,
+                self.locations,
+                fallback_title=res.get("title"),
+            )
+            if isinstance(posting, BadJob):
+                REJECTIONS.inc(reason="company" if posting.location_allowed else "location")
+            self.writer.add(posting)
+
+        self.writer.flush_if_due()
+        return len(candidates)
+
+    def fetch_bodies(
+        self,
+        candidates: list[tuple[str, dict, SourceAdapter]],
+        concurrency: int,
+        limiter: HostRateLimiter,
+    ) -> dict[str, str | BaseException]:
+        """Fetch the raw body of every candidate link of a search page, keyed by link."""
+        jobs = []
+        batches: dict[SourceAdapter, list[str]] = {}
+        for link, _, adapter in candidates:
+            if adapter.fetch_batch is None:
+                jobs.append((link, adapter.fetch))
+            else:
+                batches.setdefault(adapter, []).append(link)
+        for adapter, links in batches.items():
+            # e.g. all Ashby postings of the page go out as one GraphQL request
+            jobs.append((adapter.batch_url, lambda _, a=adapter, links=links: a.fetch_batch(links)))
+
+        outcomes = fetch_all(jobs, concurrency=concurrency, limiter=limiter)
+        bodies = dict(zip((url for url, _ in jobs), outcomes, strict=True))
+        for adapter, links in batches.items():
+            batch = bodies.pop(adapter.batch_url)
+            for link in links:
+                bodies[link] = batch if isinstance(batch, BaseException) else batch[link]
+        return bodies
@@ -0,0 +1,309 @@
+"""Prometheus metrics of the web process and the scraper, in the text exposition format.
+
+Metrics live in two registries: WEB, fed by MetricsMiddleware, and SCRAPER,
+fed by scrape_jobs. Both are plain in-process counters; the exposition
+format is simple enough not to need a client library.
+
+With settings.METRICS_DIR set, processes share their numbers through it:
+
+- every web worker writes a snapshot of WEB to web-<pid>.json, at most
+  every SNAPSHOT_INTERVAL seconds after a request and whenever it answers
+  /metrics. /metrics sums the snapshots of all live workers, so any worker
+  answers for the whole server; those of exited workers are deleted;
+- scrape_jobs writes SCRAPER to scrape_jobs.prom during and after each run.
+  /metrics appends every *.prom file, and the directory also works as a
+  node_exporter textfile collector directory.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between two snapshots a web worker writes after requests.
+SNAPSHOT_INTERVAL = 5.0
+
+type Snapshot = dict[str, dict[str, float | list[float]]]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: "Metric") -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> Snapshot:
+        """Current values as JSON-serializable data, keyed by metric then label values."""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def render(self, snapshots: Iterable[Snapshot] | None = None) -> str:
+        """Text exposition of snapshots summed together, or of this process' values."""
+        merged: Snapshot = {}
+        for snapshot in [self.snapshot()] if snapshots is None else snapshots:
+            for name, values in snapshot.items():
+                if name not in self.metrics:
+                    continue
+                into = merged.setdefault(name, {})
+                for key, value in values.items():
+                    into[key] = _add(into[key], value) if key in into else value
+        return "".join(metric.render(merged.get(name, {})) for name, metric in self.metrics.items())
+
+    def write_textfile(self, path: str | os.PathLike) -> None:
+        _write_atomic(Path(path), self.render())
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: Registry | None = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float | list[float]] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict[str, float | list[float]]:
+        with self._lock:
+            return {
+                json.dumps(key): value[:] if isinstance(value, list) else value
+                for key, value in self._values.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self, values: dict[str, float | list[float]]) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, value in sorted(values.items()):
+            lines.extend(
+                self._samples(dict(zip(self.labelnames, json.loads(key), strict=True)), value)
+            )
+        return "\n".join(lines) + "\n"
+
+    def _samples(self, labels: dict[str, str], value) -> list[str]:
+        return [f"{self.name}{_labels(labels)} {_number(value)}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative `le` buckets, plus their sum and count.
+
+    Values are stored per label set as [per-bucket counts..., sum, count].
+    """
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-2] += value
+            counts[-1] += 1
+
+    def _samples(self, labels: dict[str, str], value) -> list[str]:
+        *counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, bucket in zip(self.buckets, counts, strict=True):
+            cumulative += bucket
+            bucket_labels = _labels({**labels, "le": _number(bound)})
+            lines.append(f"{self.name}_bucket{bucket_labels} {_number(cumulative)}")
+        lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {_number(count)}")
+        lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(labels)} {_number(count)}")
+        return lines
+
+
+def _add(a, b):
+    if isinstance(a, list):
+        return [x + y for x, y in zip(a, b, strict=True)]
+    return a + b
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # readers (a /metrics scrape, node_exporter) never see a half-written file
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+WEB = Registry()
+SCRAPER = Registry()
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to answer an HTTP request, by URL route, method and status",
+    ("route", "method", "status"),
+    registry=WEB,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run to answer an HTTP request, by URL route",
+    ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+    registry=WEB,
+)
+
+SEARCH_CALLS = Counter(
+    "scrape_search_calls_total", "Google Custom Search API calls made", registry=SCRAPER
+)
+FETCHES = Counter(
+    "scrape_fetches_total",
+    "Job pages fetched, by source and outcome (ok or error)",
+    ("source", "outcome"),
+    registry=SCRAPER,
+)
+PARSE_FAILURES = Counter(
+    "scrape_parse_failures_total",
+    "Fetched job pages the source parser failed on, by source",
+    ("source",),
+    registry=SCRAPER,
+)
+REJECTIONS = Counter(
+    "scrape_rejections_total",
+    "Scraped jobs filed as BadJob, by reason (location, company or duplicate)",
+    ("reason",),
+    registry=SCRAPER,
+)
+WRITE_SECONDS = Histogram(
+    "scrape_db_write_seconds",
+    "Time to write one batch of scraped rows",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    registry=SCRAPER,
+)
+RUN_SECONDS = Gauge(
+    "scrape_run_duration_seconds", "Duration of the latest scrape_jobs run", registry=SCRAPER
+)
+RUN_FINISHED = Gauge(
+    "scrape_run_finished_timestamp_seconds",
+    "Unix time the latest scrape_jobs run finished",
+    registry=SCRAPER,
+)
+RUN_SUCCESS = Gauge(
+    "scrape_run_success",
+    "1 if the latest scrape_jobs run finished without a fatal error",
+    registry=SCRAPER,
+)
+
+
+def metrics_dir() -> Path | None:
+    return Path(settings.METRICS_DIR) if settings.METRICS_DIR else None
+
+
+_last_snapshot = 0.0
+
+
+def save_web_snapshot(force: bool = False) -> None:
+    """Write this process' WEB values to METRICS_DIR for the other workers to read.
+
+    Unless forced, at most once every SNAPSHOT_INTERVAL seconds.
+    """
+    global _last_snapshot
+    if (directory := metrics_dir()) is None:
+        return
+    now = time.monotonic()
+    if not force and now - _last_snapshot < SNAPSHOT_INTERVAL:
+        return
+    _last_snapshot = now
+    _write_atomic(directory / f"web-{os.getpid()}.json", json.dumps(WEB.snapshot()))
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # running, as another user
+        pass
+    return True
+
+
+def exposition() -> str:
+    """The /metrics body: WEB summed over all live workers, then every scraper textfile."""
+    directory = metrics_dir()
+    if directory is None:
+        return WEB.render()
+    save_web_snapshot(force=True)
+    snapshots = []
+    for path in sorted(directory.glob("web-*.json")):
+        pid = path.stem.removeprefix("web-")
+        if pid.isdigit() and not _alive(int(pid)):
+            # a recycled worker: its numbers went with it
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # a worker's file vanished or is unreadable; its numbers are left out
+            continue
+    texts = [WEB.render(snapshots)]
+    for path in sorted(directory.glob("*.prom")):
+        try:
+            texts.append(path.read_text())
+        except OSError:
+            continue
+    return "".join(texts)
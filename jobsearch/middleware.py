@@ -1,6 +1,15 @@
 # jobsearch/middleware.py
+import hmac
+import time
+
+from django.conf import settings
+from django.db import connection
 from django.http import HttpResponse
 
+from jobsearch.metrics import REQUEST_QUERIES, REQUEST_SECONDS, exposition, save_web_snapshot
+from jobsearch.utils import QueryCounter
+
+
 class HealthCheckMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -9,3 +18,41 @@ class HealthCheckMiddleware:
         if request.path == "/ping/":
             return HttpResponse("pong", content_type="text/plain")
         return self.get_response(request)
+
+
+class MetricsMiddleware:
+    """Time every request and count its DB queries; answer /metrics (see jobsearch.metrics).
+
+    Streaming responses are measured up to the moment streaming starts.
+    """
+
+    METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == "/metrics":
+            return self.metrics(request)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        # label by URL pattern, not path, so every posting shares one series
+        match = request.resolver_match
+        route = f"/{match.route}" if match else "<unmatched>"
+        method = request.method if request.method in self.METHODS else "other"
+        REQUEST_SECONDS.observe(elapsed, route=route, method=method, status=response.status_code)
+        REQUEST_QUERIES.observe(queries.count, route=route)
+        save_web_snapshot()
+        return response
+
+    @staticmethod
+    def metrics(request):
+        token = settings.METRICS_TOKEN
+        header = request.headers.get("Authorization", "")
+        if token and not hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+        return HttpResponse(exposition(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0007_badjob_updated_at_jobposting_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WatchedCompany',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Board slug as it appears in job URLs (e.g. 'acme')", max_length=500)),
+                ('source', models.CharField(choices=[('greenhouse', 'Greenhouse'), ('lever', 'Lever'), ('ashby', 'Ashby')], max_length=200)),
+                ('active', models.BooleanField(default=True)),
+                ('last_ingested_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'name'), name='unique_watched_company')],
+            },
+        ),
+    ]
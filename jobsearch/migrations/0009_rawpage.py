@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0008_watchedcompany'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('url', models.URLField(db_index=True)),
+                ('source', models.CharField(blank=True, max_length=200)),
+                ('body', models.BinaryField()),
+                ('fetched_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0009_rawpage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('query', models.CharField(max_length=1000)),
+                ('start', models.PositiveIntegerField()),
+                ('date_restrict', models.CharField(max_length=20)),
+                ('response', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0010_searchcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=1000, unique=True)),
+                ('exclude_terms', models.CharField(blank=True, max_length=1000)),
+                ('active', models.BooleanField(default=True)),
+                ('recent_yield', models.FloatField(default=1.0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('calls', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
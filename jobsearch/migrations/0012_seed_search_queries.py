@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:30
+
+from django.db import migrations
+
+# The queries that used to be hard-coded in scrape_jobs.
+QUERIES = [
+    ('"data engineer"', '"Senior Data"', True),
+    ('"analytics engineer"', '"Senior Analytics"', False),
+]
+
+
+def seed_queries(apps, schema_editor):
+    SearchQuery = apps.get_model("jobsearch", "SearchQuery")
+    for query, exclude_terms, active in QUERIES:
+        SearchQuery.objects.get_or_create(
+            query=query, defaults={"exclude_terms": exclude_terms, "active": active}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0011_searchquery_searchquota'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_queries, migrations.RunPython.noop),
+    ]
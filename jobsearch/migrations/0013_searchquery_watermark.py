@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0012_seed_search_queries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchquery',
+            name='last_failed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='last_succeeded_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the last run that finished without errors', null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:41
+
+from django.db import migrations, models
+
+from jobsearch.utils import LocationMatcher
+
+
+def normalize_locations(apps, schema_editor):
+    # same rule as jobsearch.utils.normalize_location, frozen here
+    BadLocation = apps.get_model("jobsearch", "BadLocation")
+    matcher = LocationMatcher(BadLocation.objects.values_list("pattern", flat=True))
+    for model_name in ("JobPosting", "BadJob"):
+        model = apps.get_model("jobsearch", model_name)
+        rows = model.objects.only("pk", "location").order_by("pk")
+        last_pk = 0
+        while batch := list(rows.filter(pk__gt=last_pk)[:2000]):
+            for row in batch:
+                row.location_normalized = " ".join(row.location.lower().split())
+                row.location_allowed = matcher.allows(row.location)
+            model.objects.bulk_update(batch, ["location_normalized", "location_allowed"])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0013_searchquery_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='badjob',
+            name='location_allowed',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='badjob',
+            name='location_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='location_allowed',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='location_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.RunPython(normalize_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:45
+
+from django.db import migrations
+
+import jobsearch.fields
+
+
+def _copy(apps, source, target):
+    for model_name in ("JobPosting", "BadJob"):
+        model = apps.get_model("jobsearch", model_name)
+        rows = model.objects.only("pk", source).order_by("pk")
+        last_pk = 0
+        while batch := list(rows.filter(pk__gt=last_pk)[:1000]):
+            for row in batch:
+                setattr(row, target, getattr(row, source))
+            model.objects.bulk_update(batch, [target])
+            last_pk = batch[-1].pk
+
+
+def compress_descriptions(apps, schema_editor):
+    _copy(apps, "description", "description_compressed")
+
+
+def decompress_descriptions(apps, schema_editor):
+    _copy(apps, "description_compressed", "description")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0014_location_verdict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='badjob',
+            name='description_compressed',
+            field=jobsearch.fields.CompressedTextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='description_compressed',
+            field=jobsearch.fields.CompressedTextField(blank=True),
+        ),
+        migrations.RunPython(compress_descriptions, decompress_descriptions),
+        migrations.RemoveField(
+            model_name='badjob',
+            name='description',
+        ),
+        migrations.RemoveField(
+            model_name='jobposting',
+            name='description',
+        ),
+        migrations.RenameField(
+            model_name='badjob',
+            old_name='description_compressed',
+            new_name='description',
+        ),
+        migrations.RenameField(
+            model_name='jobposting',
+            old_name='description_compressed',
+            new_name='description',
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0015_compress_descriptions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='duplicate_of',
+            field=models.URLField(blank=True, editable=False, help_text='Earlier posting this one nearly repeats'),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='minhash',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.CreateModel(
+            name='PostingBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('posting', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='jobsearch.jobposting')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('posting', 'band'), name='unique_posting_band')],
+            },
+        ),
+    ]
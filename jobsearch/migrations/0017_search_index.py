@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 09:12
+
+from django.db import migrations
+
+from jobsearch import search
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    search.install(connection)
+    JobPosting = apps.get_model("jobsearch", "JobPosting")
+    rows = JobPosting.objects.only("pk", "title", "company", "description").order_by("pk")
+    last_pk = 0
+    while batch := list(rows.filter(pk__gt=last_pk)[:2000]):
+        search.index_postings(batch, connection=connection)
+        last_pk = batch[-1].pk
+
+
+def drop_search_index(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobsearch", "0016_posting_minhash"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
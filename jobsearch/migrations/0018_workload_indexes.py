@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0017_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='badjob',
+            index=models.Index(fields=['company', 'scraped_at'], name='badjob_company_scraped'),
+        ),
+        migrations.AddIndex(
+            model_name='badjob',
+            index=models.Index(fields=['scraped_at'], name='badjob_scraped'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_applied', 'posted_date'], name='jobposting_applied_posted'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['company', 'scraped_at'], name='jobposting_company_scraped'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['scraped_at'], name='jobposting_scraped'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(condition=models.Q(('location_allowed', False)), fields=['location_allowed'], name='jobposting_location_blocked'),
+        ),
+    ]
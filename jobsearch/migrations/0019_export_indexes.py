@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0018_workload_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='badjob',
+            index=models.Index(fields=['updated_at'], name='badjob_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['updated_at'], name='jobposting_updated'),
+        ),
+    ]
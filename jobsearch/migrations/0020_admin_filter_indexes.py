@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0019_export_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['posted_date'], name='jobposting_posted'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(condition=models.Q(('duplicate_of', ''), _negated=True), fields=['duplicate_of'], name='jobposting_duplicates'),
+        ),
+    ]
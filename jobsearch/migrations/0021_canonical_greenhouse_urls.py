@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:20
+
+import re
+from urllib.parse import urlsplit
+
+from django.db import migrations
+
+# same rule as jobsearch.sources.greenhouse_root, frozen here
+_POSTING = re.compile(r"/([^/]+)/jobs/(\d+)")
+
+
+def _canonical(url):
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if not host.endswith("greenhouse.io"):
+        return url
+    match = _POSTING.match(parts.path)
+    if match is None:
+        return url
+    host = "job-boards.eu.greenhouse.io" if ".eu." in host else "job-boards.greenhouse.io"
+    return f"https://{host}/{match[1]}/jobs/{match[2]}"
+
+
+def _rewrite(model, field, unique):
+    rows = model.objects.filter(**{f"{field}__contains": "greenhouse.io"}).only("pk", field)
+    stored = set(rows.values_list(field, flat=True)) if unique else set()
+    changed = []
+    for row in rows.order_by("pk"):
+        url = getattr(row, field)
+        canonical = _canonical(url)
+        if canonical == url or canonical in stored:
+            # a row already has the canonical URL; leave this one as it is
+            continue
+        setattr(row, field, canonical)
+        stored.add(canonical)
+        changed.append(row)
+    model.objects.bulk_update(changed, [field], batch_size=1000)
+
+
+def canonicalize_greenhouse_urls(apps, schema_editor):
+    for model_name in ("JobPosting", "BadJob"):
+        _rewrite(apps.get_model("jobsearch", model_name), "url", unique=True)
+    _rewrite(apps.get_model("jobsearch", "JobPosting"), "duplicate_of", unique=False)
+    # reparse_jobs matches archived pages to stored rows by url
+    _rewrite(apps.get_model("jobsearch", "RawPage"), "url", unique=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobsearch', '0020_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_greenhouse_urls, migrations.RunPython.noop),
+    ]
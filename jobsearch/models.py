@@ -1,4 +1,10 @@
-from django.db import models
+from django.db import connections, models
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from jobsearch import search
+from jobsearch.fields import CompressedTextField
+from jobsearch.utils import normalize_location, reset_location_matcher
 
 
 class JobPosting(models.Model):
@@ -6,8 +12,10 @@ class JobPosting(models.Model):
     company = models.CharField(max_length=500, blank=True)
     title = models.CharField(max_length=1000, blank=True)
     location = models.CharField(max_length=500, blank=True)
+    location_normalized = models.CharField(max_length=500, blank=True, editable=False)
+    location_allowed = models.BooleanField(default=True, editable=False)
     posted_date = models.DateField(null=True, blank=True)
-    description = models.TextField(blank=True)
+    description = CompressedTextField(blank=True)
     scraped_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -16,6 +24,41 @@ class JobPosting(models.Model):
 
     source = models.CharField(max_length=200, blank=True)
 
+    # near-duplicate detection, see jobsearch.dedupe
+    minhash = models.BinaryField(null=True, editable=False)
+    duplicate_of = models.URLField(
+        blank=True, editable=False, help_text="Earlier posting this one nearly repeats"
+    )
+
+    class Meta:
+        indexes = [
+            # admin changelist: unapplied (or applied) postings, newest posted first
+            models.Index(fields=["is_applied", "posted_date"], name="jobposting_applied_posted"),
+            # one company's postings by scrape time: bad-company moves, admin filter
+            models.Index(fields=["company", "scraped_at"], name="jobposting_company_scraped"),
+            models.Index(fields=["scraped_at"], name="jobposting_scraped"),
+            # incremental exports since an updated_at watermark, see jobsearch.export
+            models.Index(fields=["updated_at"], name="jobposting_updated"),
+            # admin posted_date filter, whatever is_applied is
+            models.Index(fields=["posted_date"], name="jobposting_posted"),
+            # admin near-duplicate filter: the few postings that repeat another
+            models.Index(
+                fields=["duplicate_of"],
+                condition=~models.Q(duplicate_of=""),
+                name="jobposting_duplicates",
+            ),
+            # postings a BadLocation has just blocked, about to be moved out
+            models.Index(
+                fields=["location_allowed"],
+                condition=models.Q(location_allowed=False),
+                name="jobposting_location_blocked",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.location_normalized = normalize_location(self.location)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title or self.url}"
 
@@ -25,13 +68,26 @@ class BadJob(models.Model):
     company = models.CharField(max_length=500, blank=True)
     title = models.CharField(max_length=1000, blank=True)
     location = models.CharField(max_length=500, blank=True)
+    location_normalized = models.CharField(max_length=500, blank=True, editable=False)
+    location_allowed = models.BooleanField(default=True, editable=False)
     posted_date = models.DateField(null=True, blank=True)
-    description = models.TextField(blank=True)
+    description = CompressedTextField(blank=True)
     scraped_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     source = models.CharField(max_length=200, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["company", "scraped_at"], name="badjob_company_scraped"),
+            models.Index(fields=["scraped_at"], name="badjob_scraped"),
+            models.Index(fields=["updated_at"], name="badjob_updated"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.location_normalized = normalize_location(self.location)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title or self.url}"
 
@@ -54,6 +110,139 @@ class BadLocation(models.Model):
         return self.pattern
 
 
+class PostingBand(models.Model):
+    """One LSH band key of a JobPosting's MinHash signature.
+
+    No database constraint or cascade on `posting`, so bulk deletes of
+    postings stay single statements. move_jobs_to_bad() deletes the bands of
+    what it moves; bands of postings deleted otherwise are skipped on lookup
+    and cleared by `dedupe_jobs --prune`.
+    """
+
+    posting = models.ForeignKey(
+        JobPosting, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    band = models.PositiveSmallIntegerField()
+    key = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["posting", "band"], name="unique_posting_band")
+        ]
+
+
+class WatchedCompany(models.Model):
+    """Company whose whole ATS job board is pulled by the ingest_boards command."""
+
+    SOURCE_CHOICES = [
+        ("greenhouse", "Greenhouse"),
+        ("lever", "Lever"),
+        ("ashby", "Ashby"),
+    ]
+
+    name = models.CharField(
+        max_length=500, help_text="Board slug as it appears in job URLs (e.g. 'acme')"
+    )
+    source = models.CharField(max_length=200, choices=SOURCE_CHOICES)
+    active = models.BooleanField(default=True)
+    last_ingested_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "name"], name="unique_watched_company")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.source})"
+
+
+class RawPage(models.Model):
+    """Archived response body of a fetched job page, zlib-compressed.
+
+    Rows are append-only and keyed by the SHA-256 of the uncompressed body,
+    so re-fetching an unchanged page stores nothing new.
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    url = models.URLField(db_index=True)
+    source = models.CharField(max_length=200, blank=True)
+    body = models.BinaryField()
+    fetched_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.url} @ {self.fetched_at:%Y-%m-%d %H:%M}"
+
+
+class SearchQuery(models.Model):
+    """Google Custom Search query run by scrape_jobs.
+
+    recent_yield is a moving average of new jobs per search page; the
+    scheduler gives more of the daily quota to queries with a higher yield.
+    last_succeeded_at is the watermark that narrows the next run's
+    dateRestrict window.
+    """
+
+    query = models.CharField(max_length=1000, unique=True)
+    exclude_terms = models.CharField(max_length=1000, blank=True)
+    active = models.BooleanField(default=True)
+    recent_yield = models.FloatField(default=1.0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_succeeded_at = models.DateTimeField(
+        null=True, blank=True, help_text="Start of the last run that finished without errors"
+    )
+    last_failed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return self.query
+
+
+class SearchQuota(models.Model):
+    """Custom Search API calls made on one day, to stay inside the daily quota."""
+
+    day = models.DateField(unique=True)
+    calls = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.day}: {self.calls}"
+
+
+class SearchCache(models.Model):
+    """Cached Google Custom Search response for one (query, start, dateRestrict) page."""
+
+    key = models.CharField(max_length=64, unique=True)
+    query = models.CharField(max_length=1000)
+    start = models.PositiveIntegerField()
+    date_restrict = models.CharField(max_length=20)
+    response = models.JSONField()
+    fetched_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.query} [{self.start}, {self.date_restrict}]"
+
+
+@receiver([post_save, post_delete], sender=BadLocation)
+def _reset_location_matcher(**kwargs) -> None:
+    reset_location_matcher()
+
+
+@receiver(post_save, sender=JobPosting)
+def _index_posting(instance, raw, update_fields, **kwargs) -> None:
+    if raw:
+        return
+    if update_fields is None or {"title", "company", "description"} & set(update_fields):
+        search.index_postings([instance])
+
+
+@receiver(post_migrate)
+def _repair_search_index(sender, using, **kwargs) -> None:
+    # SQLite table rebuilds drop the triggers that keep the indexes in step
+    connection = connections[using]
+    if sender.name != "jobsearch" or connection.vendor != "sqlite":
+        return
+    if search.installed(connection):
+        search.install(connection)
+
+
 # class Alert(models.Model):
 #     """
 #     Настраиваемые алерты: можно создать правило, например
@@ -0,0 +1,226 @@
+"""Admin changelists that page without COUNT(*) or deep OFFSETs.
+
+KeysetChangeList replaces Django's page-number pagination for large
+tables:
+
+- When the list is ordered by the admin's `keyset_field` and then pk (the
+  default ordering), pages are fetched by keyset: "rows after the last one
+  shown", so the 1000th page costs what the first does. Links carry the
+  boundary row as `?after=` / `?before=` cursors.
+- Any other ordering (a clicked column, search ranking) falls back to
+  OFFSET paging, still without a count: one extra row is fetched to know
+  whether there is a next page.
+
+The result count shown is the planner's estimate when it has one (see
+estimated_count), otherwise a count capped at COUNT_CAP rows.
+"""
+
+import json
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+AFTER_VAR = "after"
+BEFORE_VAR = "before"
+COUNT_CAP = 10_000
+
+
+def estimated_count(queryset: QuerySet) -> int | None:
+    """Row count of queryset from planner statistics, or None without them.
+
+    PostgreSQL: pg_class.reltuples for a whole table, the EXPLAIN row
+    estimate for a filtered queryset. SQLite: the row count ANALYZE stored
+    in sqlite_stat1, for a whole table only.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    filtered = queryset.query.has_filters()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            if not filtered:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table]
+                )
+                row = cursor.fetchone()
+                # -1 until the table is first vacuumed or analyzed
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        if connection.vendor == "sqlite" and not filtered:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            # the first number of each index's stat is the rows it covers
+            counts = [int(stat.split()[0]) for (stat,) in cursor.fetchall()]
+            return max(counts) if counts else None
+    return None
+
+
+def make_cursor(value, pk) -> str:
+    """Cursor of the row with keyset value and pk, for beyond_cursor()."""
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return f"{value}_{pk}"
+
+
+def beyond_cursor(model, field_name: str, cursor: str, field_desc=True, pk_desc=True) -> Q:
+    """Rows of model strictly past cursor in (field_name, pk) order, in the given directions.
+
+    Raises ValueError for a malformed cursor.
+    """
+    raw, _, pk = cursor.rpartition("_")
+    try:
+        value = model._meta.get_field(field_name).to_python(raw)
+        pk = model._meta.pk.to_python(pk)
+    except ValidationError as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+    if value is None or pk is None:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    field_op, pk_op = ("lt" if field_desc else "gt"), ("lt" if pk_desc else "gt")
+    # the outer range lets the (field) index scan in order from the cursor
+    return Q(**{f"{field_name}__{field_op}e": value}) & (
+        Q(**{f"{field_name}__{field_op}": value}) | Q(**{f"pk__{pk_op}": pk})
+    )
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList paging by keyset on (model_admin.keyset_field, pk), never counting.
+
+    Sets previous_url/next_url/first_url for admin/jobsearch/pagination.html,
+    and result_count with result_count_estimated or result_count_capped.
+    """
+
+    cursor_pagination = True
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for name in (AFTER_VAR, BEFORE_VAR):
+            lookup_params.pop(name, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # a cursor belongs to the list it was taken from; filter and sort
+        # links start again from the first page
+        return super().get_query_string(new_params, [*(remove or ()), AFTER_VAR, BEFORE_VAR])
+
+    def get_results(self, request):
+        per_page = self.list_per_page
+        keyset = self._keyset()
+        if keyset is not None:
+            rows, has_previous, has_next = self._keyset_page(request, *keyset)
+        else:
+            rows, has_previous, has_next = self._offset_page()
+
+        self._count(rows, has_previous, has_next)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        # page links come from previous_url/next_url, not page numbers
+        self.multi_page = False
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, per_page)
+
+        self.first_url = self.get_query_string(remove=[PAGE_VAR]) if has_previous else None
+        if keyset is not None:
+            field = keyset[0]
+            self.previous_url = has_previous and self.get_query_string(
+                {BEFORE_VAR: self._cursor(field, rows[0])}
+            )
+            self.next_url = has_next and self.get_query_string(
+                {AFTER_VAR: self._cursor(field, rows[-1])}
+            )
+        else:
+            self.previous_url = has_previous and self.get_query_string(
+                {PAGE_VAR: self.page_num - 1}
+            )
+            self.next_url = has_next and self.get_query_string({PAGE_VAR: self.page_num + 1})
+
+    def _keyset(self):
+        """(field, field descending, pk descending) if ordered by the keyset, else None."""
+        if not all(isinstance(part, str) for part in self.queryset.query.order_by):
+            return None
+        # the admin ordering comes again from get_queryset; a repeated column
+        # changes nothing in SQL
+        ordering = {}
+        for part in self.queryset.query.order_by:
+            ordering.setdefault(part.lstrip("-"), part)
+        if len(ordering) != 2:
+            return None
+        (field_name, pk_name), (first, second) = ordering.keys(), ordering.values()
+        pk_names = ("pk", self.lookup_opts.pk.attname)
+        if field_name != self.model_admin.keyset_field or pk_name not in pk_names:
+            return None
+        field = self.lookup_opts.get_field(field_name)
+        if field.null:
+            return None
+        return field, first.startswith("-"), second.startswith("-")
+
+    def _keyset_page(self, request, field, field_desc, pk_desc):
+        per_page = self.list_per_page
+        after, before = request.GET.get(AFTER_VAR), request.GET.get(BEFORE_VAR)
+        queryset = self.queryset
+        if before:
+            # walk back from the cursor in reverse order, then flip the page
+            queryset = queryset.filter(self._beyond(field, before, not field_desc, not pk_desc))
+            rows = list(queryset.reverse()[: per_page + 1])
+            has_previous = len(rows) > per_page
+            return rows[:per_page][::-1], has_previous, True
+        if after:
+            queryset = queryset.filter(self._beyond(field, after, field_desc, pk_desc))
+        rows = list(queryset[: per_page + 1])
+        return rows[:per_page], bool(after), len(rows) > per_page
+
+    def _beyond(self, field, cursor, field_desc, pk_desc) -> Q:
+        try:
+            return beyond_cursor(self.model, field.name, cursor, field_desc, pk_desc)
+        except ValueError as e:
+            raise IncorrectLookupParameters(e) from e
+
+    @staticmethod
+    def _cursor(field, row) -> str:
+        return make_cursor(getattr(row, field.attname), row.pk)
+
+    def _offset_page(self):
+        per_page = self.list_per_page
+        if self.page_num < 1:
+            raise IncorrectLookupParameters
+        offset = (self.page_num - 1) * per_page
+        rows = list(self.queryset[offset : offset + per_page + 1])
+        if not rows and self.page_num > 1:
+            raise IncorrectLookupParameters
+        return rows[:per_page], self.page_num > 1, len(rows) > per_page
+
+    def _count(self, rows, has_previous, has_next) -> None:
+        self.result_count_estimated = self.result_count_capped = False
+        if not has_previous and not has_next:
+            # everything is on this page
+            self.result_count = len(rows)
+            return
+        estimate = estimated_count(self.queryset)
+        if estimate is not None:
+            self.result_count = estimate
+            self.result_count_estimated = True
+            return
+        self.result_count = self.queryset.order_by()[: COUNT_CAP + 1].count()
+        if self.result_count > COUNT_CAP:
+            self.result_count = COUNT_CAP
+            self.result_count_capped = True
+
+
+class KeysetPaginationMixin:
+    """ModelAdmin mixin switching the changelist to KeysetChangeList."""
+
+    keyset_field = "scraped_at"
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,108 @@
+import math
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from jobsearch.models import SearchQuery, SearchQuota
+
+# Custom Search serves at most 100 results: start offsets 1, 11, ..., 91.
+MAX_PAGES = 10
+
+# Weight given to the latest run when updating SearchQuery.recent_yield.
+YIELD_DECAY = 0.5
+
+# Added to every yield so a query that found nothing lately still gets a share.
+YIELD_FLOOR = 0.1
+
+
+def page_starts(pages: int) -> list[int]:
+    return [1 + 10 * i for i in range(min(pages, MAX_PAGES))]
+
+
+def remaining_quota() -> int:
+    used = (
+        SearchQuota.objects.filter(day=timezone.localdate()).values_list("calls", flat=True).first()
+    )
+    return max(0, settings.SEARCH_DAILY_QUOTA - (used or 0))
+
+
+def record_search_calls(calls: int) -> None:
+    if not calls:
+        return
+    quota, _ = SearchQuota.objects.get_or_create(day=timezone.localdate())
+    SearchQuota.objects.filter(pk=quota.pk).update(calls=F("calls") + calls)
+
+
+def allocate_pages[K](
+    yields: dict[K, float], budget: int, max_pages: int = MAX_PAGES
+) -> dict[K, int]:
+    """Split `budget` search pages across queries in proportion to their recent yield.
+
+    Every query gets one page first (highest yield first) while the budget
+    lasts; the rest is shared by yield, capped at `max_pages` per query.
+    """
+    order = sorted(yields, key=lambda k: yields[k], reverse=True)
+    allocation = dict.fromkeys(order, 0)
+    for key in order[:budget]:
+        allocation[key] = 1
+    budget -= min(budget, len(order))
+
+    weights = {key: max(yields[key], 0.0) + YIELD_FLOOR for key in order}
+    while budget > 0:
+        open_keys = [key for key in order if allocation[key] < max_pages]
+        if not open_keys:
+            break
+        total = sum(weights[key] for key in open_keys)
+        granted = 0
+        for key in open_keys:
+            extra = min(int(budget * weights[key] / total), max_pages - allocation[key])
+            allocation[key] += extra
+            granted += extra
+        if not granted:
+            # shares rounded down to nothing: hand out single pages by weight
+            for key in open_keys[:budget]:
+                allocation[key] += 1
+                granted += 1
+        budget -= granted
+    return allocation
+
+
+def update_yield(query: SearchQuery, new_jobs: int, pages: int) -> None:
+    if query.pk is None or not pages:
+        return
+    query.recent_yield = (1 - YIELD_DECAY) * query.recent_yield + YIELD_DECAY * (new_jobs / pages)
+    query.last_run_at = timezone.now()
+    query.save(update_fields=["recent_yield", "last_run_at"])
+
+
+def date_restrict(query: SearchQuery, now: datetime) -> str:
+    """dateRestrict covering the time since the query's last successful run.
+
+    The window is padded by SEARCH_WINDOW_OVERLAP_HOURS and rounded up to
+    whole days (the API's granularity). It falls back to the full
+    SEARCH_MAX_WINDOW_DAYS for a query that never succeeded or whose last
+    run failed.
+    """
+    max_days = settings.SEARCH_MAX_WINDOW_DAYS
+    watermark = query.last_succeeded_at
+    if watermark is None or (query.last_failed_at and query.last_failed_at > watermark):
+        return f"d{max_days}"
+    window = now - watermark + timedelta(hours=settings.SEARCH_WINDOW_OVERLAP_HOURS)
+    days = math.ceil(window / timedelta(days=1))
+    return f"d{min(max(days, 1), max_days)}"
+
+
+def mark_succeeded(query: SearchQuery, started_at: datetime) -> None:
+    if query.pk is None:
+        return
+    query.last_succeeded_at = started_at
+    query.save(update_fields=["last_succeeded_at"])
+
+
+def mark_failed(query: SearchQuery) -> None:
+    if query.pk is None:
+        return
+    query.last_failed_at = timezone.now()
+    query.save(update_fields=["last_failed_at"])
@@ -0,0 +1,305 @@
+"""Indexed search over postings, for the admin search boxes.
+
+Full text (title, company and description) lives in its own index, since
+descriptions are stored compressed:
+
+- SQLite: jobsearch_postingsearch, an FTS5 table keyed by posting id and
+  ranked with bm25, title weighted over company over description.
+- PostgreSQL: jobsearch_postingsearch(posting_id, document) with the
+  weighted tsvector under a GIN index, ranked with ts_rank.
+
+Rows are written from Python by index_postings() wherever postings are
+written. Deleting a posting drops its row through a trigger (SQLite) or a
+cascading foreign key (PostgreSQL), so moves to BadJob need nothing extra.
+
+Substring search on company and url is trigram-backed. On SQLite, each of
+JobPosting and BadJob gets an external-content FTS5 table with the trigram
+tokenizer, kept in step by triggers. On PostgreSQL, pg_trgm GIN indexes on
+UPPER(column) serve plain icontains lookups as they are.
+
+Other backends fall back to icontains scans.
+"""
+
+import itertools
+import re
+from collections.abc import Iterable
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db import connections, router
+from django.db.models import F, Func, IntegerField, Model, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from jobsearch.utils import plain_text
+
+FULLTEXT_TABLE = "jobsearch_postingsearch"
+SUBSTRING_TABLES = ("jobsearch_jobposting", "jobsearch_badjob")
+SUBSTRING_FIELDS = ("company", "url")
+
+# bm25 column weights: title, company, description
+_BM25_RANK = "bm25(10.0, 5.0, 1.0)"
+_PG_DOCUMENT = (
+    "setweight(to_tsvector('english', v.title), 'A')"
+    " || setweight(to_tsvector('english', v.company), 'B')"
+    " || setweight(to_tsvector('english', v.body), 'D')"
+)
+_WORD = re.compile(r"\w+")
+
+
+def _substring_triggers(table: str) -> dict[str, str]:
+    index = f"{table}_trgm"
+    delete = (
+        f"INSERT INTO {index} ({index}, rowid, company, url)"
+        " VALUES ('delete', old.id, old.company, old.url);"
+    )
+    insert = f"INSERT INTO {index} (rowid, company, url) VALUES (new.id, new.company, new.url);"
+    return {
+        f"{index}_ai": f"CREATE TRIGGER {index}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"{index}_ad": f"CREATE TRIGGER {index}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"{index}_au": (
+            f"CREATE TRIGGER {index}_au AFTER UPDATE OF company, url ON {table}"
+            f" BEGIN {delete} {insert} END"
+        ),
+    }
+
+
+def installed(connection=default_connection) -> bool:
+    return FULLTEXT_TABLE in connection.introspection.table_names()
+
+
+def install(connection=default_connection) -> None:
+    """Create whatever search tables, triggers and indexes are missing.
+
+    Safe to run repeatedly. On SQLite, Django rebuilds a table to alter it,
+    which drops the triggers on it; running install() again recreates them
+    and resyncs the indexes they maintain.
+    """
+    if connection.vendor == "sqlite":
+        _install_sqlite(connection)
+    elif connection.vendor == "postgresql":
+        _install_postgresql(connection)
+
+
+def _install_sqlite(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {name for (name,) in cursor.fetchall()}
+
+        if FULLTEXT_TABLE not in existing:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FULLTEXT_TABLE} USING fts5("
+                "title, company, body, tokenize = 'porter unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"INSERT INTO {FULLTEXT_TABLE} ({FULLTEXT_TABLE}, rank) VALUES ('rank', %s)",
+                [_BM25_RANK],
+            )
+        if f"{FULLTEXT_TABLE}_ad" not in existing:
+            cursor.execute(
+                f"CREATE TRIGGER {FULLTEXT_TABLE}_ad AFTER DELETE ON jobsearch_jobposting"
+                f" BEGIN DELETE FROM {FULLTEXT_TABLE} WHERE rowid = old.id; END"
+            )
+            cursor.execute(
+                f"DELETE FROM {FULLTEXT_TABLE}"
+                " WHERE rowid NOT IN (SELECT id FROM jobsearch_jobposting)"
+            )
+
+        for table in SUBSTRING_TABLES:
+            index = f"{table}_trgm"
+            triggers = _substring_triggers(table)
+            missing = [name for name in triggers if name not in existing]
+            if index not in existing:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {index} USING fts5("
+                    f"company, url, content = '{table}', content_rowid = 'id',"
+                    " tokenize = 'trigram')"
+                )
+            for name in missing:
+                cursor.execute(triggers[name])
+            if missing:
+                cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def _install_postgresql(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {FULLTEXT_TABLE} ("
+            " posting_id bigint PRIMARY KEY REFERENCES jobsearch_jobposting (id)"
+            " ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+            " document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {FULLTEXT_TABLE}_document"
+            f" ON {FULLTEXT_TABLE} USING gin (document)"
+        )
+        for table in SUBSTRING_TABLES:
+            for field in SUBSTRING_FIELDS:
+                # the expression icontains compares, so the planner can use it
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{field}_trgm"
+                    f" ON {table} USING gin (UPPER({field}::text) gin_trgm_ops)"
+                )
+
+
+def uninstall(connection=default_connection) -> None:
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DROP TRIGGER IF EXISTS {FULLTEXT_TABLE}_ad")
+            for table in SUBSTRING_TABLES:
+                for name in _substring_triggers(table):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}_trgm")
+            cursor.execute(f"DROP TABLE IF EXISTS {FULLTEXT_TABLE}")
+        elif connection.vendor == "postgresql":
+            for table in SUBSTRING_TABLES:
+                for field in SUBSTRING_FIELDS:
+                    cursor.execute(f"DROP INDEX IF EXISTS {table}_{field}_trgm")
+            cursor.execute(f"DROP TABLE IF EXISTS {FULLTEXT_TABLE}")
+
+
+def index_postings(postings: Iterable, replace: bool = True, connection=default_connection) -> None:
+    """Write the full-text rows of postings, one statement per batch.
+
+    Rows are keyed by url, so postings written by bulk_create without a pk
+    need no lookup first. With replace=False, postings that already have a
+    row keep it, matching writers that never overwrite a stored posting.
+    """
+    if connection.vendor not in ("sqlite", "postgresql"):
+        return
+    # 4 parameters per posting, under SQLite's older 999-parameter limit
+    for batch in itertools.batched(postings, 200, strict=False):
+        rows = {
+            posting.url: (posting.title, posting.company, plain_text(posting.description))
+            for posting in batch
+        }
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+        params = [value for url, fields in rows.items() for value in (url, *fields)]
+        cte = f"WITH v (url, title, company, body) AS (VALUES {values})"
+        source = "FROM v JOIN jobsearch_jobposting p ON p.url = v.url"
+        if connection.vendor == "sqlite":
+            sql = (
+                f"{cte} INSERT OR REPLACE INTO {FULLTEXT_TABLE} (rowid, title, company, body)"
+                f" SELECT p.id, v.title, v.company, v.body {source}"
+            )
+            if not replace:
+                sql += f" WHERE NOT EXISTS (SELECT 1 FROM {FULLTEXT_TABLE} WHERE rowid = p.id)"
+        else:
+            conflict = "UPDATE SET document = EXCLUDED.document" if replace else "NOTHING"
+            sql = (
+                f"{cte} INSERT INTO {FULLTEXT_TABLE} (posting_id, document)"
+                f" SELECT p.id, {_PG_DOCUMENT} {source} ON CONFLICT (posting_id) DO {conflict}"
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+def _fts5_query(query: str) -> str:
+    """Every word of query as a quoted FTS5 term, so user input is never syntax."""
+    return " ".join(f'"{word}"' for word in _WORD.findall(query))
+
+
+def ranked_ids(query: str, within: QuerySet | None = None, limit: int = 1000) -> list[int]:
+    """Ids of the postings best matching query, best first.
+
+    With `within`, only postings of that queryset are ranked, so admin
+    filters apply before the limit does.
+    """
+    connection = connections[within.db if within is not None else "default"]
+    if connection.vendor == "sqlite":
+        query = _fts5_query(query)
+        if not query:
+            return []
+        sql = f"SELECT rowid FROM {FULLTEXT_TABLE} WHERE {FULLTEXT_TABLE} MATCH %s"
+        # a bare ORDER BY rank lets FTS5 rank without sorting every match
+        column, order = "rowid", "rank"
+    elif connection.vendor == "postgresql":
+        if not query.strip():
+            return []
+        sql = (
+            f"SELECT posting_id FROM {FULLTEXT_TABLE}, websearch_to_tsquery('english', %s) q"
+            " WHERE document @@ q"
+        )
+        column, order = "posting_id", "ts_rank(document, q) DESC, posting_id DESC"
+    else:
+        return []
+
+    params: list = [query]
+    if within is not None and within.query.has_filters():
+        subquery, subparams = within.order_by().values("pk").query.sql_with_params()
+        sql += f" AND {column} IN ({subquery})"
+        params += subparams
+    sql += f" ORDER BY {order} LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [pk for (pk,) in cursor.fetchall()]
+
+
+def substring_q(
+    model: type[Model],
+    term: str,
+    fields: tuple[str, ...] = SUBSTRING_FIELDS,
+    using: str | None = None,
+) -> Q:
+    """Case-insensitive substring match of term on any of fields (company, url).
+
+    using is the database the filtered queryset runs on (by default, the
+    router's read database for model).
+    """
+    term = term.strip()
+    connection = connections[using or router.db_for_read(model)]
+    # the trigram index cannot answer terms shorter than a trigram
+    if connection.vendor == "sqlite" and len(term) >= 3:
+        index = f"{model._meta.db_table}_trgm"
+        phrase = term.replace('"', '""')
+        match = f'{{{" ".join(fields)}}} : "{phrase}"'
+        return Q(pk__in=RawSQL(f"SELECT rowid FROM {index} WHERE {index} MATCH %s", [match]))
+    return reduce(or_, (Q(**{f"{field}__icontains": term}) for field in fields))
+
+
+class RankPosition(Func):
+    """Position of the row's pk in a ranked id list; NULL when it is not there.
+
+    Ordering by this keeps the ranking of ranked_ids() in SQL. A CASE with a
+    branch per id would compare every row against every id.
+    """
+
+    output_field = IntegerField()
+
+    def __init__(self, ids: list[int]) -> None:
+        self.ids = tuple(ids)
+        super().__init__(F("pk"))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        pk, params = compiler.compile(self.source_expressions[0])
+        # offsets in ",id1,id2,...," grow with the position in the list
+        ids = f",{','.join(map(str, self.ids))},"
+        return f"NULLIF(instr(%s, ',' || {pk} || ','), 0)", [ids, *params]
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        pk, params = compiler.compile(self.source_expressions[0])
+        return f"array_position(%s::bigint[], {pk})", [list(self.ids), *params]
+
+
+def search_postings(queryset: QuerySet, query: str, limit: int | None = None) -> QuerySet:
+    """Postings of queryset matching query, ordered by rank.
+
+    Full-text matches come first, best first, capped at `limit`
+    (ADMIN_SEARCH_RESULTS); postings whose company or url merely contains
+    the query follow.
+    """
+    limit = settings.ADMIN_SEARCH_RESULTS if limit is None else limit
+    connection = connections[queryset.db]
+    if connection.vendor not in ("sqlite", "postgresql"):
+        return queryset.filter(
+            Q(title__icontains=query) | substring_q(queryset.model, query, using=queryset.db)
+        )
+
+    ids = ranked_ids(query, within=queryset, limit=limit)
+    ranking = RankPosition(ids).asc(nulls_last=True)
+    return queryset.filter(
+        Q(pk__in=ids) | substring_q(queryset.model, query, using=queryset.db)
+    ).order_by(ranking)
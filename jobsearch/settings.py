@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "jobsearch.middleware.HealthCheckMiddleware",
+    "jobsearch.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -129,4 +130,76 @@ STATIC_ROOT = '/efs/staticfiles/'
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
\ No newline at end of file
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
+
+# Scraper
+# Detail pages are fetched concurrently: at most SCRAPE_CONCURRENCY at once,
+# and each ATS host is limited to its own requests-per-second budget.
+
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 8))
+SCRAPE_DEFAULT_HOST_RATE = float(os.getenv("SCRAPE_DEFAULT_HOST_RATE", 1.0))
+SCRAPE_HOST_RATES = {
+    "boards.greenhouse.io": 1.0,
+    "job-boards.greenhouse.io": 1.0,
+    "jobs.lever.co": 1.0,
+    "jobs.ashbyhq.com": 1.0,
+    "www.googleapis.com": 5.0,
+}
+
+# Scraped rows are buffered and bulk-inserted, one transaction per batch.
+SCRAPE_WRITE_BATCH_SIZE = int(os.getenv("SCRAPE_WRITE_BATCH_SIZE", 100))
+SCRAPE_FLUSH_INTERVAL = float(os.getenv("SCRAPE_FLUSH_INTERVAL", 30.0))
+
+# Google Custom Search is paid per call: pages are cached for SEARCH_CACHE_TTL seconds,
+# and paging stops after SEARCH_STOP_AFTER_STALE_PAGES pages in a row with nothing new.
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 3 * 60 * 60))
+SEARCH_STOP_AFTER_STALE_PAGES = int(os.getenv("SEARCH_STOP_AFTER_STALE_PAGES", 2))
+
+# Daily Custom Search quota shared by all SearchQuery rows, and how many
+# result pages of one query are requested at once.
+SEARCH_DAILY_QUOTA = int(os.getenv("SEARCH_DAILY_QUOTA", 100))
+SEARCH_PREFETCH_PAGES = int(os.getenv("SEARCH_PREFETCH_PAGES", 3))
+
+# Each query only searches back to its last successful run plus this overlap;
+# queries without one (or whose last run failed) search the full window.
+SEARCH_WINDOW_OVERLAP_HOURS = float(os.getenv("SEARCH_WINDOW_OVERLAP_HOURS", 6))
+SEARCH_MAX_WINDOW_DAYS = int(os.getenv("SEARCH_MAX_WINDOW_DAYS", 7))
+
+# Keep a compressed copy of every fetched page so reparse_jobs can backfill offline.
+SCRAPE_ARCHIVE_PAGES = bool(os.getenv("SCRAPE_ARCHIVE_PAGES", default=0))
+
+# Postings at least this similar (estimated Jaccard over title, company and
+# description) to a stored one are linked to it with duplicate_of; with
+# SCRAPE_SUPPRESS_DUPLICATES they are filed as BadJob instead.
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", 0.8))
+SCRAPE_SUPPRESS_DUPLICATES = bool(os.getenv("SCRAPE_SUPPRESS_DUPLICATES", default=0))
+
+# Admin search ranks at most this many full-text matches (see jobsearch.search).
+ADMIN_SEARCH_RESULTS = int(os.getenv("ADMIN_SEARCH_RESULTS", 1000))
+
+# The read-only JSON API (jobsearch.api) serves staff sessions, and requests
+# with "Authorization: Bearer <API_TOKEN>" when a token is set.
+API_TOKEN = os.getenv("API_TOKEN", "")
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 100))
+
+# Exports (jobsearch.export) hand out a watermark this many seconds behind their
+# start, so rows whose transaction was still open then are exported again next time.
+EXPORT_WATERMARK_LAG = float(os.getenv("EXPORT_WATERMARK_LAG", 60))
+
+# /metrics (jobsearch.metrics): web workers and scrape_jobs share their numbers
+# through METRICS_DIR when it is set; with METRICS_TOKEN, scrapes need
+# "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Shared outbound HTTP client (jobsearch.http_client) used by every source parser.
+# Connections are kept alive and reused; HTTP/2 needs the optional `h2` package.
+HTTP_CLIENT = {
+    "MAX_CONNECTIONS": int(os.getenv("HTTP_MAX_CONNECTIONS", 20)),
+    "MAX_KEEPALIVE_CONNECTIONS": int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10)),
+    "KEEPALIVE_EXPIRY": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0)),
+    "TIMEOUT": float(os.getenv("HTTP_TIMEOUT", 15.0)),
+    "CONNECT_TIMEOUT": float(os.getenv("HTTP_CONNECT_TIMEOUT", 5.0)),
+    "HTTP2": bool(os.getenv("HTTP_HTTP2", default=0)),
+}
@@ -0,0 +1,157 @@
+import re
+from collections.abc import Callable, Iterable
+from urllib.parse import urlsplit
+
+from jobsearch.utils import (
+    ASHBY_GRAPHQL_URL,
+    extract_ashby,
+    extract_greenhouse,
+    extract_lever,
+    fetch_ashby_batch,
+    fetch_page,
+)
+
+type Parsed = tuple[str, str, str, str, str | None]
+
+
+def posting_root(url: str) -> str:
+    """Drop everything after /<company>/<posting-id> (e.g. a trailing /apply)."""
+    return "/".join(url.split("/")[:5])
+
+
+_GREENHOUSE_POSTING = re.compile(r"/([^/]+)/jobs/(\d+)")
+
+
+def greenhouse_root(url: str) -> str:
+    """https://job-boards[.eu].greenhouse.io/<company>/jobs/<id>, whichever board host or query.
+
+    boards.greenhouse.io redirects to job-boards.greenhouse.io, which serves
+    the markup extract_greenhouse reads. Links of any other shape (e.g.
+    embed/job_app?token=) are kept as they are.
+    """
+    parts = urlsplit(url)
+    match = _GREENHOUSE_POSTING.match(parts.path)
+    if match is None:
+        return url
+    eu = ".eu." in (parts.hostname or "")
+    host = "job-boards.eu.greenhouse.io" if eu else "job-boards.greenhouse.io"
+    return f"https://{host}/{match[1]}/jobs/{match[2]}"
+
+
+class SourceAdapter:
+    """How links of one ATS are recognised, fetched and parsed.
+
+    `hosts` are exact hostnames or "*.example.com" patterns (any subdomain).
+    `normalize` maps a search-result link to the canonical posting URL that
+    is stored and deduplicated. Pages are fetched one by one with `fetch`,
+    unless `fetch_batch` is given: then all links of a search page are
+    fetched with a single call, rate-limited as a request to `batch_url`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        hosts: Iterable[str],
+        extract: Callable[[str, str], Parsed],
+        normalize: Callable[[str], str] | None = None,
+        fetch: Callable[[str], str] = fetch_page,
+        fetch_batch: Callable[[list[str]], dict[str, str | Exception]] | None = None,
+        batch_url: str | None = None,
+    ) -> None:
+        if fetch_batch is not None and batch_url is None:
+            raise ValueError("batch_url is required with fetch_batch")
+        self.name = name
+        self.hosts = tuple(hosts)
+        self.extract = extract
+        self.normalize = normalize or (lambda url: url)
+        self.fetch = fetch
+        self.fetch_batch = fetch_batch
+        self.batch_url = batch_url
+
+    def __repr__(self) -> str:
+        return f"<SourceAdapter {self.name}>"
+
+
+_ADAPTERS: dict[str, SourceAdapter] = {}
+_EXACT_HOSTS: dict[str, SourceAdapter] = {}
+_HOST_SUFFIXES: dict[str, SourceAdapter] = {}
+
+
+def register(adapter: SourceAdapter) -> SourceAdapter:
+    """Add an adapter to the registry; its host patterns must not overlap existing ones."""
+    if adapter.name in _ADAPTERS:
+        raise ValueError(f"source {adapter.name!r} is already registered")
+    routes = []
+    for pattern in adapter.hosts:
+        pattern = pattern.lower()
+        table, host = (
+            (_HOST_SUFFIXES, pattern[2:]) if pattern.startswith("*.") else (_EXACT_HOSTS, pattern)
+        )
+        if host in table:
+            raise ValueError(f"host {pattern!r} is already routed to {table[host].name}")
+        routes.append((table, host))
+    for table, host in routes:
+        table[host] = adapter
+    _ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+def get_adapter(name: str) -> SourceAdapter:
+    return _ADAPTERS[name]
+
+
+def source_names() -> list[str]:
+    return sorted(_ADAPTERS)
+
+
+def route(url: str) -> SourceAdapter | None:
+    """The adapter whose host patterns match url's hostname, or None."""
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    adapter = _EXACT_HOSTS.get(host)
+    if adapter is not None or not _HOST_SUFFIXES:
+        return adapter
+    # "*.example.com" patterns: try each parent domain, longest first
+    labels = host.split(".")
+    for i in range(1, len(labels) - 1):
+        adapter = _HOST_SUFFIXES.get(".".join(labels[i:]))
+        if adapter is not None:
+            return adapter
+    return None
+
+
+register(
+    SourceAdapter(
+        "greenhouse",
+        hosts=[
+            "boards.greenhouse.io",
+            "job-boards.greenhouse.io",
+            "boards.eu.greenhouse.io",
+            "job-boards.eu.greenhouse.io",
+        ],
+        extract=extract_greenhouse,
+        normalize=greenhouse_root,
+    )
+)
+register(
+    SourceAdapter(
+        "lever",
+        hosts=["jobs.lever.co", "jobs.eu.lever.co"],
+        extract=extract_lever,
+        normalize=posting_root,
+    )
+)
+register(
+    SourceAdapter(
+        "ashby",
+        hosts=["jobs.ashbyhq.com"],
+        extract=extract_ashby,
+        normalize=posting_root,
+        fetch_batch=fetch_ashby_batch,
+        batch_url=ASHBY_GRAPHQL_URL,
+    )
+)
@@ -1,14 +1,37 @@
 document.addEventListener('DOMContentLoaded', function () {
+    // clicks within DEBOUNCE_MS of each other are saved by one request
+    const DEBOUNCE_MS = 500;
+    const pending = new Map();
+    let timer = null;
+
+    function flush() {
+        clearTimeout(timer);
+        timer = null;
+        if (pending.size === 0) {
+            return;
+        }
+        const body = new URLSearchParams();
+        pending.forEach(function (value, pk) {
+            body.append('pk', pk);
+            body.append('value', value);
+        });
+        pending.clear();
+        const csrf = document.cookie.match(/csrftoken=([^;]+)/)[1];
+        fetch('toggle-applied/', {
+            method: 'POST',
+            headers: {'X-CSRFToken': csrf, 'Content-Type': 'application/x-www-form-urlencoded'},
+            body: body,
+            // lets a batch sent while leaving the page complete
+            keepalive: true
+        });
+    }
+
     document.querySelectorAll('.autosave-applied').forEach(function (cb) {
         cb.addEventListener('change', function () {
-            const pk = this.dataset.id;
-            const value = this.checked ? '1' : '0';
-            const csrf = document.cookie.match(/csrftoken=([^;]+)/)[1];
-            fetch('toggle-applied/' + pk + '/', {
-                method: 'POST',
-                headers: {'X-CSRFToken': csrf, 'Content-Type': 'application/x-www-form-urlencoded'},
-                body: 'value=' + value
-            });
+            pending.set(this.dataset.id, this.checked ? '1' : '0');
+            clearTimeout(timer);
+            timer = setTimeout(flush, DEBOUNCE_MS);
         });
     });
+    window.addEventListener('pagehide', flush);
 });
@@ -0,0 +1,19 @@
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+@pytest.fixture
+def secret_key():
+    """A SECRET_KEY for tests using sessions (admin_client), when none is configured.
+
+    pytest-django's settings fixture cannot restore an empty key: Django
+    refuses to read one back on teardown. So this swaps it by hand.
+    """
+    try:
+        original = settings.SECRET_KEY
+    except ImproperlyConfigured:
+        original = ""
+    settings.SECRET_KEY = original or "test-insecure-key"
+    yield
+    settings.SECRET_KEY = original
@@ -0,0 +1,180 @@
+from datetime import UTC, date, datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobsearch.admin import BadJobAdmin, JobPostingAdmin
+from jobsearch.models import BadJob, JobPosting, WatchedCompany
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("secret_key")]
+
+
+def test_convert_to_bad_keeps_fields_and_tolerates_existing_bad_jobs(admin_client):
+    kept = JobPosting.objects.create(url="https://jobs.lever.co/acme/0", title="Keep me")
+    selected = [
+        JobPosting.objects.create(
+            url=f"https://jobs.lever.co/acme/{i}",
+            company="acme",
+            title=f"DE {i}",
+            location="Remote",
+            description="Build pipelines.",
+            source="lever",
+        )
+        for i in range(1, 4)
+    ]
+    BadJob.objects.create(url="https://jobs.lever.co/acme/1", title="already bad")
+
+    response = admin_client.post(
+        reverse("admin:jobsearch_jobposting_changelist"),
+        {"action": "convert_to_bad", "_selected_action": [job.pk for job in selected]},
+        follow=True,
+    )
+
+    assert "Moved 3 job(s) to Bad Jobs." in response.content.decode()
+    assert list(JobPosting.objects.all()) == [kept]
+    assert BadJob.objects.get(url="https://jobs.lever.co/acme/1").title == "already bad"
+    moved = BadJob.objects.get(url="https://jobs.lever.co/acme/2")
+    assert (moved.company, moved.title, moved.location, moved.description, moved.source) == (
+        "acme",
+        "DE 2",
+        "Remote",
+        "Build pipelines.",
+        "lever",
+    )
+
+
+def test_changelist_filters_newest_scraped_first(admin_client):
+    WatchedCompany.objects.create(name="acme", source="lever")
+    for i, (company, scraped, applied) in enumerate(
+        [
+            ("acme", datetime(2026, 10, 1, tzinfo=UTC), False),
+            ("acme", datetime(2026, 10, 3, tzinfo=UTC), False),
+            ("acme", datetime(2026, 10, 2, tzinfo=UTC), True),
+            ("globex", datetime(2026, 10, 4, tzinfo=UTC), False),
+        ]
+    ):
+        JobPosting.objects.create(
+            url=f"https://jobs.lever.co/{company}/{i}",
+            company=company,
+            posted_date=date(2026, 10, 4 - i),
+            is_applied=applied,
+        )
+        # scraped_at is auto_now_add
+        JobPosting.objects.filter(url=f"https://jobs.lever.co/{company}/{i}").update(
+            scraped_at=scraped
+        )
+
+    response = admin_client.get(
+        reverse("admin:jobsearch_jobposting_changelist"),
+        {"is_applied__exact": "0", "company": "acme"},
+    )
+
+    assert [job.url for job in response.context["cl"].result_list] == [
+        "https://jobs.lever.co/acme/1",
+        "https://jobs.lever.co/acme/0",
+    ]
+
+
+def _page_urls(response):
+    return [job.url for job in response.context["cl"].result_list]
+
+
+def test_changelist_pages_by_keyset_without_counting(admin_client, monkeypatch):
+    monkeypatch.setattr(JobPostingAdmin, "list_per_page", 2)
+    for i in range(5):
+        JobPosting.objects.create(url=f"https://jobs.lever.co/acme/{i}")
+    # ties on scraped_at are broken by id
+    JobPosting.objects.update(scraped_at=datetime(2026, 10, 1, tzinfo=UTC))
+    changelist = reverse("admin:jobsearch_jobposting_changelist")
+
+    pages, query = [], ""
+    with CaptureQueriesContext(connection) as queries:
+        while query is not False:
+            response = admin_client.get(changelist + query)
+            pages.append(_page_urls(response))
+            query = response.context["cl"].next_url
+    assert pages == [
+        ["https://jobs.lever.co/acme/4", "https://jobs.lever.co/acme/3"],
+        ["https://jobs.lever.co/acme/2", "https://jobs.lever.co/acme/1"],
+        ["https://jobs.lever.co/acme/0"],
+    ]
+    # counts, if any, stop at COUNT_CAP rows
+    counts = [
+        q["sql"] for q in queries if "COUNT(" in q["sql"] and "jobsearch_jobposting" in q["sql"]
+    ]
+    assert all("LIMIT" in sql for sql in counts)
+    assert not [q for q in queries if "OFFSET" in q["sql"]]
+    assert "5 job postings" in response.content.decode()
+
+    response = admin_client.get(changelist + response.context["cl"].previous_url)
+    assert _page_urls(response) == ["https://jobs.lever.co/acme/2", "https://jobs.lever.co/acme/1"]
+    response = admin_client.get(changelist + response.context["cl"].previous_url)
+    assert _page_urls(response) == ["https://jobs.lever.co/acme/4", "https://jobs.lever.co/acme/3"]
+    assert response.context["cl"].previous_url is False
+
+
+def test_changelist_shows_planner_estimate(admin_client, monkeypatch):
+    monkeypatch.setattr(BadJobAdmin, "list_per_page", 2)
+    for i in range(3):
+        BadJob.objects.create(url=f"https://jobs.lever.co/acme/{i}")
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse("admin:jobsearch_badjob_changelist"))
+
+    assert not [q for q in queries if "COUNT(" in q["sql"]]
+    assert response.context["cl"].result_count_estimated
+    assert "~3 bad jobs" in response.content.decode()
+
+
+def test_changelist_sorted_by_column_pages_by_offset(admin_client, monkeypatch):
+    monkeypatch.setattr(JobPostingAdmin, "list_per_page", 2)
+    for i in range(3):
+        JobPosting.objects.create(url=f"https://jobs.lever.co/acme/{i}", title=f"DE {i}")
+    changelist = reverse("admin:jobsearch_jobposting_changelist")
+
+    response = admin_client.get(changelist, {"o": "1"})
+    assert _page_urls(response) == ["https://jobs.lever.co/acme/0", "https://jobs.lever.co/acme/1"]
+    response = admin_client.get(changelist + response.context["cl"].next_url)
+    assert _page_urls(response) == ["https://jobs.lever.co/acme/2"]
+    assert response.context["cl"].next_url is False
+
+
+def test_changelist_rejects_bad_cursor(admin_client):
+    response = admin_client.get(
+        reverse("admin:jobsearch_jobposting_changelist"), {"after": "yesterday_1"}
+    )
+
+    assert response.status_code == 302
+    assert "e=1" in response.url
+
+
+def test_toggle_applied_bulk_updates_in_one_statement(admin_client):
+    jobs = [
+        JobPosting.objects.create(url=f"https://jobs.lever.co/acme/{i}", is_applied=i == 2)
+        for i in range(4)
+    ]
+    url = reverse("admin:jobsearch_jobposting_changelist") + "toggle-applied/"
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.post(
+            url,
+            # the last value sent for a pk wins
+            {"pk": [jobs[0].pk, jobs[1].pk, jobs[2].pk, jobs[0].pk], "value": ["0", "1", "0", "1"]},
+        )
+
+    assert response.json() == {"status": "ok", "updated": 3}
+    [statement] = [q["sql"] for q in queries if "jobsearch_jobposting" in q["sql"]]
+    assert statement.startswith("UPDATE") and "CASE WHEN" in statement
+    assert list(JobPosting.objects.order_by("pk").values_list("is_applied", flat=True)) == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+    assert admin_client.post(url, {"pk": ["x"], "value": ["1"]}).status_code == 400
+    assert admin_client.post(url, {"pk": [jobs[3].pk]}).status_code == 400
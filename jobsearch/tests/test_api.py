@@ -0,0 +1,94 @@
+from datetime import UTC, date, datetime
+
+import pytest
+from django.urls import reverse
+
+from jobsearch.models import BadJob, JobPosting
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("secret_key")]
+
+
+def _posting(i, **fields):
+    job = JobPosting.objects.create(url=f"https://jobs.lever.co/acme/{i}", **fields)
+    # scraped_at is auto_now_add
+    JobPosting.objects.filter(pk=job.pk).update(scraped_at=datetime(2026, 10, i, tzinfo=UTC))
+    return job
+
+
+def test_api_needs_staff_or_token(client, admin_client, settings):
+    url = reverse("api-postings")
+    settings.API_TOKEN = "s3cret"
+
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get(url, headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    assert admin_client.get(url).status_code == 200
+
+    settings.API_TOKEN = ""
+    assert client.get(url, headers={"Authorization": "Bearer "}).status_code == 401
+
+
+def test_api_pages_newest_scraped_first_without_descriptions(admin_client):
+    for i in range(1, 6):
+        _posting(i, title=f"DE {i}", description="Long text")
+
+    pages, url = [], reverse("api-postings") + "?limit=2"
+    while url:
+        body = admin_client.get(url).json()
+        pages.append([row["title"] for row in body["results"]])
+        url = body["next"]
+
+    assert pages == [["DE 5", "DE 4"], ["DE 3", "DE 2"], ["DE 1"]]
+    row = admin_client.get(reverse("api-postings"), {"limit": 1}).json()["results"][0]
+    assert "description" not in row and "minhash" not in row
+    assert row["scraped_at"] == "2026-10-05T00:00:00Z"
+
+
+def test_api_selects_fields_and_filters(admin_client):
+    _posting(1, company="acme", title="Old", posted_date=date(2026, 9, 1))
+    _posting(2, company="acme", title="Applied", is_applied=True, description="<p>Pipelines</p>")
+    _posting(3, company="acme", title="New", posted_date=date(2026, 10, 1), description="Spark")
+    _posting(4, company="globex", title="Other")
+    BadJob.objects.create(url="https://jobs.lever.co/acme/bad", company="acme", source="lever")
+
+    response = admin_client.get(
+        reverse("api-postings"),
+        {"company": "acme", "is_applied": "false", "fields": "title,description"},
+    )
+    assert response.json()["results"] == [
+        {"id": JobPosting.objects.get(title="New").pk, "title": "New", "description": "Spark"},
+        {"id": JobPosting.objects.get(title="Old").pk, "title": "Old", "description": ""},
+    ]
+    response = admin_client.get(reverse("api-postings"), {"posted_date__gte": "2026-09-15"})
+    assert [row["title"] for row in response.json()["results"]] == ["New"]
+    response = admin_client.get(reverse("api-bad-jobs"), {"source": "lever"})
+    assert [row["url"] for row in response.json()["results"]] == ["https://jobs.lever.co/acme/bad"]
+
+    for url, params in [
+        (reverse("api-postings"), {"fields": "title,minhash"}),
+        (reverse("api-postings"), {"is_applied": "maybe"}),
+        (reverse("api-postings"), {"limit": "0"}),
+        (reverse("api-postings"), {"after": "yesterday_1"}),
+        (reverse("api-bad-jobs"), {"is_applied": "true"}),
+    ]:
+        assert admin_client.get(url, params).status_code == 400, params
+
+
+def test_api_answers_unchanged_pages_with_304(admin_client):
+    first = _posting(1, title="DE 1")
+    second = _posting(2, title="DE 2")
+    url = reverse("api-postings")
+
+    response = admin_client.get(url)
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    assert admin_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    first.title = "DE 1 (edited)"
+    first.save()
+    response = admin_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    second.delete()
+    assert admin_client.get(url, headers={"If-None-Match": etag}).status_code == 200
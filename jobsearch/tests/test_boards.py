@@ -0,0 +1,129 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from jobsearch.boards import (
+    ASHBY_BOARD_URL,
+    GREENHOUSE_BOARD_URL,
+    LEVER_BOARD_URL,
+    fetch_ashby_board,
+    fetch_greenhouse_board,
+    fetch_lever_board,
+)
+from jobsearch.models import BadJob, JobPosting, WatchedCompany
+
+GREENHOUSE_BOARD = {
+    "jobs": [
+        {
+            "absolute_url": "https://boards.greenhouse.io/acme/jobs/1?gh_src=board",
+            "title": "Data Engineer",
+            "location": {"name": "New York, NY"},
+            "content": "&lt;p&gt;Build data pipelines.&lt;/p&gt;",
+            "first_published": "2024-01-15T10:00:00-05:00",
+        },
+        {
+            "id": 2,
+            "absolute_url": "https://acme.example/careers?gh_jid=2",
+            "title": "Data Engineer, EMEA",
+            "location": {"name": "London"},
+            "content": "",
+            "first_published": None,
+        },
+    ]
+}
+
+LEVER_BOARD = [
+    {
+        "hostedUrl": "https://jobs.lever.co/acme/abc-123",
+        "text": "Data Engineer",
+        "categories": {"location": "San Francisco"},
+        "description": "<p>Build pipelines</p>",
+        "createdAt": 1705312800000,
+    }
+]
+
+ASHBY_BOARD = {
+    "jobs": [
+        {
+            "jobUrl": "https://jobs.ashbyhq.com/acme/uuid-1",
+            "title": "Data Engineer",
+            "location": "Remote",
+            "descriptionHtml": "<p>Description</p>",
+            "publishedAt": "2024-01-15T10:00:00.000+00:00",
+            "isListed": True,
+        },
+        {
+            "jobUrl": "https://jobs.ashbyhq.com/acme/uuid-2",
+            "title": "Hidden",
+            "isListed": False,
+        },
+    ]
+}
+
+
+def test_fetch_greenhouse_board(httpx_mock):
+    httpx_mock.add_response(url=GREENHOUSE_BOARD_URL.format(company="acme"), json=GREENHOUSE_BOARD)
+    jobs = fetch_greenhouse_board("acme")
+    # stored under the URL scrape_jobs gives the same posting, whatever the board links to
+    assert jobs["https://job-boards.greenhouse.io/acme/jobs/1"] == (
+        "acme",
+        "Data Engineer",
+        "New York, NY",
+        "Build data pipelines.",
+        "2024-01-15",
+    )
+    assert jobs["https://job-boards.greenhouse.io/acme/jobs/2"][4] is None
+
+
+def test_fetch_lever_board(httpx_mock):
+    httpx_mock.add_response(url=LEVER_BOARD_URL.format(company="acme"), json=LEVER_BOARD)
+    jobs = fetch_lever_board("acme")
+    assert jobs == {
+        "https://jobs.lever.co/acme/abc-123": (
+            "acme",
+            "Data Engineer",
+            "San Francisco",
+            "<p>Build pipelines</p>",
+            "2024-01-15",
+        )
+    }
+
+
+def test_fetch_ashby_board_skips_unlisted(httpx_mock):
+    httpx_mock.add_response(url=ASHBY_BOARD_URL.format(company="acme"), json=ASHBY_BOARD)
+    jobs = fetch_ashby_board("acme")
+    assert list(jobs) == ["https://jobs.ashbyhq.com/acme/uuid-1"]
+    assert jobs["https://jobs.ashbyhq.com/acme/uuid-1"][4] == "2024-01-15"
+
+
+@pytest.mark.django_db
+def test_ingest_boards_inserts_only_new_jobs(httpx_mock, settings):
+    settings.SCRAPE_HOST_RATES = {}
+    settings.SCRAPE_DEFAULT_HOST_RATE = 1000.0
+    WatchedCompany.objects.create(name="acme", source="greenhouse")
+    WatchedCompany.objects.create(name="gone", source="lever", active=False)
+    # found earlier by scrape_jobs; the board links to boards.greenhouse.io
+    JobPosting.objects.create(url="https://job-boards.greenhouse.io/acme/jobs/1")
+    httpx_mock.add_response(url=GREENHOUSE_BOARD_URL.format(company="acme"), json=GREENHOUSE_BOARD)
+
+    out = StringIO()
+    call_command("ingest_boards", stdout=out, stderr=StringIO())
+
+    assert "greenhouse:acme: 2 open job(s), 1 new" in out.getvalue()
+    assert JobPosting.objects.count() == 1
+    assert BadJob.objects.get().url == "https://job-boards.greenhouse.io/acme/jobs/2"
+    assert WatchedCompany.objects.get(name="acme").last_ingested_at is not None
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.django_db
+def test_ingest_boards_company_option(httpx_mock, settings):
+    settings.SCRAPE_DEFAULT_HOST_RATE = 1000.0
+    httpx_mock.add_response(url=LEVER_BOARD_URL.format(company="acme"), json=LEVER_BOARD)
+
+    out = StringIO()
+    call_command("ingest_boards", company=["lever:acme"], stdout=out, stderr=StringIO())
+
+    assert "Added 1 new job postings." in out.getvalue()
+    assert JobPosting.objects.get().source == "lever"
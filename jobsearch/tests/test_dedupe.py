@@ -0,0 +1,127 @@
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from jobsearch.dedupe import DuplicateDetector, shingles, signature, similarity
+from jobsearch.models import BadJob, JobPosting, PostingBand
+from jobsearch.utils import move_company_to_bad
+from jobsearch.writer import PostingWriter
+
+_WORDS = [f"w{i}" for i in range(2000)]
+
+
+def _description(seed, words=200):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _posting(i, description, company="acme"):
+    return JobPosting(
+        url=f"https://jobs.lever.co/{company}/{i}",
+        company=company,
+        title="Data Engineer",
+        description=description,
+    )
+
+
+def test_similarity_tracks_jaccard():
+    base = _description(1).split()
+    edited = base[:180] + _description(2, 20).split()
+
+    a = shingles(" ".join(base))
+    b = shingles(" ".join(edited))
+    jaccard = len(a & b) / len(a | b)
+    estimate = similarity(signature(a), signature(b))
+
+    assert abs(estimate - jaccard) < 0.2
+    assert similarity(signature(a), signature(shingles(_description(3)))) < 0.2
+
+
+def test_signature_ignores_markup_and_case():
+    assert signature(shingles("<p>Build DATA pipelines</p>")) == signature(
+        shingles("build data &nbsp; pipelines")
+    )
+    assert signature(shingles("")) is None
+
+
+@pytest.mark.django_db
+def test_writer_links_near_duplicates():
+    text = _description(1)
+    writer = PostingWriter(dedupe=DuplicateDetector(threshold=0.8))
+    writer.add(_posting(1, text))
+    writer.flush()
+    writer.add(_posting(2, text + " Apply on our careers page.", company="acme"))
+    writer.add(_posting(3, _description(2)))
+    # mirror of posting 3 in the same batch
+    writer.add(_posting(4, _description(2)))
+    writer.flush()
+
+    links = dict(JobPosting.objects.values_list("url", "duplicate_of"))
+    assert links == {
+        "https://jobs.lever.co/acme/1": "",
+        "https://jobs.lever.co/acme/2": "https://jobs.lever.co/acme/1",
+        "https://jobs.lever.co/acme/3": "",
+        "https://jobs.lever.co/acme/4": "https://jobs.lever.co/acme/3",
+    }
+    assert PostingBand.objects.count() == 4 * 16
+
+
+@pytest.mark.django_db
+def test_writer_suppresses_duplicates_as_bad_jobs():
+    text = _description(1)
+    writer = PostingWriter(dedupe=DuplicateDetector(threshold=0.8, suppress=True))
+    writer.add(_posting(1, text))
+    writer.add(_posting(2, text))
+    writer.flush()
+
+    assert list(JobPosting.objects.values_list("url", flat=True)) == [
+        "https://jobs.lever.co/acme/1"
+    ]
+    bad = BadJob.objects.get()
+    assert (bad.url, bad.title, bad.description) == (
+        "https://jobs.lever.co/acme/2",
+        "Data Engineer",
+        text,
+    )
+
+
+@pytest.mark.django_db
+def test_bands_of_moved_postings_are_deleted():
+    text = _description(1)
+    writer = PostingWriter(dedupe=DuplicateDetector(threshold=0.8))
+    writer.add(_posting(1, text, company="gone"))
+    writer.flush()
+    move_company_to_bad("gone")
+    assert not PostingBand.objects.exists()
+
+    writer.add(_posting(2, text))
+    writer.flush()
+
+    assert JobPosting.objects.get().duplicate_of == ""
+
+
+@pytest.mark.django_db
+def test_dedupe_jobs_backfill():
+    text = _description(1)
+    JobPosting.objects.bulk_create(
+        [_posting(1, text), _posting(2, _description(2)), _posting(3, text), _posting(4, "")]
+    )
+
+    out = StringIO()
+    call_command("dedupe_jobs", batch_size=2, stdout=out)
+
+    assert "Signed 4 posting(s), 1 linked as near-duplicates." in out.getvalue()
+    assert JobPosting.objects.get(url="https://jobs.lever.co/acme/3").duplicate_of == (
+        "https://jobs.lever.co/acme/1"
+    )
+
+    call_command("dedupe_jobs", rebuild=True, stdout=out)
+    assert PostingBand.objects.count() == 4 * 16
+    assert JobPosting.objects.exclude(duplicate_of="").count() == 1
+
+    JobPosting.objects.filter(url="https://jobs.lever.co/acme/2").delete()
+    call_command("dedupe_jobs", prune=True, stdout=out)
+    assert "Pruned 16 band(s) of deleted postings." in out.getvalue()
+    assert PostingBand.objects.count() == 3 * 16
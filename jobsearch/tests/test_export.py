@@ -0,0 +1,151 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from jobsearch.export import Export
+from jobsearch.models import BadJob, JobPosting
+from jobsearch.utils import move_company_to_bad
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("secret_key")]
+
+
+@pytest.fixture(autouse=True)
+def _no_watermark_lag(settings):
+    settings.EXPORT_WATERMARK_LAG = 0
+
+
+def _ndjson(data):
+    return [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+
+
+def test_export_jobs_writes_gzip_ndjson_and_csv(tmp_path):
+    for i in range(5):
+        JobPosting.objects.create(
+            url=f"https://jobs.lever.co/acme/{i}",
+            title=f"DE {i}",
+            description="Line one\nline, two é",
+        )
+    bad = BadJob.objects.create(url="https://jobs.lever.co/acme/bad", title="Sales")
+
+    err = StringIO()
+    call_command("export_jobs", output=tmp_path / "jobs.ndjson.gz", chunk_size=2, stderr=err)
+    rows = _ndjson((tmp_path / "jobs.ndjson.gz").read_bytes())
+    assert [row["title"] for row in rows] == [f"DE {i}" for i in range(5)]
+    assert rows[0]["description"] == "Line one\nline, two é"
+    assert "minhash" not in rows[0]
+    assert "Exported 5 job postings" in err.getvalue()
+
+    call_command(
+        "export_jobs",
+        model="bad-jobs",
+        format="csv",
+        fields="url,title",
+        output=tmp_path / "bad.csv.gz",
+        stderr=err,
+    )
+    with gzip.open(tmp_path / "bad.csv.gz", "rt", newline="") as f:
+        assert list(csv.DictReader(f)) == [
+            {"id": str(bad.pk), "url": "https://jobs.lever.co/acme/bad", "title": "Sales"}
+        ]
+
+
+def test_export_jobs_resumes_from_watermark(tmp_path):
+    watermark = tmp_path / "watermark"
+    old = JobPosting.objects.create(url="https://jobs.lever.co/acme/0", title="Old")
+    call_command(
+        "export_jobs", output=tmp_path / "1.gz", watermark_file=watermark, stderr=StringIO()
+    )
+    assert [row["title"] for row in _ndjson((tmp_path / "1.gz").read_bytes())] == ["Old"]
+
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/1", title="New")
+    old.title = "Old (edited)"
+    old.save()
+    call_command(
+        "export_jobs", output=tmp_path / "2.gz", watermark_file=watermark, stderr=StringIO()
+    )
+    assert [row["title"] for row in _ndjson((tmp_path / "2.gz").read_bytes())] == [
+        "New",
+        "Old (edited)",
+    ]
+
+    call_command(
+        "export_jobs", output=tmp_path / "3.gz", watermark_file=watermark, stderr=StringIO()
+    )
+    assert _ndjson((tmp_path / "3.gz").read_bytes()) == []
+
+
+def test_export_jobs_picks_up_jobs_moved_to_bad(tmp_path):
+    watermark = tmp_path / "watermark"
+    JobPosting.objects.create(url="https://jobs.lever.co/badco/0", company="badco", title="Sales")
+    call_command(
+        "export_jobs",
+        model="bad-jobs",
+        output=tmp_path / "1.gz",
+        watermark_file=watermark,
+        stderr=StringIO(),
+    )
+    assert _ndjson((tmp_path / "1.gz").read_bytes()) == []
+
+    move_company_to_bad("badco")
+    call_command(
+        "export_jobs",
+        model="bad-jobs",
+        output=tmp_path / "2.gz",
+        watermark_file=watermark,
+        stderr=StringIO(),
+    )
+    assert [row["title"] for row in _ndjson((tmp_path / "2.gz").read_bytes())] == ["Sales"]
+
+
+def test_export_watermark_lags_so_late_commits_are_exported_again(settings):
+    settings.EXPORT_WATERMARK_LAG = 60
+    job = JobPosting.objects.create(url="https://jobs.lever.co/acme/0", title="DE")
+
+    first = Export(JobPosting)
+    assert len(_ndjson(b"".join(first))) == 1
+    assert first.until < job.updated_at
+
+    # a row committed late, stamped before the first export's watermark
+    JobPosting.objects.filter(pk=job.pk).update(updated_at=first.until + timedelta(seconds=1))
+    assert [row["id"] for row in _ndjson(b"".join(Export(JobPosting, since=first.until)))] == [
+        job.pk
+    ]
+
+
+def test_export_streams_in_chunks():
+    for i in range(50):
+        JobPosting.objects.create(url=f"https://jobs.lever.co/acme/{i}", description=f"{i} " * 2000)
+
+    export = Export(JobPosting, chunk_size=10)
+    chunks = list(export)
+
+    assert len(chunks) > 1
+    assert export.count == 50
+    assert len(_ndjson(b"".join(chunks))) == 50
+
+
+def test_export_view_streams_for_staff(client, admin_client):
+    job = JobPosting.objects.create(url="https://jobs.lever.co/acme/0", title="DE")
+    url = reverse("api-postings-export")
+
+    assert client.get(url).status_code == 401
+    response = admin_client.get(url, {"format": "csv", "fields": "url,title"})
+    assert response.streaming
+    assert response.headers["Content-Disposition"].endswith('.csv.gz"')
+    body = gzip.decompress(b"".join(response.streaming_content)).decode()
+    assert list(csv.DictReader(io.StringIO(body))) == [
+        {"id": str(job.pk), "url": "https://jobs.lever.co/acme/0", "title": "DE"}
+    ]
+
+    since = response.headers["X-Export-Until"]
+    response = admin_client.get(url, {"since": since})
+    assert _ndjson(b"".join(response.streaming_content)) == []
+    assert admin_client.get(url, {"since": "yesterday"}).status_code == 400
+    assert admin_client.get(url, {"format": "xml"}).status_code == 400
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from jobsearch.fetch import HostRateLimiter, TokenBucket, fetch_all
+
+
+def _echo(url):
+    return url
+
+
+def _boom(url):
+    raise ValueError(f"bad page {url}")
+
+
+def test_fetch_all_preserves_order_and_returns_exceptions():
+    limiter = HostRateLimiter({}, default_rate=1000)
+    jobs = [
+        ("https://jobs.lever.co/a/1", _echo),
+        ("https://jobs.lever.co/a/2", _boom),
+        ("https://boards.greenhouse.io/b/jobs/3", _echo),
+    ]
+    results = fetch_all(jobs, concurrency=4, limiter=limiter)
+    assert results[0] == "https://jobs.lever.co/a/1"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "https://boards.greenhouse.io/b/jobs/3"
+
+
+def test_fetch_all_empty():
+    assert fetch_all([], concurrency=4, limiter=HostRateLimiter({})) == []
+
+
+def test_fetch_all_limits_each_host_separately():
+    # 10 req/s per host: three requests to one host need ~0.2s,
+    # one request each to three hosts needs none of that wait
+    limiter = HostRateLimiter({}, default_rate=10)
+    same_host = [(f"https://jobs.lever.co/a/{i}", _echo) for i in range(3)]
+    t0 = time.monotonic()
+    fetch_all(same_host, concurrency=8, limiter=limiter)
+    same_host_elapsed = time.monotonic() - t0
+
+    limiter = HostRateLimiter({}, default_rate=10)
+    cross_host = [
+        ("https://jobs.lever.co/a/1", _echo),
+        ("https://boards.greenhouse.io/a/jobs/1", _echo),
+        ("https://jobs.ashbyhq.com/a/1", _echo),
+    ]
+    t0 = time.monotonic()
+    fetch_all(cross_host, concurrency=8, limiter=limiter)
+    cross_host_elapsed = time.monotonic() - t0
+
+    assert same_host_elapsed >= 0.18
+    assert cross_host_elapsed < 0.1
+
+
+def test_host_rate_limiter_uses_configured_rate():
+    limiter = HostRateLimiter({"jobs.lever.co": 5.0}, default_rate=1.0)
+    assert limiter.bucket("https://jobs.lever.co/a/1").rate == 5.0
+    assert limiter.bucket("https://jobs.ashbyhq.com/a/1").rate == 1.0
+    assert limiter.bucket("https://jobs.lever.co/b/2") is limiter.bucket(
+        "https://jobs.lever.co/a/1"
+    )
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_limiter_can_be_reused_across_batches():
+    limiter = HostRateLimiter({}, default_rate=1000)
+    fetch_all([("https://jobs.lever.co/a/1", _echo)] * 2, concurrency=1, limiter=limiter)
+    results = fetch_all([("https://jobs.lever.co/a/2", _echo)] * 2, concurrency=1, limiter=limiter)
+    assert results == ["https://jobs.lever.co/a/2"] * 2
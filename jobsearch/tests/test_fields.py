@@ -0,0 +1,35 @@
+import zlib
+
+import pytest
+from django.db import connection
+
+from jobsearch.models import JobPosting
+
+pytestmark = pytest.mark.django_db
+
+
+def test_compressed_description_round_trip():
+    text = "Build data pipelines. " * 200 + "Ünïcode ✓"
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/1", description=text)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT description FROM jobsearch_jobposting")
+        (stored,) = cursor.fetchone()
+    assert len(stored) < len(text) / 10
+    assert zlib.decompress(stored).decode() == text
+
+    assert JobPosting.objects.get().description == text
+    assert JobPosting.objects.values_list("description", flat=True).get() == text
+
+
+def test_compressed_description_defaults_to_empty_text():
+    job = JobPosting.objects.create(url="https://jobs.lever.co/acme/1")
+    assert job.description == ""
+    assert JobPosting.objects.get().description == ""
+
+
+def test_deferred_description_loads_on_access():
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/1", description="Build pipelines.")
+    job = JobPosting.objects.defer("description").get()
+    assert job.get_deferred_fields() == {"description"}
+    assert job.description == "Build pipelines."
@@ -0,0 +1,42 @@
+import httpx
+
+from jobsearch.http_client import USER_AGENT, build_client, close_client, get_client, shared_client
+
+
+def test_get_client_is_shared():
+    assert get_client() is get_client()
+
+
+def test_shared_client_closes_on_exit():
+    with shared_client() as client:
+        assert client is get_client()
+    assert client.is_closed
+    assert get_client() is not client
+    close_client()
+
+
+def test_build_client_uses_settings(settings, httpx_mock):
+    settings.HTTP_CLIENT = {
+        **settings.HTTP_CLIENT,
+        "TIMEOUT": 7.0,
+        "CONNECT_TIMEOUT": 2.0,
+        "HTTP2": False,
+    }
+    httpx_mock.add_response(url="https://jobs.lever.co/acme/1")
+    with build_client() as client:
+        assert client.timeout == httpx.Timeout(7.0, connect=2.0)
+        client.get("https://jobs.lever.co/acme/1")
+    assert httpx_mock.get_request().headers["User-Agent"] == USER_AGENT
+
+
+def test_build_client_follows_redirects(httpx_mock):
+    httpx_mock.add_response(
+        url="https://boards.greenhouse.io/acme/jobs/1",
+        status_code=301,
+        headers={"Location": "https://job-boards.greenhouse.io/acme/jobs/1"},
+    )
+    httpx_mock.add_response(url="https://job-boards.greenhouse.io/acme/jobs/1", text="posting")
+    with build_client() as client:
+        response = client.get("https://boards.greenhouse.io/acme/jobs/1")
+    response.raise_for_status()
+    assert response.text == "posting"
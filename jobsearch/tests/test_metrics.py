@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+
+import pytest
+from django.urls import reverse
+
+from jobsearch import metrics
+from jobsearch.metrics import Counter, Histogram, Registry
+
+pytestmark = pytest.mark.usefixtures("secret_key")
+
+
+def test_registry_renders_text_format_and_sums_snapshots():
+    registry = Registry()
+    calls = Counter("calls_total", "Calls made", ("source",), registry=registry)
+    latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    calls.inc(source='gr"een\\house')
+    calls.inc(2, source='gr"een\\house')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3)
+
+    assert registry.render() == (
+        "# HELP calls_total Calls made\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{source="gr\\"een\\\\house"} 3\n'
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 3.55\n"
+        "latency_seconds_count 3\n"
+    )
+    # another worker's numbers, as read back from its JSON snapshot
+    other = json.loads(json.dumps(registry.snapshot()))
+    assert "latency_seconds_count 6" in registry.render([registry.snapshot(), other])
+    with pytest.raises(ValueError):
+        calls.inc()
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_requests(client, admin_client, settings):
+    admin_client.get(reverse("admin:jobsearch_jobposting_changelist"))
+
+    body = client.get("/metrics").content.decode()
+
+    route = 'route="/admin/jobsearch/jobposting/"'
+    assert f'http_request_duration_seconds_count{{{route},method="GET",status="200"}}' in body
+    assert f"http_request_db_queries_sum{{{route}}}" in body
+
+    settings.METRICS_TOKEN = "s3cret"
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_merges_workers_and_textfiles(client, settings, tmp_path, monkeypatch):
+    settings.METRICS_DIR = str(tmp_path)
+    monkeypatch.setattr(metrics, "_last_snapshot", 0.0)
+    client.get("/")
+    client.get("/")
+    # snapshots after requests are throttled: the second one is not written yet
+    snapshot = json.loads((tmp_path / f"web-{os.getpid()}.json").read_text())
+    own = snapshot["http_request_duration_seconds"][json.dumps(["/", "GET", "200"])][-1]
+    assert metrics.REQUEST_SECONDS.snapshot()[json.dumps(["/", "GET", "200"])][-1] == own + 1
+
+    # another live worker, an exited one, and an unreadable textfile
+    (tmp_path / f"web-{os.getppid()}.json").write_text(json.dumps(snapshot))
+    dead = tmp_path / f"web-{_exited_pid()}.json"
+    dead.write_text(json.dumps(snapshot))
+    (tmp_path / "scrape_jobs.prom").write_text("scrape_run_success 1\n")
+    (tmp_path / "broken.prom").mkdir()
+
+    body = client.get("/metrics").content.decode()
+
+    sample = 'http_request_duration_seconds_count{route="/",method="GET",status="200"}'
+    assert f"{sample} {2 * own + 1}\n" in body
+    assert body.endswith("scrape_run_success 1\n")
+    assert not dead.exists()
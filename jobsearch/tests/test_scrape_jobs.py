@@ -0,0 +1,456 @@
+import json
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobsearch.archive import iter_pages
+from jobsearch.metrics import SCRAPER
+from jobsearch.models import (
+    BadCompany,
+    BadJob,
+    JobPosting,
+    PostingBand,
+    RawPage,
+    SearchCache,
+    SearchQuery,
+    SearchQuota,
+)
+from jobsearch.scheduler import allocate_pages, date_restrict
+from jobsearch.sources import get_adapter
+from jobsearch.utils import reset_location_matcher
+
+COMMAND = "jobsearch.management.commands.scrape_jobs"
+SEARCH = f"{COMMAND}.google_search"
+
+
+@pytest.fixture(autouse=True)
+def _no_rate_limit(settings):
+    settings.SCRAPE_HOST_RATES = {}
+    settings.SCRAPE_DEFAULT_HOST_RATE = 1000.0
+    settings.SCRAPE_ARCHIVE_PAGES = False
+    settings.SEARCH_CACHE_TTL = 0
+    settings.SEARCH_PREFETCH_PAGES = 1
+    reset_location_matcher()
+
+
+@contextmanager
+def _fetch_pages(**kwargs):
+    """Stub the page fetch of every source that fetches pages one by one."""
+    fetch = Mock(**kwargs)
+    with (
+        patch.object(get_adapter("greenhouse"), "fetch", fetch),
+        patch.object(get_adapter("lever"), "fetch", fetch),
+    ):
+        yield fetch
+
+
+def _search_page(*links, next_start=None):
+    queries = {"nextPage": [{"startIndex": next_start}]} if next_start else {}
+    return [{"link": link, "title": "Result", "snippet": ""} for link in links], queries
+
+
+def _greenhouse_html(title, location):
+    return (
+        f'<div class="job__title"><h1>{title}</h1></div>'
+        f'<div class="job__location">{location}</div>'
+        f'<div class="job__description">Build pipelines.</div>'
+    )
+
+
+def _lever_html(title, location):
+    ld_json = {"title": title, "jobLocation": {"address": {"addressLocality": location}}}
+    return f'<script type="application/ld+json">{json.dumps(ld_json)}</script>'
+
+
+def _ashby_body(title, location):
+    return json.dumps({"title": title, "locationName": location, "linkedData": None})
+
+
+def _run(**options):
+    out, err = StringIO(), StringIO()
+    call_command("scrape_jobs", stdout=out, stderr=err, **options)
+    return out.getvalue(), err.getvalue()
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_saves_and_rejects():
+    BadCompany.objects.create(name="badco")
+    page = _search_page(
+        "https://job-boards.greenhouse.io/acme/jobs/1",
+        "https://jobs.lever.co/badco/abc-123/apply",
+        "https://job-boards.greenhouse.io/acme/jobs/2",
+    )
+    bodies = {
+        "https://job-boards.greenhouse.io/acme/jobs/1": _greenhouse_html("DE", "New York"),
+        "https://job-boards.greenhouse.io/acme/jobs/2": _greenhouse_html("DE 2", "London"),
+        "https://jobs.lever.co/badco/abc-123": _lever_html("DE", "Remote"),
+    }
+    with (
+        patch(SEARCH, return_value=page),
+        _fetch_pages(side_effect=bodies.__getitem__),
+    ):
+        out, err = _run()
+
+    assert "Added 1 new job postings." in out
+    assert list(JobPosting.objects.values_list("url", flat=True)) == [
+        "https://job-boards.greenhouse.io/acme/jobs/1"
+    ]
+    assert set(BadJob.objects.values_list("url", flat=True)) == {
+        "https://jobs.lever.co/badco/abc-123",
+        "https://job-boards.greenhouse.io/acme/jobs/2",
+    }
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_writes_metrics_textfile(tmp_path):
+    for metric in SCRAPER.metrics.values():
+        metric.clear()
+    BadCompany.objects.create(name="badco")
+    page = _search_page(
+        "https://job-boards.greenhouse.io/acme/jobs/1",
+        "https://jobs.lever.co/badco/abc-123/apply",
+        "https://job-boards.greenhouse.io/acme/jobs/2",
+        "https://job-boards.greenhouse.io/acme/jobs/3",
+    )
+    bodies = {
+        "https://job-boards.greenhouse.io/acme/jobs/1": _greenhouse_html("DE", "New York"),
+        "https://job-boards.greenhouse.io/acme/jobs/2": _greenhouse_html("DE 2", "London"),
+        "https://job-boards.greenhouse.io/acme/jobs/3": "<html></html>",
+        "https://jobs.lever.co/badco/abc-123": _lever_html("DE", "Remote"),
+    }
+    with (
+        patch(SEARCH, return_value=page),
+        _fetch_pages(side_effect=bodies.__getitem__),
+    ):
+        _run(metrics_file=str(tmp_path / "scrape_jobs.prom"))
+
+    lines = (tmp_path / "scrape_jobs.prom").read_text().splitlines()
+    for sample in [
+        "scrape_search_calls_total 1",
+        'scrape_fetches_total{source="greenhouse",outcome="ok"} 3',
+        'scrape_fetches_total{source="lever",outcome="ok"} 1',
+        'scrape_parse_failures_total{source="greenhouse"} 1',
+        'scrape_rejections_total{reason="company"} 1',
+        'scrape_rejections_total{reason="location"} 1',
+        "scrape_db_write_seconds_count 1",
+        "scrape_run_success 1",
+    ]:
+        assert sample in lines
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_skips_known_urls_and_reports_fetch_errors():
+    JobPosting.objects.create(url="https://job-boards.greenhouse.io/acme/jobs/1")
+    page = _search_page(
+        "https://job-boards.greenhouse.io/acme/jobs/1",
+        "https://job-boards.greenhouse.io/acme/jobs/2",
+    )
+    with (
+        patch(SEARCH, return_value=page),
+        _fetch_pages(return_value="<html></html>"),
+    ):
+        out, err = _run()
+
+    assert "Failed fetch https://job-boards.greenhouse.io/acme/jobs/2: missing .job__title" in err
+    assert "acme/jobs/1" not in err
+    assert JobPosting.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_stats_reports_one_dedupe_query_per_page():
+    page = _search_page(*(f"https://jobs.ashbyhq.com/acme/{i}/application" for i in range(10)))
+    with (
+        patch(SEARCH, return_value=page),
+        patch.object(get_adapter("ashby"), "fetch_batch", side_effect=ValueError("GraphQL errors")),
+    ):
+        out, _ = _run(stats=True)
+
+    assert "1 search page(s) (1 API call(s)), 10 link(s)" in out
+    assert "(1 for dedupe, 0 write batch(es))" in out
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_batches_ashby_postings():
+    page = _search_page(
+        "https://jobs.ashbyhq.com/acme/1/application",
+        "https://jobs.ashbyhq.com/other/2",
+    )
+    with (
+        patch(SEARCH, return_value=page),
+        patch.object(
+            get_adapter("ashby"),
+            "fetch_batch",
+            return_value={
+                "https://jobs.ashbyhq.com/acme/1": _ashby_body("DE", "Remote"),
+                "https://jobs.ashbyhq.com/other/2": "null",
+            },
+        ) as batch,
+    ):
+        out, err = _run()
+
+    batch.assert_called_once_with(
+        ["https://jobs.ashbyhq.com/acme/1", "https://jobs.ashbyhq.com/other/2"]
+    )
+    assert "Added 1 new job postings." in out
+    assert "Failed fetch https://jobs.ashbyhq.com/other/2: jobPosting is null" in err
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_archive_and_reparse():
+    page = _search_page(
+        "https://job-boards.greenhouse.io/acme/jobs/1", "https://jobs.lever.co/acme/x"
+    )
+    bodies = {
+        "https://job-boards.greenhouse.io/acme/jobs/1": _greenhouse_html("DE", "New York"),
+        "https://jobs.lever.co/acme/x": "<html>no ld+json</html>",
+    }
+    with (
+        patch(SEARCH, return_value=page),
+        _fetch_pages(side_effect=bodies.__getitem__),
+    ):
+        _run(archive=True)
+
+    # the page that failed to parse is archived too, ready for a backfill
+    assert RawPage.objects.count() == 2
+    assert {url: body for url, _, body in iter_pages()} == bodies
+
+    JobPosting.objects.update(title="stale", location="")
+    stamped = JobPosting.objects.get().updated_at
+    out = StringIO()
+    call_command("reparse_jobs", stdout=out, stderr=StringIO())
+
+    assert "Re-parsed 1 page(s), 1 failed, 1 job(s) updated, 0 moved to BadJob." in out.getvalue()
+    posting = JobPosting.objects.get()
+    assert (posting.title, posting.location) == ("DE", "New York")
+    # incremental exports see the re-parsed row
+    assert posting.updated_at > stamped
+
+
+@pytest.mark.django_db
+def test_reparse_moves_postings_whose_location_is_now_blocked():
+    from jobsearch.archive import store_pages
+
+    url = "https://job-boards.greenhouse.io/acme/jobs/1"
+    store_pages([(url, "greenhouse", _greenhouse_html("DE", "Berlin"))])
+    JobPosting.objects.create(url=url, title="DE", location="")
+
+    out = StringIO()
+    call_command("reparse_jobs", stdout=out, stderr=StringIO())
+
+    assert "1 moved to BadJob." in out.getvalue()
+    assert not JobPosting.objects.exists()
+    bad = BadJob.objects.get()
+    assert (bad.location, bad.location_allowed) == ("Berlin", False)
+
+
+@pytest.mark.django_db
+def test_reparse_re_signs_postings():
+    from jobsearch.archive import store_pages
+    from jobsearch.dedupe import band_keys, pack, shingles, signature
+
+    first, second = (f"https://job-boards.greenhouse.io/acme/jobs/{i}" for i in (1, 2))
+    JobPosting.objects.create(url=first, company="acme", title="DE", description="Build pipelines.")
+    JobPosting.objects.create(url=second, title="DE", description="Old text.")
+    call_command("dedupe_jobs", stdout=StringIO())
+    assert not JobPosting.objects.exclude(duplicate_of="").exists()
+    store_pages([(second, "greenhouse", _greenhouse_html("DE", "Austin, TX"))])
+
+    call_command("reparse_jobs", stdout=StringIO(), stderr=StringIO())
+
+    posting = JobPosting.objects.get(url=second)
+    sig = signature(shingles("DE\nacme\nBuild pipelines."))
+    assert posting.duplicate_of == first
+    assert bytes(posting.minhash) == pack(sig)
+    bands = PostingBand.objects.filter(posting_id=posting.pk)
+    assert set(bands.values_list("key", flat=True)) == set(band_keys(sig))
+
+
+@pytest.mark.django_db
+def test_archive_skips_identical_bodies():
+    from jobsearch.archive import store_pages
+
+    store_pages([("https://jobs.lever.co/acme/x", "lever", "<html></html>")])
+    store_pages([("https://jobs.lever.co/acme/x", "lever", "<html></html>")])
+    assert RawPage.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_stops_after_stale_pages():
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/old")
+    stale = _search_page("https://jobs.lever.co/acme/old", next_start=11)
+    with patch(SEARCH, return_value=stale) as search:
+        out, _ = _run(stop_after=3)
+
+    assert search.call_count == 3
+    assert "Stopping after 3 page(s) with no unseen jobs." in out
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_serves_search_pages_from_cache():
+    page = _search_page("https://jobs.lever.co/acme/old")
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/old")
+    # ad hoc --query runs have no watermark, so both runs search the same window
+    with patch(SEARCH, return_value=page) as search:
+        _run(query=["data"], cache_ttl=3600)
+        out, _ = _run(query=["data"], cache_ttl=3600, stats=True)
+
+    assert search.call_count == 1
+    assert "1 search page(s) (0 API call(s))" in out
+
+    with patch(SEARCH, return_value=page) as search:
+        _run(query=["data"], cache_ttl=0)
+    assert search.call_count == 1
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_query_keeps_exclude_terms():
+    SearchQuery.objects.update_or_create(query="data", defaults={"exclude_terms": "senior"})
+    page = _search_page()
+    with patch(SEARCH, return_value=page) as search:
+        _run(query=["data", "etl"], cache_ttl=0)
+        _run(query=["data"], exclude="staff", cache_ttl=0)
+
+    excluded = [(call.args[0], call.kwargs["excludeTerms"]) for call in search.call_args_list]
+    assert excluded == [("data", "senior"), ("etl", ""), ("data", "staff")]
+    assert SearchQuery.objects.get(query="data").last_succeeded_at is None
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_prunes_expired_search_pages(settings):
+    settings.SEARCH_CACHE_TTL = 3600
+    now = timezone.now()
+    for key, age in (("old", 2), ("fresh", 0.5)):
+        SearchCache.objects.create(
+            key=key,
+            query="data",
+            start=1,
+            date_restrict="",
+            response={"results": [], "queries": {}},
+            fetched_at=now - timedelta(hours=age),
+        )
+    with patch(SEARCH, return_value=_search_page()):
+        _run(query=["data"], cache_ttl=0)
+
+    # the run's own page is cached afresh; only the expired row goes
+    assert not SearchCache.objects.filter(key="old").exists()
+    assert SearchCache.objects.filter(key="fresh").exists()
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_prefetches_known_offsets_concurrently():
+    def search(query, start, **kwargs):
+        return _search_page(f"https://jobs.lever.co/acme/{start}", next_start=start + 10)
+
+    with (
+        patch(SEARCH, side_effect=search) as search_mock,
+        _fetch_pages(return_value="<html></html>"),
+    ):
+        _run(prefetch=3, stop_after=0)
+
+    starts = sorted(call.kwargs["start"] for call in search_mock.call_args_list)
+    assert starts == [1, 11, 21, 31, 41, 51, 61, 71, 81, 91]
+    assert SearchQuota.objects.get().calls == 10
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_runs_every_active_query_within_quota(settings):
+    settings.SEARCH_DAILY_QUOTA = 3
+    SearchQuery.objects.update(active=True)
+    page = _search_page("https://jobs.lever.co/acme/1", next_start=11)
+    with (
+        patch(SEARCH, return_value=page) as search,
+        _fetch_pages(return_value="<html></html>"),
+    ):
+        _run(stop_after=0)
+
+    assert search.call_count == 3
+    assert {call.args[0] for call in search.call_args_list} == {
+        '"data engineer"',
+        '"analytics engineer"',
+    }
+    assert SearchQuery.objects.filter(last_run_at__isnull=False).count() == 2
+
+    with patch(SEARCH, return_value=page) as search:
+        out, _ = _run()
+    assert search.call_count == 0
+    assert "Daily search quota is used up." in out
+
+
+def test_allocate_pages_follows_yield():
+    allocation = allocate_pages({"a": 4.0, "b": 1.0, "c": 0.0}, budget=12)
+    assert sum(allocation.values()) == 12
+    assert allocation["a"] > allocation["b"] > allocation["c"] >= 1
+
+
+def test_allocate_pages_caps_and_small_budgets():
+    assert allocate_pages({"a": 1.0, "b": 1.0}, budget=100) == {"a": 10, "b": 10}
+    assert allocate_pages({"a": 0.5, "b": 2.0}, budget=1) == {"a": 0, "b": 1}
+    assert allocate_pages({}, budget=5) == {}
+
+
+def test_date_restrict_follows_watermark(settings):
+    settings.SEARCH_WINDOW_OVERLAP_HOURS = 6
+    settings.SEARCH_MAX_WINDOW_DAYS = 7
+    now = timezone.now()
+
+    assert date_restrict(SearchQuery(), now) == "d7"
+    assert date_restrict(SearchQuery(last_succeeded_at=now - timedelta(hours=1)), now) == "d1"
+    assert date_restrict(SearchQuery(last_succeeded_at=now - timedelta(hours=20)), now) == "d2"
+    assert date_restrict(SearchQuery(last_succeeded_at=now - timedelta(days=30)), now) == "d7"
+    failed = SearchQuery(
+        last_succeeded_at=now - timedelta(hours=1), last_failed_at=now - timedelta(minutes=5)
+    )
+    assert date_restrict(failed, now) == "d7"
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_narrows_window_after_success_and_widens_after_failure():
+    page = _search_page("https://jobs.lever.co/acme/1")
+    with (
+        patch(SEARCH, return_value=page) as search,
+        _fetch_pages(return_value="<html></html>"),
+    ):
+        _run()
+        _run()
+    assert [call.kwargs["dateRestrict"] for call in search.call_args_list] == ["d7", "d1"]
+
+    with patch(SEARCH, side_effect=RuntimeError("quota exceeded")):
+        _, err = _run()
+    assert "Fatal error: quota exceeded" in err
+
+    with patch(SEARCH, return_value=page) as search:
+        _run()
+    assert search.call_args.kwargs["dateRestrict"] == "d7"
+
+
+@pytest.mark.django_db
+def test_scrape_jobs_keeps_watermark_when_allocation_cuts_query_short(settings):
+    settings.SEARCH_DAILY_QUOTA = 2
+    SearchQuery.objects.update(active=False)
+    query = SearchQuery.objects.create(query="data", active=True)
+
+    def search(query, start, **kwargs):
+        return _search_page(f"https://jobs.lever.co/acme/{start}", next_start=start + 10)
+
+    with (
+        patch(SEARCH, side_effect=search) as search_mock,
+        _fetch_pages(return_value="<html></html>"),
+    ):
+        _run(stop_after=0)
+    assert search_mock.call_count == 2
+    query.refresh_from_db()
+    assert query.last_succeeded_at is None
+
+    settings.SEARCH_DAILY_QUOTA = 10
+    with (
+        patch(SEARCH, return_value=_search_page("https://jobs.lever.co/acme/last")),
+        _fetch_pages(return_value="<html></html>"),
+    ):
+        _run()
+    query.refresh_from_db()
+    assert query.last_succeeded_at is not None
@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.db.models import Q
+
+from jobsearch import search
+from jobsearch.models import BadJob, JobPosting
+from jobsearch.search import ranked_ids, search_postings, substring_q
+from jobsearch.utils import move_company_to_bad
+from jobsearch.writer import PostingWriter
+
+pytestmark = pytest.mark.usefixtures("secret_key")
+
+
+def _posting(slug, company="acme", title="Sales Manager", description=""):
+    return JobPosting(
+        url=f"https://jobs.lever.co/{company}/{slug}",
+        company=company,
+        title=title,
+        description=description,
+    )
+
+
+def _urls(queryset):
+    return [
+        url.removeprefix("https://jobs.lever.co/") for url in queryset.values_list("url", flat=True)
+    ]
+
+
+@pytest.fixture
+def postings(db):
+    writer = PostingWriter()
+    for posting in [
+        _posting("1", description="<p>We need a <b>data engineer</b> for our pipelines.</p>"),
+        _posting("2", title="Data Engineer", description="Own the warehouse."),
+        _posting("3", company="initech", title="Accountant", description="Spreadsheets all day."),
+        _posting("4", company="globex", title="Engineering Manager", description="Lead people."),
+    ]:
+        writer.add(posting)
+    writer.flush()
+
+
+def test_title_matches_rank_above_description_matches(postings):
+    results = search_postings(JobPosting.objects.all(), "data engineer")
+    assert _urls(results) == ["acme/2", "acme/1"]
+
+
+def test_search_stems_and_ignores_markup(postings):
+    assert _urls(search_postings(JobPosting.objects.all(), "pipeline")) == ["acme/1"]
+    assert _urls(search_postings(JobPosting.objects.all(), "spreadsheet")) == ["initech/3"]
+    # query syntax is never passed through
+    assert _urls(search_postings(JobPosting.objects.all(), 'warehouse" OR "lead')) == []
+
+
+def test_company_and_url_substrings(postings):
+    assert _urls(search_postings(JobPosting.objects.all(), "nitec")) == ["initech/3"]
+    assert _urls(search_postings(JobPosting.objects.all(), "lever.co/glob")) == ["globex/4"]
+    assert set(
+        JobPosting.objects.filter(substring_q(JobPosting, "ACM")).values_list("pk", flat=True)
+    ) == set(JobPosting.objects.filter(company="acme").values_list("pk", flat=True))
+
+
+def test_ranking_respects_queryset_filters(postings):
+    within = JobPosting.objects.exclude(company="acme")
+    assert ranked_ids("engineer", within=within) == list(
+        within.filter(title="Engineering Manager").values_list("pk", flat=True)
+    )
+
+
+def test_saves_and_deletes_keep_the_index_in_step(postings):
+    job = JobPosting.objects.get(url="https://jobs.lever.co/initech/3")
+    job.title = "Payroll Specialist"
+    job.save()
+    assert _urls(search_postings(JobPosting.objects.all(), "payroll")) == ["initech/3"]
+
+    move_company_to_bad("acme")
+    assert _urls(search_postings(JobPosting.objects.all(), "data engineer")) == []
+    assert BadJob.objects.filter(substring_q(BadJob, "lever.co/acme")).count() == 2
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite keeps the indexes by trigger")
+def test_install_restores_dropped_triggers(postings):
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER jobsearch_jobposting_trgm_ai")
+    JobPosting.objects.create(url="https://jobs.lever.co/hooli/5", company="hooli")
+    assert not JobPosting.objects.filter(substring_q(JobPosting, "hooli")).exists()
+
+    search.install()
+    assert JobPosting.objects.filter(substring_q(JobPosting, "hooli")).exists()
+
+
+def test_admin_search(postings, admin_client):
+    response = admin_client.get("/admin/jobsearch/jobposting/", {"q": "data engineer"})
+    assert response.status_code == 200
+    assert [job.url for job in response.context["cl"].result_list] == [
+        "https://jobs.lever.co/acme/2",
+        "https://jobs.lever.co/acme/1",
+    ]
+
+    move_company_to_bad("globex")
+    response = admin_client.get("/admin/jobsearch/badjob/", {"q": "GLOB"})
+    assert [job.url for job in response.context["cl"].result_list] == [
+        "https://jobs.lever.co/globex/4"
+    ]
+
+
+def test_substring_q_follows_the_queryset_database(monkeypatch):
+    other = type("Connection", (), {"vendor": "postgresql"})()
+    monkeypatch.setattr(search, "connections", {"default": connection, "replica": other})
+    # the trigram table is SQLite's; on the replica the plain lookups are used
+    assert substring_q(JobPosting, "acme", using="replica") == Q(company__icontains="acme") | Q(
+        url__icontains="acme"
+    )
+    monkeypatch.setattr(search.router, "db_for_read", lambda model, **hints: "replica")
+    assert "icontains" in str(substring_q(JobPosting, "acme"))
@@ -0,0 +1,72 @@
+import pytest
+
+from jobsearch import sources
+from jobsearch.sources import SourceAdapter, get_adapter, route
+
+
+@pytest.mark.parametrize(
+    ("link", "name", "normalized"),
+    [
+        (
+            "https://boards.greenhouse.io/acme/jobs/1?gh_src=x",
+            "greenhouse",
+            "https://job-boards.greenhouse.io/acme/jobs/1",
+        ),
+        (
+            "https://JOB-BOARDS.greenhouse.io/acme/jobs/1",
+            "greenhouse",
+            "https://job-boards.greenhouse.io/acme/jobs/1",
+        ),
+        (
+            "https://boards.eu.greenhouse.io/acme/jobs/1",
+            "greenhouse",
+            "https://job-boards.eu.greenhouse.io/acme/jobs/1",
+        ),
+        (
+            "https://boards.greenhouse.io/embed/job_app?for=acme&token=1",
+            "greenhouse",
+            "https://boards.greenhouse.io/embed/job_app?for=acme&token=1",
+        ),
+        ("https://jobs.lever.co/acme/abc-123/apply", "lever", "https://jobs.lever.co/acme/abc-123"),
+        (
+            "https://jobs.ashbyhq.com/acme/abc-123/application",
+            "ashby",
+            "https://jobs.ashbyhq.com/acme/abc-123",
+        ),
+    ],
+)
+def test_route_known_hosts(link, name, normalized):
+    adapter = route(link)
+    assert adapter is get_adapter(name)
+    assert adapter.normalize(link) == normalized
+
+
+@pytest.mark.parametrize(
+    "link",
+    [
+        # the old substring checks routed all of these
+        "https://example.com/greenhouse-gas-analyst",
+        "https://www.linkedin.com/jobs/view/lever-data-engineer",
+        "https://ashbyhq.com.evil.example/acme/1",
+        "not a url",
+        "http://[broken",
+    ],
+)
+def test_route_unknown_links(link):
+    assert route(link) is None
+
+
+def test_register_wildcard_host(monkeypatch):
+    monkeypatch.setattr(sources, "_ADAPTERS", dict(sources._ADAPTERS))
+    monkeypatch.setattr(sources, "_HOST_SUFFIXES", {})
+    workable = sources.register(
+        SourceAdapter("workable", hosts=["*.workable.com"], extract=lambda url, body: ())
+    )
+
+    assert route("https://apply.workable.com/acme/j/ABC/") is workable
+    assert route("https://workable.com/acme") is None
+    with pytest.raises(ValueError, match="already routed"):
+        sources.register(
+            SourceAdapter("other", hosts=["*.workable.com"], extract=lambda url, body: ())
+        )
+    assert "other" not in sources.source_names()
@@ -1,16 +1,25 @@
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import httpx
 import pytest
 
 from jobsearch.utils import (
+    ASHBY_GRAPHQL_URL,
+    LocationMatcher,
+    extract_greenhouse,
+    extract_lever,
     google_search,
     is_allowed_location,
+    known_urls,
+    location_matcher,
     move_company_to_bad,
+    move_location_to_bad,
     parse_ashby,
+    parse_ashby_batch,
     parse_greenhouse,
     parse_lever,
+    reset_location_matcher,
 )
 
 GREENHOUSE_URL = "https://boards.greenhouse.io/acme/jobs/123456"
@@ -79,6 +88,21 @@ def test_parse_greenhouse_missing_element(httpx_mock):
         parse_greenhouse(GREENHOUSE_URL)
 
 
+def test_extract_greenhouse_multi_class_markup():
+    html = """
+    <div class="section job__title large"><h1>Data Engineer</h1></div>
+    <div class="muted job__location">Remote, US</div>
+    <div class="job__description body"><p>Build pipelines.</p></div>
+    """
+    assert extract_greenhouse(GREENHOUSE_URL, html) == (
+        "acme",
+        "Data Engineer",
+        "Remote, US",
+        "Build pipelines.",
+        None,
+    )
+
+
 def test_parse_greenhouse_http_404(httpx_mock):
     httpx_mock.add_response(url=GREENHOUSE_URL, status_code=404)
     with pytest.raises(httpx.HTTPStatusError):
@@ -113,18 +137,34 @@ def test_parse_lever_no_script_tag(httpx_mock):
         parse_lever(LEVER_URL)
 
 
+@pytest.mark.parametrize(
+    "html",
+    [
+        # attribute order, quoting and tag case vary between Lever page versions
+        "<SCRIPT data-x='1' type='application/ld+json'>{ld_json}</Script >",
+        "<script type=application/ld+json>{ld_json}</script>",
+        # an earlier mention of the type sends extraction to the soup fallback
+        '<!-- application/ld+json --><script type="application/ld+json">{ld_json}</script>',
+    ],
+)
+def test_extract_lever_script_variants(html):
+    html = html.format(ld_json=json.dumps(LEVER_LD_JSON))
+    _, title, location, _, _ = extract_lever(LEVER_URL, html)
+    assert (title, location) == ("Data Engineer", "San Francisco")
+
+
+def test_extract_lever_ignores_other_type_attributes():
+    html = '<script data-type="application/ld+json">{}</script>'
+    with pytest.raises(ValueError, match="no application/ld\\+json"):
+        extract_lever(LEVER_URL, html)
+
+
 # ---------------------------------------------------------------------------
 # parse_ashby
 # ---------------------------------------------------------------------------
 
 
-def _ashby_mock(execute_return):
-    mock_client = MagicMock()
-    mock_client.execute.return_value = execute_return
-    return mock_client
-
-
-def test_parse_ashby_happy_path():
+def test_parse_ashby_happy_path(httpx_mock):
     result = {
         "jobPosting": {
             "title": "Data Engineer",
@@ -133,21 +173,33 @@ def test_parse_ashby_happy_path():
             "linkedData": {"datePosted": "2024-01-15"},
         }
     }
-    with patch("jobsearch.utils.Client", return_value=_ashby_mock(result)):
-        company, title, location, description, date_posted = parse_ashby(ASHBY_URL)
+    httpx_mock.add_response(url=ASHBY_GRAPHQL_URL, json={"data": {"j0": result["jobPosting"]}})
+    company, title, location, description, date_posted = parse_ashby(ASHBY_URL)
     assert company == "acme"
     assert title == "Data Engineer"
     assert location == "Remote"
     assert date_posted == "2024-01-15"
 
+    body = json.loads(httpx_mock.get_request().content)
+    assert body["variables"] == {"org0": "acme", "job0": "abc-123"}
+    assert "compensationTierSummary" not in body["query"]
+
 
-def test_parse_ashby_null_job_posting():
-    with patch("jobsearch.utils.Client", return_value=_ashby_mock({"jobPosting": None})):
-        with pytest.raises(ValueError, match="jobPosting is null"):
-            parse_ashby(ASHBY_URL)
+def test_parse_ashby_null_job_posting(httpx_mock):
+    httpx_mock.add_response(url=ASHBY_GRAPHQL_URL, json={"data": {"j0": None}})
+    with pytest.raises(ValueError, match="jobPosting is null"):
+        parse_ashby(ASHBY_URL)
+
+
+def test_parse_ashby_graphql_errors(httpx_mock):
+    httpx_mock.add_response(
+        url=ASHBY_GRAPHQL_URL, json={"errors": [{"message": "boom"}], "data": None}
+    )
+    with pytest.raises(ValueError, match="GraphQL errors"):
+        parse_ashby(ASHBY_URL)
 
 
-def test_parse_ashby_missing_linked_data():
+def test_parse_ashby_missing_linked_data(httpx_mock):
     result = {
         "jobPosting": {
             "title": "Data Engineer",
@@ -156,11 +208,46 @@ def test_parse_ashby_missing_linked_data():
             "linkedData": None,
         }
     }
-    with patch("jobsearch.utils.Client", return_value=_ashby_mock(result)):
-        _, _, _, _, date_posted = parse_ashby(ASHBY_URL)
+    httpx_mock.add_response(url=ASHBY_GRAPHQL_URL, json={"data": {"j0": result["jobPosting"]}})
+    _, _, _, _, date_posted = parse_ashby(ASHBY_URL)
     assert date_posted is None
 
 
+def test_parse_ashby_batch_single_request(httpx_mock):
+    posting = {"title": "DE", "locationName": "Remote", "descriptionHtml": "", "linkedData": None}
+    urls = [
+        "https://jobs.ashbyhq.com/acme/1",
+        "https://jobs.ashbyhq.com/acme/2",
+        "https://jobs.ashbyhq.com/other/3",
+    ]
+    httpx_mock.add_response(
+        url=ASHBY_GRAPHQL_URL, json={"data": {"j0": posting, "j1": None, "j2": posting}}
+    )
+
+    results = parse_ashby_batch(urls)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert results[urls[0]][:2] == ("acme", "DE")
+    assert isinstance(results[urls[1]], ValueError)
+    assert results[urls[2]][0] == "other"
+    body = json.loads(httpx_mock.get_request().content)
+    assert body["variables"]["org2"] == "other"
+    assert body["variables"]["job2"] == "3"
+
+
+def test_parse_ashby_batch_isolates_non_posting_urls(httpx_mock):
+    posting = {"title": "DE", "locationName": "Remote", "descriptionHtml": "", "linkedData": None}
+    urls = ["https://jobs.ashbyhq.com/acme", "https://jobs.ashbyhq.com/acme/123"]
+    httpx_mock.add_response(url=ASHBY_GRAPHQL_URL, json={"data": {"j0": posting}})
+
+    results = parse_ashby_batch(urls)
+
+    assert isinstance(results[urls[0]], ValueError)
+    assert results[urls[1]][:2] == ("acme", "DE")
+    body = json.loads(httpx_mock.get_request().content)
+    assert body["variables"] == {"org0": "acme", "job0": "123"}
+
+
 # ---------------------------------------------------------------------------
 # google_search
 # ---------------------------------------------------------------------------
@@ -279,6 +366,40 @@ def test_extra_blocked_case_insensitive():
     assert is_allowed_location("warsaw", extra_blocked=frozenset({"Warsaw"})) is False
 
 
+def test_location_matcher_shared_prefixes_and_special_characters():
+    matcher = LocationMatcher(["Lagos", "Lag", "Lima (PE)", "St. Gallen"])
+    assert not matcher.allows("Lagos, Nigeria")
+    assert not matcher.allows("LAGOON city")  # "lag" is a substring
+    assert not matcher.allows("lima (pe)")
+    assert matcher.allows("Lima, OH")
+    assert not matcher.allows("St. Gallen")
+    assert matcher.allows("Stx Gallen")
+    assert not matcher.allows("Berlin")  # the static list still applies
+
+
+def test_location_matcher_caches_verdicts():
+    matcher = LocationMatcher(["Warsaw"], cache_size=2)
+    for _ in range(3):
+        matcher.allows("Warsaw")
+    assert matcher.cache_info().hits == 2
+    assert matcher.cache_info().misses == 1
+
+
+@pytest.mark.django_db
+def test_location_matcher_rebuilt_on_bad_location_change():
+    from jobsearch.models import BadLocation
+
+    reset_location_matcher()
+    assert location_matcher().allows("Warsaw")
+    assert location_matcher() is location_matcher()
+
+    bad = BadLocation.objects.create(pattern="Warsaw")
+    assert not location_matcher().allows("Warsaw")
+
+    bad.delete()
+    assert location_matcher().allows("Warsaw")
+
+
 @pytest.mark.django_db
 def test_move_company_to_bad_moves_records():
     from jobsearch.models import BadJob, JobPosting
@@ -317,7 +438,91 @@ def test_move_company_to_bad_returns_count():
     assert count == 2
 
 
+@pytest.mark.django_db
+def test_move_company_to_bad_is_atomic():
+    from django.db import DatabaseError
+
+    from jobsearch.models import BadJob, JobPosting
+
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/1", company="acme", title="DE 1")
+
+    with (
+        patch("django.db.models.QuerySet.delete", side_effect=DatabaseError("boom")),
+        pytest.raises(DatabaseError),
+    ):
+        move_company_to_bad("acme")
+
+    assert JobPosting.objects.filter(company="acme").count() == 1
+    assert not BadJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_move_location_to_bad_moves_matching_rows():
+    from jobsearch.models import BadJob, JobPosting
+
+    JobPosting.objects.create(
+        url="https://jobs.lever.co/acme/1",
+        company="acme",
+        title="DE 1",
+        location="Warsaw,  Poland",
+        description="Build pipelines.",
+        source="lever",
+    )
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/2", location="WARSAW")
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/3", location="New York")
+    # already rejected once: the posting goes away, the existing BadJob stays
+    BadJob.objects.create(url="https://jobs.lever.co/acme/2", title="kept")
+
+    count = move_location_to_bad("warsaw, ")
+
+    assert count == 1
+    assert list(JobPosting.objects.order_by("url").values_list("url", flat=True)) == [
+        "https://jobs.lever.co/acme/2",
+        "https://jobs.lever.co/acme/3",
+    ]
+    moved = BadJob.objects.get(url="https://jobs.lever.co/acme/1")
+    assert (moved.company, moved.title, moved.location, moved.description, moved.source) == (
+        "acme",
+        "DE 1",
+        "Warsaw,  Poland",
+        "Build pipelines.",
+        "lever",
+    )
+    assert moved.location_allowed is False
+
+    assert move_location_to_bad("warsaw") == 1
+    assert BadJob.objects.get(url="https://jobs.lever.co/acme/2").title == "kept"
+    assert list(JobPosting.objects.order_by("url").values_list("url", flat=True)) == [
+        "https://jobs.lever.co/acme/3"
+    ]
+
+
 @pytest.mark.django_db
 def test_move_company_to_bad_no_match():
     count = move_company_to_bad("nonexistent")
     assert count == 0
+
+
+# ---------------------------------------------------------------------------
+# known_urls
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+def test_known_urls_single_query(django_assert_num_queries):
+    from jobsearch.models import BadJob, JobPosting
+
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/1")
+    BadJob.objects.create(url="https://jobs.lever.co/acme/2")
+    links = [f"https://jobs.lever.co/acme/{i}" for i in range(1, 11)]
+
+    with django_assert_num_queries(1):
+        seen = known_urls(links)
+
+    assert seen == {"https://jobs.lever.co/acme/1", "https://jobs.lever.co/acme/2"}
+
+
+@pytest.mark.django_db
+def test_known_urls_empty(django_assert_num_queries):
+    with django_assert_num_queries(0):
+        assert known_urls([]) == set()
@@ -0,0 +1,68 @@
+import pytest
+from django.db import DataError
+
+from jobsearch.models import BadJob, JobPosting
+from jobsearch.writer import PostingWriter
+
+
+@pytest.mark.django_db
+def test_writer_flushes_in_batches(django_assert_max_num_queries):
+    writer = PostingWriter(batch_size=10, flush_interval=3600)
+    # savepoint + insert(s) + inserted-rows select + release per batch
+    with django_assert_max_num_queries(2 * 5):
+        for i in range(20):
+            writer.add(JobPosting(url=f"https://jobs.lever.co/acme/{i}", company="acme"))
+    assert writer.batches == 2
+    assert JobPosting.objects.count() == 20
+    assert len(writer.written) == 20
+
+
+@pytest.mark.django_db
+def test_writer_mixes_postings_and_bad_jobs():
+    writer = PostingWriter(batch_size=100)
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/1"))
+    writer.add(BadJob(url="https://jobs.lever.co/acme/2"))
+    writer.flush()
+    assert JobPosting.objects.count() == 1
+    assert BadJob.objects.count() == 1
+    assert [jp.url for jp in writer.written] == ["https://jobs.lever.co/acme/1"]
+
+
+@pytest.mark.django_db
+def test_writer_ignores_url_conflicts():
+    JobPosting.objects.create(url="https://jobs.lever.co/acme/1", title="original")
+    writer = PostingWriter()
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/1", title="duplicate"))
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/2", title="new"))
+    writer.flush()
+    assert JobPosting.objects.get(url="https://jobs.lever.co/acme/1").title == "original"
+    # the summary only counts what was inserted
+    assert [jp.url for jp in writer.written] == ["https://jobs.lever.co/acme/2"]
+
+
+@pytest.mark.django_db
+def test_writer_reports_failed_rows_individually(monkeypatch):
+    write = PostingWriter._write
+
+    def failing_write(objs):
+        if any(obj.url.endswith("/broken") for obj in objs):
+            raise DataError("value too long")
+        return write(objs)
+
+    monkeypatch.setattr(PostingWriter, "_write", staticmethod(failing_write))
+    errors = []
+    writer = PostingWriter(on_error=lambda url, e: errors.append(url))
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/1"))
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/broken"))
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/3"))
+    writer.flush()
+    assert errors == ["https://jobs.lever.co/acme/broken"]
+    assert JobPosting.objects.count() == 2
+    assert len(writer.written) == 2
+
+
+@pytest.mark.django_db
+def test_writer_flushes_when_interval_elapsed():
+    writer = PostingWriter(batch_size=100, flush_interval=0)
+    writer.add(JobPosting(url="https://jobs.lever.co/acme/1"))
+    assert JobPosting.objects.count() == 1
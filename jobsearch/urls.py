@@ -18,9 +18,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.home, name="home"),
     path("admin/", admin.site.urls),
+    path("api/postings/", api.postings, name="api-postings"),
+    path("api/postings/export/", api.postings_export, name="api-postings-export"),
+    path("api/bad-jobs/", api.bad_jobs, name="api-bad-jobs"),
+    path("api/bad-jobs/export/", api.bad_jobs_export, name="api-bad-jobs-export"),
 ]
@@ -1,16 +1,25 @@
+import functools
+import hashlib
+import html
+import itertools
 import json
 import os
 import random
 import re
 import time
+from collections.abc import Iterable
+from datetime import timedelta
 from urllib.parse import urlencode
 
-import httpx
-from bs4 import BeautifulSoup
-from gql import Client, gql
-from gql.transport.aiohttp import AIOHTTPTransport
+from bs4 import BeautifulSoup, SoupStrainer
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, QuerySet, Value, When
+from django.db.models.constants import OnConflict
+from graphql import parse, print_ast
 
-USER_AGENT = "job-scraper-bot/1.0"
+from jobsearch.http_client import get_client
+
+ASHBY_GRAPHQL_URL = "https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobPosting"
 
 _BLOCKED_LOCATIONS = re.compile(
     r"\b("
@@ -35,46 +44,232 @@ _BLOCKED_LOCATIONS = re.compile(
 )
 
 
+LOCATION_VERDICT_CACHE_SIZE = 10_000
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+def normalize_location(location: str) -> str:
+    """Lowercase location and collapse runs of whitespace; the form verdicts are made on."""
+    return " ".join(str(location).lower().split())
+
+
+def plain_text(markup: str) -> str:
+    """Text of an HTML fragment: tags become spaces and entities are decoded."""
+    return html.unescape(_TAG.sub(" ", markup))
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex matching any of words, with shared prefixes factored out.
+
+    re tries alternatives one by one, so "London|Lagos|Lima" costs a
+    comparison per word at every position; as a trie ("L(?:ondon|agos|ima)")
+    a position that cannot start any word fails on its first character.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # a word ends here; longer words through this node are optional
+            body = body + "?" if len(branches) > 1 or len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class LocationMatcher:
+    """The static blocklist and BadLocation patterns compiled into one regex.
+
+    Patterns are case-insensitive substrings, as in the BadLocation table;
+    both sides are compared after normalize_location(). Verdicts are
+    memoized per location string in a bounded LRU cache, since the same
+    handful of locations comes back on almost every search page.
+    """
+
+    def __init__(
+        self, patterns: Iterable[str] = (), cache_size: int = LOCATION_VERDICT_CACHE_SIZE
+    ) -> None:
+        self.patterns = frozenset(normalize_location(p) for p in patterns)
+        regex = _BLOCKED_LOCATIONS.pattern
+        if self.patterns:
+            regex += "|" + _trie_pattern(self.patterns)
+        self._regex = re.compile(regex, re.IGNORECASE)
+        self._verdict = functools.lru_cache(maxsize=cache_size)(self._allows)
+
+    def _allows(self, location: str) -> bool:
+        return self._regex.search(normalize_location(location)) is None
+
+    def allows(self, location: str) -> bool:
+        """Return True if location is not a known non-US/non-remote location."""
+        if not location:
+            return True
+        return self._verdict(location)
+
+    def cache_info(self) -> functools._CacheInfo:
+        return self._verdict.cache_info()
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled_matcher(patterns: frozenset[str]) -> LocationMatcher:
+    return LocationMatcher(patterns)
+
+
 def is_allowed_location(location: str, extra_blocked: frozenset[str] = frozenset()) -> bool:
     """Return True if location is not a known non-US/non-remote location.
 
     extra_blocked: additional case-insensitive substrings loaded from BadLocation table.
     """
-    if not location:
-        return True
-    if _BLOCKED_LOCATIONS.search(location):
-        return False
-    loc_lower = location.lower()
-    return not any(p.lower() in loc_lower for p in extra_blocked)
+    return _compiled_matcher(frozenset(extra_blocked)).allows(location)
+
+
+_location_matcher: LocationMatcher | None = None
+
+
+def location_matcher() -> LocationMatcher:
+    """The matcher for the current BadLocation table, compiled on first use.
+
+    BadLocation save/delete signals drop it, so it is rebuilt only after
+    the patterns change.
+    """
+    from jobsearch.models import BadLocation
+
+    global _location_matcher
+    if _location_matcher is None:
+        _location_matcher = LocationMatcher(BadLocation.objects.values_list("pattern", flat=True))
+    return _location_matcher
+
+
+def reset_location_matcher() -> None:
+    global _location_matcher
+    _location_matcher = None
+
+
+def move_jobs_to_bad(jobs: QuerySet) -> int:
+    """Move the JobPosting rows of a queryset to BadJob. Returns count moved.
+
+    Rows are copied with one INSERT ... SELECT (URLs already in BadJob are
+    skipped) and then deleted, in one transaction, so nothing is read into
+    Python and a failure leaves both tables untouched. The BadJob rows get
+    the current time as updated_at, so incremental exports pick them up.
+    The moved postings' near-duplicate bands are deleted with them.
+    """
+    from django.utils import timezone
+
+    from jobsearch.models import BadJob, PostingBand
+
+    # updated_at last: values_list() selects annotations after the columns
+    fields = sorted(
+        (f for f in BadJob._meta.concrete_fields if not f.primary_key),
+        key=lambda f: f.name == "updated_at",
+    )
+    quote = connection.ops.quote_name
+    select_sql, params = (
+        jobs.values_list(*(f.name for f in fields if f.name != "updated_at"))
+        .annotate(moved_at=Value(timezone.now(), output_field=DateTimeField()))
+        .query.sql_with_params()
+    )
+    sql = "{} {} ({}) SELECT * FROM ({}) moved {}".format(
+        connection.ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        quote(BadJob._meta.db_table),
+        ", ".join(quote(f.column) for f in fields),
+        select_sql,
+        connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None),
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+        # only delete what now has a BadJob row, in case jobs changed meanwhile
+        moved_jobs = jobs.filter(url__in=BadJob.objects.values("url"))
+        PostingBand.objects.filter(posting_id__in=moved_jobs.values("pk")).delete()
+        moved, _ = moved_jobs.delete()
+    return moved
+
+
+def move_location_to_bad(pattern: str) -> int:
+    """Block JobPosting rows whose location contains pattern and move them to BadJob.
+
+    The verdict is flipped with one UPDATE on location_normalized, then every
+    blocked row is moved with move_jobs_to_bad(). Returns count moved.
+    """
+    from jobsearch.models import JobPosting
+
+    with transaction.atomic():
+        JobPosting.objects.filter(location_normalized__contains=normalize_location(pattern)).update(
+            location_allowed=False
+        )
+        return move_jobs_to_bad(JobPosting.objects.filter(location_allowed=False))
 
 
 def move_company_to_bad(company_name: str) -> int:
     """Move all JobPosting records for company_name to BadJob. Returns count moved."""
+    from jobsearch.models import JobPosting
+
+    return move_jobs_to_bad(JobPosting.objects.filter(company=company_name))
+
+
+def set_applied(changes: dict[int, bool]) -> int:
+    """Set is_applied of the JobPosting rows keyed by pk in changes. Returns count updated.
+
+    One UPDATE ... SET is_applied = CASE WHEN id IN (...) THEN true ELSE false
+    END however many rows change, so a triage batch costs one statement.
+    """
+    from django.utils import timezone
+
+    from jobsearch.models import JobPosting
+
+    if not changes:
+        return 0
+    applied = [pk for pk, value in changes.items() if value]
+    return JobPosting.objects.filter(pk__in=changes).update(
+        is_applied=Case(When(pk__in=applied, then=Value(True)), default=Value(False)),
+        updated_at=timezone.now(),
+    )
+
+
+def known_urls(urls: list[str]) -> set[str]:
+    """Return the subset of urls already stored in JobPosting or BadJob, in one query."""
     from jobsearch.models import BadJob, JobPosting
 
-    jobs = JobPosting.objects.filter(company=company_name)
-    count = 0
-    for job in jobs:
-        BadJob.objects.get_or_create(
-            url=job.url,
-            defaults={
-                "company": job.company,
-                "title": job.title,
-                "location": job.location,
-                "posted_date": job.posted_date,
-                "description": job.description,
-                "source": job.source,
-            },
-        )
-        job.delete()
-        count += 1
-    return count
+    if not urls:
+        return set()
+    unique = set(urls)
+    recorded = JobPosting.objects.filter(url__in=unique).values_list("url", flat=True)
+    rejected = BadJob.objects.filter(url__in=unique).values_list("url", flat=True)
+    return set(recorded.union(rejected))
+
+
+class QueryCounter:
+    """Execute wrapper counting SQL statements; use with connection.execute_wrapper()."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
 
 _MAX_RETRIES = 3
 
 
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+
 def google_search(
-    query: str, start: int = 1, num: int = 10, dateRestrict: str = "d7"
+    query: str,
+    start: int = 1,
+    num: int = 10,
+    dateRestrict: str = "d7",
+    excludeTerms: str = '"Senior Data"',
 ) -> tuple[list[dict[str, str | None]], dict]:
     """
     Returns a list of dicts with 'link', 'title', 'snippet'.
@@ -96,14 +291,13 @@ def google_search(
         "dateRestrict": dateRestrict,
         "sort": "date",
         "filter": "1",
-        "excludeTerms": '"Senior Data"',
-        # "excludeTerms": '"Senior Analytics"',
+        "excludeTerms": excludeTerms,
     }
-    url = "https://www.googleapis.com/customsearch/v1?" + urlencode(params)
-    headers = {"User-Agent": USER_AGENT}
+    url = GOOGLE_SEARCH_URL + "?" + urlencode(params)
+    client = get_client()
 
     for attempt in range(_MAX_RETRIES + 1):
-        r = httpx.get(url, headers=headers, timeout=15)
+        r = client.get(url)
         if r.status_code == 429 and attempt < _MAX_RETRIES:
             time.sleep(2**attempt + random.uniform(0, 1))
             continue
@@ -126,14 +320,91 @@ def google_search(
     return results, data.get("queries", {})
 
 
-def parse_greenhouse(url: str) -> tuple[str, str, str, str, None]:
-    headers = {"User-Agent": USER_AGENT}
-    r = httpx.get(url, headers=headers, timeout=15)
+def fetch_page(url: str) -> str:
+    """GET a job page over the shared client and return its body."""
+    r = get_client().get(url)
     r.raise_for_status()
+    return r.text
+
+
+def search_cache_key(query: str, start: int, num: int, dateRestrict: str, excludeTerms: str) -> str:
+    return hashlib.sha256(
+        f"{query}|{start}|{num}|{dateRestrict}|{excludeTerms}".encode()
+    ).hexdigest()
+
+
+def get_cached_search(key: str, ttl: float) -> tuple[list[dict[str, str | None]], dict] | None:
+    """Return the cached (results, queries_meta) for key if younger than ttl seconds."""
+    from django.utils import timezone
+
+    from jobsearch.models import SearchCache
+
+    if ttl <= 0:
+        return None
+    cutoff = timezone.now() - timedelta(seconds=ttl)
+    cached = SearchCache.objects.filter(key=key, fetched_at__gte=cutoff).first()
+    if cached is None:
+        return None
+    return cached.response["results"], cached.response["queries"]
+
+
+def store_search(
+    key: str,
+    query: str,
+    start: int,
+    dateRestrict: str,
+    results: list[dict[str, str | None]],
+    queries_meta: dict,
+) -> None:
+    from django.utils import timezone
+
+    from jobsearch.models import SearchCache
+
+    SearchCache.objects.update_or_create(
+        key=key,
+        defaults={
+            "query": query,
+            "start": start,
+            "date_restrict": dateRestrict,
+            "response": {"results": results, "queries": queries_meta},
+            "fetched_at": timezone.now(),
+        },
+    )
+
+
+def prune_search_cache(ttl: float) -> int:
+    """Delete cached search pages older than ttl seconds; return how many went."""
+    from django.utils import timezone
+
+    from jobsearch.models import SearchCache
+
+    cutoff = timezone.now() - timedelta(seconds=ttl)
+    deleted, _ = SearchCache.objects.filter(fetched_at__lt=cutoff).delete()
+    return deleted
+
+
+def parse_greenhouse(url: str) -> tuple[str, str, str, str, None]:
+    return extract_greenhouse(url, fetch_page(url))
+
+
+_GREENHOUSE_CLASSES = frozenset({"job__title", "job__location", "job__description"})
+
+
+def _is_greenhouse_field(classes: str | list[str] | None) -> bool:
+    if not classes:
+        return False
+    tokens = classes.split() if isinstance(classes, str) else classes
+    return not _GREENHOUSE_CLASSES.isdisjoint(tokens)
+
 
-    html = r.text
+# Build the tree only for the three elements extract_greenhouse reads; the
+# rest of the page is tokenized but never turned into Tag objects.
+_GREENHOUSE_STRAINER = SoupStrainer(class_=_is_greenhouse_field)
+
+
+def extract_greenhouse(url: str, html: str) -> tuple[str, str, str, str, None]:
     company = url.split("/")[3]
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "html.parser", parse_only=_GREENHOUSE_STRAINER)
 
     title_container = soup.find(class_="job__title")
     if title_container is None:
@@ -158,18 +429,42 @@ def parse_greenhouse(url: str) -> tuple[str, str, str, str, None]:
 
 
 def parse_lever(url: str) -> tuple[str, str, str, str, str | None]:
-    headers = {"User-Agent": USER_AGENT}
-    r = httpx.get(url, headers=headers, timeout=15)
-    r.raise_for_status()
-    html = r.text
+    return extract_lever(url, fetch_page(url))
+
+
+_LD_JSON_TYPE = "application/ld+json"
+_LD_JSON_SCRIPT = re.compile(
+    r"(?i:<script\b)[^>]*\stype\s*=\s*([\"']?)application/ld\+json\1(?=[\s/>])[^>]*>"
+    r"(.*?)(?i:</script\s*>)",
+    re.DOTALL,
+)
+_LD_JSON_STRAINER = SoupStrainer(attrs={"type": _LD_JSON_TYPE})
+
+
+def _ld_json_text(html: str) -> str | None:
+    """Text of the first element with type="application/ld+json", or None.
+
+    Scans for the script tag directly; if the page has something unusual
+    before it (another element carrying that type), falls back to a
+    strained BeautifulSoup parse so the result matches soup.find().
+    """
+    match = _LD_JSON_SCRIPT.search(html)
+    if match and _LD_JSON_TYPE not in html[: match.start()]:
+        return match.group(2)
+    script = BeautifulSoup(html, "html.parser", parse_only=_LD_JSON_STRAINER).find(
+        attrs={"type": _LD_JSON_TYPE}
+    )
+    return None if script is None else script.text
+
+
+def extract_lever(url: str, html: str) -> tuple[str, str, str, str, str | None]:
     company = url.split("/")[3]
-    soup = BeautifulSoup(html, "html.parser")
 
-    script = soup.find(attrs={"type": "application/ld+json"})
-    if not script:
+    script_text = _ld_json_text(html)
+    if script_text is None:
         raise ValueError(f"no application/ld+json script tag at {url}")
     try:
-        script_dict = json.loads(script.text)
+        script_dict = json.loads(script_text)
     except json.JSONDecodeError as exc:
         raise ValueError(f"invalid JSON in ld+json at {url}") from exc
 
@@ -189,60 +484,36 @@ def parse_lever(url: str) -> tuple[str, str, str, str, str | None]:
     return company, title, location, description, date_posted
 
 
-def parse_ashby(url: str) -> tuple[str, str, str, str, str | None]:
-    transport = AIOHTTPTransport(
-        url="https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobPosting"
-    )
-    client = Client(transport=transport)
-
-    query = gql(
-        """
-        query JobPosting($organizationHostedJobsPageName: String!, $jobPostingId: String!) {
-    jobPosting(
-        organizationHostedJobsPageName: $organizationHostedJobsPageName
-        jobPostingId: $jobPostingId
-    ) {
-        id
-        title
-        departmentName
-        teamNames
-        locationName
-        locationAddress
-        workplaceType
-        employmentType
-        descriptionHtml
-        linkedData
-        isListed
-        isConfidential
-        publishedDate
-        applicationDeadline
-        secondaryLocationNames
-        compensationTierSummary
-        compensationTierGuideUrl
-        compensationPhilosophyHtml
-        scrapeableCompensationSalarySummary
-        applicationLimitCalloutHtml
-        shouldAskForTextingConsent
-        candidateTextingPrivacyPolicyUrl
-        legalEntityNameForTextingConsent
-    }
-}
+ASHBY_BATCH_SIZE = 20
+
+# Only the fields parse_ashby reads.
+_ASHBY_JOB_FIELDS = "title locationName descriptionHtml linkedData"
+
 
+@functools.cache
+def _ashby_query(size: int) -> str:
+    """GraphQL document selecting `size` job postings under aliases j0..j{size-1}.
+
+    Each alias carries its own organization variable, so one request can
+    cover postings from several companies. The document is parsed once per
+    batch size and reused as a string.
     """
+    variables = ", ".join(f"$org{i}: String!, $job{i}: String!" for i in range(size))
+    selections = " ".join(
+        f"j{i}: jobPosting(organizationHostedJobsPageName: $org{i}, jobPostingId: $job{i})"
+        f" {{ {_ASHBY_JOB_FIELDS} }}"
+        for i in range(size)
     )
-    company = url.split("/")[3]
-    job_id = url.split("/")[4]
+    return print_ast(parse(f"query ApiJobPostings({variables}) {{ {selections} }}"))
 
-    query.variable_values = {
-        "organizationHostedJobsPageName": company,
-        "jobPostingId": job_id,
-    }
-    result = client.execute(query)
 
-    job_posting = result.get("jobPosting")
+def extract_ashby(url: str, body: str) -> tuple[str, str, str, str, str | None]:
+    """Parse one Ashby posting from its JSON body, as returned by fetch_ashby_batch."""
+    job_posting = json.loads(body)
     if job_posting is None:
         raise ValueError(f"jobPosting is null for {url}")
 
+    company = url.split("/")[3]
     title = job_posting.get("title", "")
     location = job_posting.get("locationName", "")
     description = job_posting.get("descriptionHtml", "")
@@ -250,3 +521,75 @@ def parse_ashby(url: str) -> tuple[str, str, str, str, str | None]:
     date_posted = linked_data.get("datePosted")
 
     return company, title, location, description, date_posted
+
+
+def ashby_posting_ids(url: str) -> tuple[str, str]:
+    """(organization, posting id) of an Ashby posting url; ValueError for any other url."""
+    parts = url.split("/")
+    if len(parts) < 5 or not parts[3] or not parts[4]:
+        raise ValueError(f"Not an Ashby posting url: {url}")
+    return parts[3], parts[4]
+
+
+def fetch_ashby_batch(urls: list[str]) -> dict[str, str | ValueError]:
+    """Fetch many Ashby postings with one aliased GraphQL request per ASHBY_BATCH_SIZE urls.
+
+    Returns each posting's JSON body keyed by url ("null" when Ashby has no
+    such posting). A url that is not a posting (e.g. a board page) maps to
+    its ValueError and is left out of the request. HTTP errors and
+    request-level GraphQL errors are raised.
+    """
+    bodies: dict[str, str | ValueError] = {}
+    postings = []
+    for url in urls:
+        try:
+            postings.append((url, ashby_posting_ids(url)))
+        except ValueError as e:
+            bodies[url] = e
+    for chunk in itertools.batched(postings, ASHBY_BATCH_SIZE, strict=False):
+        variables = {}
+        for i, (_, (org, job)) in enumerate(chunk):
+            variables[f"org{i}"] = org
+            variables[f"job{i}"] = job
+
+        r = get_client().post(
+            ASHBY_GRAPHQL_URL,
+            json={
+                "operationName": "ApiJobPostings",
+                "query": _ashby_query(len(chunk)),
+                "variables": variables,
+            },
+        )
+        r.raise_for_status()
+        payload = r.json()
+        data = payload.get("data")
+        if not data:
+            chunk_urls = ", ".join(url for url, _ in chunk)
+            raise ValueError(f"GraphQL errors for {chunk_urls}: {payload.get('errors')}")
+
+        for i, (url, _) in enumerate(chunk):
+            bodies[url] = json.dumps(data.get(f"j{i}"))
+    return bodies
+
+
+def parse_ashby_batch(
+    urls: list[str],
+) -> dict[str, tuple[str, str, str, str, str | None] | ValueError]:
+    """Fetch and parse many Ashby postings; a null posting maps to its ValueError."""
+    results: dict[str, tuple[str, str, str, str, str | None] | ValueError] = {}
+    for url, body in fetch_ashby_batch(urls).items():
+        if isinstance(body, ValueError):
+            results[url] = body
+            continue
+        try:
+            results[url] = extract_ashby(url, body)
+        except ValueError as e:
+            results[url] = e
+    return results
+
+
+def parse_ashby(url: str) -> tuple[str, str, str, str, str | None]:
+    result = parse_ashby_batch([url])[url]
+    if isinstance(result, ValueError):
+        raise result
+    return result
@@ -0,0 +1,145 @@
+import time
+from collections.abc import Callable
+
+from django.db import DatabaseError, transaction
+
+from jobsearch.dedupe import DuplicateDetector
+from jobsearch.metrics import REJECTIONS, WRITE_SECONDS
+from jobsearch.models import BadJob, JobPosting
+from jobsearch.search import index_postings
+from jobsearch.utils import LocationMatcher, normalize_location
+
+
+def build_posting(
+    url: str,
+    source: str,
+    parsed: tuple,
+    bad_companies: set[str],
+    locations: LocationMatcher,
+    fallback_title: str = "",
+) -> JobPosting | BadJob:
+    """Turn a parser result into an unsaved JobPosting, or a BadJob if it is blocked."""
+    company, title, location, description, date_posted = parsed
+    location_allowed = locations.allows(str(location))
+    fields = {
+        "url": url,
+        "company": company,
+        "title": title or fallback_title or "",
+        "location": location,
+        "location_normalized": normalize_location(location),
+        "location_allowed": location_allowed,
+        "description": description,
+        "source": source,
+        "posted_date": date_posted,
+    }
+    if not location_allowed or company in bad_companies:
+        return BadJob(**fields)
+    return JobPosting(**fields)
+
+
+class PostingWriter:
+    """Buffer scraped JobPosting/BadJob rows and write them in bulk.
+
+    Rows are flushed with bulk_create(ignore_conflicts=True) inside one
+    transaction per batch, once `batch_size` rows are buffered or
+    `flush_interval` seconds have passed since the last flush. If a batch
+    fails, it is retried row by row so the failing rows can be reported
+    through `on_error` without losing the rest of the batch.
+
+    Written postings are added to the search index in the same transaction.
+    With a `dedupe` detector, each batch is also checked for near-duplicates
+    before it is written, and its bands are indexed alongside.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 30.0,
+        on_error: Callable[[str, Exception], None] | None = None,
+        dedupe: DuplicateDetector | None = None,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.dedupe = dedupe
+        self.written: list[JobPosting] = []
+        self.batches = 0
+        self._pending: list[JobPosting | BadJob] = []
+        self._last_flush = time.monotonic()
+
+    def add(self, obj: JobPosting | BadJob) -> None:
+        self._pending.append(obj)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        self.batches += 1
+        if self.dedupe is not None:
+            rejected = sum(isinstance(obj, BadJob) for obj in pending)
+            pending = self.dedupe.check(pending)
+            if suppressed := sum(isinstance(obj, BadJob) for obj in pending) - rejected:
+                REJECTIONS.inc(suppressed, reason="duplicate")
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                inserted = self._write(pending)
+                self._index(pending)
+            WRITE_SECONDS.observe(time.perf_counter() - started)
+        except DatabaseError:
+            for obj in pending:
+                try:
+                    with transaction.atomic():
+                        inserted = self._write([obj])
+                        self._index([obj])
+                except DatabaseError as e:
+                    if self.on_error is None:
+                        raise
+                    self.on_error(obj.url, e)
+                else:
+                    self._mark_written(inserted)
+        else:
+            self._mark_written(inserted)
+
+    def _mark_written(self, postings: list[JobPosting]) -> None:
+        for obj in postings:
+            # written rows are only kept for the run summary; dropping the
+            # description leaves it deferred instead of held until the end
+            obj.__dict__.pop("description", None)
+            self.written.append(obj)
+
+    def _index(self, objs: list[JobPosting | BadJob]) -> None:
+        # rows that already existed were left alone by the write, and so is their index
+        index_postings([obj for obj in objs if isinstance(obj, JobPosting)], replace=False)
+        if self.dedupe is not None:
+            self.dedupe.index(objs)
+
+    @staticmethod
+    def _write(objs: list[JobPosting | BadJob]) -> list[JobPosting]:
+        """Insert objs, skipping URLs already stored; returns the postings actually inserted."""
+        postings = [obj for obj in objs if isinstance(obj, JobPosting)]
+        bad_jobs = [obj for obj in objs if isinstance(obj, BadJob)]
+        inserted = []
+        if postings:
+            JobPosting.objects.bulk_create(postings, ignore_conflicts=True)
+            # ignore_conflicts reports nothing back (nor pks, on most backends):
+            # a skipped posting's URL is stored with an older scraped_at
+            stored = set(
+                JobPosting.objects.filter(url__in=[obj.url for obj in postings]).values_list(
+                    "url", "scraped_at"
+                )
+            )
+            inserted = [obj for obj in postings if (obj.url, obj.scraped_at) in stored]
+        if bad_jobs:
+            BadJob.objects.bulk_create(bad_jobs, ignore_conflicts=True)
+        return inserted